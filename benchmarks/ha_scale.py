@@ -0,0 +1,379 @@
+"""Measure the Home Assistant integration with many entries on one schedule.
+
+Boots a test Home Assistant instance with ``--entries`` config entries that
+follow lakes spread over ``--rivers`` rivers, all fetching at the same time
+of day. A local HTTP server stands in for the source. After the initial
+refreshes the scheduled fetch time is fired ``--ticks`` times. For startup
+and each tick the harness reports:
+
+* upstream requests (landing page GETs and river table POSTs),
+* wall time until every coordinator has finished,
+* event loop lag (how late a 10 ms sleep wakes up; p50, p99 and max),
+* the deepest executor queue, and
+* state writes (``state_changed`` events).
+
+Needs Home Assistant's test helpers and NumPy, which the forecast sensor
+uses::
+
+    pip install pytest-homeassistant-custom-component numpy
+    python benchmarks/ha_scale.py --entries 500 --rivers 40 [--jitter 15] [--json]
+
+By default every tick serves new levels so each sensor has something to
+write; ``--unchanged`` serves the same table again to measure the path
+where coordinators skip state writes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, List, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# Makes ``custom_components.lakelevel`` importable as a custom integration.
+sys.path.insert(0, str(REPO_ROOT))
+
+SOURCE_ENCODING = "iso-8859-1"
+SAMPLE_INTERVAL = 0.01
+FETCH_TIME = "06:00"
+
+
+class StubSource:
+    """Threaded HTTP server that serves generated landing and river pages.
+
+    Every river has the same ``lakes`` lakes. Levels depend on
+    ``generation``, so bumping it makes the next fetches return changed
+    measurements.
+    """
+
+    def __init__(self, rivers: int, lakes: int, latency_s: float = 0.0) -> None:
+        self.rivers = [f"Älv {index:03d}" for index in range(rivers)]
+        self.lakes = [f"Sjö {index:03d}" for index in range(lakes)]
+        self.latency_s = latency_s
+        self.generation = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/m/vattenstand.asp"
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def landing_page(self) -> bytes:
+        options = "".join(
+            f'<option value="{river}">{river}</option>' for river in self.rivers
+        )
+        return (
+            f'<html><body><form><select name="Ralv">{options}</select></form></body></html>'
+        ).encode(SOURCE_ENCODING)
+
+    def river_table(self) -> bytes:
+        rows = []
+        for index, lake in enumerate(self.lakes):
+            level = 100 + index + self.generation / 100
+            daily = "".join(
+                f'<td align="right">{_level(level - day / 100)}</td>' for day in range(5, 0, -1)
+            )
+            rows.append(
+                f'<tr><td><a href="#">{lake}</a></td><td></td>{daily}<td></td>'
+                f'<td align="right">{_level(level)}</td>'
+                '<td align="right">12:55&nbsp;okt 04</td>'
+                f'<td align="right">{_level(level - 0.5)}</td>'
+                f'<td align="right">{_level(level)}</td>'
+                f'<td align="right">{_level(level + 0.5)}</td>'
+                '<td align="right">2005-2024</td></tr>'
+            )
+        header = "".join(
+            f"<th>{label}</th>"
+            for label in ("Sjö", "sep 30", "okt 01", "okt 02", "okt 03", "okt 04", "Värde", "Tid")
+        )
+        return (
+            f'<html><body><table id="iseqchart"><tr>{header}</tr>{"".join(rows)}'
+            "</table></body></html>"
+        ).encode(SOURCE_ENCODING)
+
+    def _handler(self) -> type:
+        source = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server API
+                self._answer(source.landing_page())
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server API
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self._answer(source.river_table())
+
+            def _answer(self, content: bytes) -> None:
+                with source._lock:
+                    source.requests += 1
+                if source.latency_s:
+                    time.sleep(source.latency_s)
+                self.send_response(200)
+                self.send_header("Content-Type", f"text/html; charset={SOURCE_ENCODING}")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+@dataclass
+class PhaseResult:
+    """Measurements of startup or one scheduled tick."""
+
+    phase: str
+    upstream_requests: int
+    seconds_to_all_updated: float
+    loop_lag_p50_ms: float
+    loop_lag_p99_ms: float
+    loop_lag_max_ms: float
+    executor_queue_max: int
+    state_writes: int
+    failed_entries: int
+
+
+@dataclass
+class _Samples:
+    lag_s: List[float] = field(default_factory=list)
+    queue_depth: List[int] = field(default_factory=list)
+
+    def clear(self) -> None:
+        self.lag_s.clear()
+        self.queue_depth.clear()
+
+
+async def _sample(loop: asyncio.AbstractEventLoop, samples: _Samples) -> None:
+    while True:
+        started = loop.time()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        samples.lag_s.append(max(0.0, loop.time() - started - SAMPLE_INTERVAL))
+        # Executor jobs of Home Assistant run on the loop's default executor.
+        executor = getattr(loop, "_default_executor", None)
+        queue = getattr(executor, "_work_queue", None)
+        samples.queue_depth.append(queue.qsize() if queue is not None else 0)
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _level(value: float) -> str:
+    return f"{value:.2f}".replace(".", ",")
+
+
+async def run(args: argparse.Namespace) -> List[PhaseResult]:
+    """Boot Home Assistant against a stub source and measure each phase."""
+    from homeassistant import loader
+    from homeassistant.const import EVENT_STATE_CHANGED
+    from homeassistant.setup import async_setup_component
+    from homeassistant.util import dt as dt_util
+    from pytest_homeassistant_custom_component.common import (
+        MockConfigEntry,
+        async_fire_time_changed,
+        async_test_home_assistant,
+    )
+
+    from custom_components.lakelevel import lib
+    from custom_components.lakelevel.const import (
+        CONF_ALL_LAKES,
+        CONF_FETCH_TIMES,
+        CONF_JITTER_WINDOW,
+        CONF_LAKES,
+        CONF_RETRIES,
+        CONF_RIVER,
+        CONF_UPDATES_PER_DAY,
+        DOMAIN,
+    )
+
+    source = StubSource(args.rivers, args.lakes_per_river, args.latency_ms / 1000)
+    source.start()
+    # The client reads the URL from its module on every request.
+    client = sys.modules[lib.get_lake_levels.__module__]
+    original_url = client.LAKE_LEVEL_URL
+    client.LAKE_LEVEL_URL = source.url
+
+    results: List[PhaseResult] = []
+    samples = _Samples()
+    writes = 0
+    try:
+        with tempfile.TemporaryDirectory() as config_dir:
+            async with async_test_home_assistant(config_dir=config_dir) as hass:
+                # Load custom_components from the repository and skip the
+                # recorder, which only the import_history service uses.
+                hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+                hass.config.components.add("recorder")
+
+                def _count_write(_: Any) -> None:
+                    nonlocal writes
+                    writes += 1
+
+                hass.bus.async_listen(EVENT_STATE_CHANGED, _count_write)
+                # A plain task, so waiting for Home Assistant's background
+                # tasks does not wait for the sampler.
+                sampler = hass.loop.create_task(_sample(hass.loop, samples))
+
+                for index in range(args.entries):
+                    river = source.rivers[index % len(source.rivers)]
+                    lake = source.lakes[(index // len(source.rivers)) % len(source.lakes)]
+                    MockConfigEntry(
+                        domain=DOMAIN,
+                        version=3,
+                        title=f"{lake} ({river}) {index}",
+                        data={
+                            CONF_RIVER: river,
+                            CONF_LAKES: [lake],
+                            CONF_ALL_LAKES: False,
+                            CONF_FETCH_TIMES: [FETCH_TIME],
+                            CONF_UPDATES_PER_DAY: 1,
+                            CONF_RETRIES: 1,
+                        },
+                        options={CONF_JITTER_WINDOW: args.jitter},
+                    ).add_to_hass(hass)
+
+                async def measure(phase: str, trigger: Any) -> None:
+                    requests_before, writes_before = source.requests, writes
+                    samples.clear()
+                    started = time.perf_counter()
+                    await trigger()
+                    # First refreshes after setup run as background tasks.
+                    await hass.async_block_till_done(wait_background_tasks=True)
+                    elapsed = time.perf_counter() - started
+                    coordinators = [data["coordinator"] for data in hass.data[DOMAIN].values()]
+                    results.append(
+                        PhaseResult(
+                            phase=phase,
+                            upstream_requests=source.requests - requests_before,
+                            seconds_to_all_updated=round(elapsed, 3),
+                            loop_lag_p50_ms=round(_percentile(samples.lag_s, 0.5) * 1000, 2),
+                            loop_lag_p99_ms=round(_percentile(samples.lag_s, 0.99) * 1000, 2),
+                            loop_lag_max_ms=round(max(samples.lag_s, default=0.0) * 1000, 2),
+                            executor_queue_max=max(samples.queue_depth, default=0),
+                            state_writes=writes - writes_before,
+                            failed_entries=sum(
+                                not coordinator.last_update_success
+                                for coordinator in coordinators
+                            ),
+                        )
+                    )
+
+                async def setup() -> None:
+                    assert await async_setup_component(hass, DOMAIN, {})
+
+                await measure("startup", setup)
+
+                now = dt_util.utcnow()
+                first_tick = now.replace(hour=6, minute=0, second=0, microsecond=0)
+                if first_tick <= now:
+                    first_tick += timedelta(days=1)
+                for tick in range(args.ticks):
+                    if not args.unchanged:
+                        source.generation += 1
+                    fire_at = first_tick + timedelta(days=tick)
+
+                    async def fire(start: datetime = fire_at) -> None:
+                        # Step through the jitter window one minute at a time,
+                        # with --speedup simulated seconds per real second.
+                        for minute in range(args.jitter + 1):
+                            async_fire_time_changed(hass, start + timedelta(minutes=minute))
+                            if minute < args.jitter:
+                                await asyncio.sleep(60 / args.speedup)
+
+                    await measure(f"tick {tick + 1}", fire)
+                sampler.cancel()
+    finally:
+        client.LAKE_LEVEL_URL = original_url
+        source.stop()
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200, help="Config entries (default: 200)")
+    parser.add_argument(
+        "--rivers", type=int, default=20, help="Rivers the entries are spread over (default: 20)"
+    )
+    parser.add_argument(
+        "--lakes-per-river", type=int, default=10, help="Lakes in each river table (default: 10)"
+    )
+    parser.add_argument("--ticks", type=int, default=3, help="Scheduled fetches (default: 3)")
+    parser.add_argument(
+        "--jitter",
+        type=int,
+        default=0,
+        help="Jitter window in minutes; 0 fires every entry at once (default: 0)",
+    )
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=60.0,
+        help="Simulated seconds per real second while stepping the jitter window (default: 60)",
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=50.0, help="Stub response delay (default: 50)"
+    )
+    parser.add_argument(
+        "--unchanged", action="store_true", help="Serve the same levels on every tick"
+    )
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        import pytest_homeassistant_custom_component  # noqa: F401
+    except ImportError:
+        print(
+            "Needs Home Assistant's test helpers: "
+            "pip install pytest-homeassistant-custom-component",
+            file=sys.stderr,
+        )
+        return 1
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps([asdict(result) for result in results], indent=2))
+        return 0
+
+    print(
+        f"{'phase':<10} {'requests':>8} {'seconds':>8} {'lag p50':>8} {'lag p99':>8} "
+        f"{'lag max':>8} {'queue':>6} {'writes':>7} {'failed':>6}"
+    )
+    for result in results:
+        print(
+            f"{result.phase:<10} {result.upstream_requests:>8} "
+            f"{result.seconds_to_all_updated:>8.2f} {result.loop_lag_p50_ms:>6.1f}ms "
+            f"{result.loop_lag_p99_ms:>6.1f}ms {result.loop_lag_max_ms:>6.1f}ms "
+            f"{result.executor_queue_max:>6} {result.state_writes:>7} {result.failed_entries:>6}"
+        )
+    ticks = [result.seconds_to_all_updated for result in results[1:]]
+    if ticks:
+        print(f"median tick: {statistics.median(ticks):.2f} s for {args.entries} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
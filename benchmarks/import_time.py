@@ -0,0 +1,87 @@
+"""Measure how long ``import lakelevel`` and ``lakelevel --help`` take.
+
+Each case runs in a fresh interpreter so nothing is cached between runs;
+the median wall time of ``--repeat`` runs is reported next to the time of
+a bare interpreter, along with which heavy modules ended up loaded.
+
+    python benchmarks/import_time.py [--repeat 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Sequence, Tuple
+
+HEAVY_MODULES = (
+    "requests",
+    "bs4",
+    "sqlite3",
+    "numpy",
+    "pyarrow",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+
+CASES: Tuple[Tuple[str, str], ...] = (
+    ("python -c pass", "pass"),
+    ("import lakelevel", "import lakelevel"),
+    ("import lakelevel.cli", "import lakelevel.cli"),
+    (
+        "lakelevel --help",
+        "import contextlib, io\n"
+        "from lakelevel.cli import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    main(['--help'])",
+    ),
+    ("first fetch imports", "import lakelevel.siljan as s; s._soup(''); s._new_session()"),
+)
+
+_REPORT_MODULES = (
+    "\nimport sys\n"
+    f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+)
+
+
+def run_case(code: str, repeat: int) -> Tuple[float, str]:
+    """Median seconds of ``repeat`` fresh runs and the heavy modules loaded."""
+    timings: List[float] = []
+    loaded = ""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", _wrap(code)],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        timings.append(time.perf_counter() - started)
+        loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return statistics.median(timings), loaded
+
+
+def _wrap(code: str) -> str:
+    # argparse exits after printing help; report modules on the way out.
+    return f"try:\n{_indent(code)}\nexcept SystemExit:\n    pass{_REPORT_MODULES}"
+
+
+def _indent(code: str) -> str:
+    return "\n".join(f"    {line}" for line in code.splitlines())
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per case (default: 10)")
+    args = parser.parse_args(argv)
+
+    for name, code in CASES:
+        seconds, loaded = run_case(code, args.repeat)
+        print(f"{name:<22} {seconds * 1000:8.1f} ms  loaded: {loaded or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
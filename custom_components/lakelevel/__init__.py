@@ -7,34 +7,56 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+import voluptuous as vol
 
+from .bulk import async_import_yaml
 from .const import (
+    CONF_ALL_LAKES,
+    CONF_ENTRIES,
     CONF_FETCH_TIME,
     CONF_FETCH_TIMES,
+    CONF_LAKE,
+    CONF_LAKES,
     CONF_RETRIES,
     CONF_UPDATES_PER_DAY,
     DEFAULT_FETCH_TIME,
     DEFAULT_RETRIES,
     DOMAIN,
 )
-from .coordinator import LakeLevelCoordinator
+from .coordinator import LakeLevelCoordinator, entry_store
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
+# Rows are validated against the source by the import, not by the schema.
+CONFIG_SCHEMA = vol.Schema(
+    {
+        vol.Optional(DOMAIN): vol.Schema(
+            {vol.Optional(CONF_ENTRIES, default=[]): vol.All(cv.ensure_list, [dict])}
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    async_setup_services(hass)
+    rows = config.get(DOMAIN, {}).get(CONF_ENTRIES)
+    if rows:
+        hass.async_create_background_task(
+            async_import_yaml(hass, rows), f"{DOMAIN}_yaml_import"
+        )
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     config = dict(entry.data)
     config.update(entry.options)
 
-    coordinator = LakeLevelCoordinator(hass, config)
-
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except ConfigEntryNotReady:
-        raise
-    except Exception as exc:  # pragma: no cover - defensive path
-        raise ConfigEntryNotReady(str(exc)) from exc
+    coordinator = LakeLevelCoordinator(hass, config, entry.entry_id)
+    await coordinator.async_start()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
         "coordinator": coordinator,
@@ -43,16 +65,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, ["sensor"])
+
+    # Sensors start from their restored state; the first live fetch must not
+    # hold up Home Assistant startup.
+    entry.async_create_background_task(
+        hass,
+        coordinator.async_refresh(),
+        f"{DOMAIN}_first_refresh_{entry.entry_id}",
+    )
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, ["sensor"])
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["coordinator"].async_shutdown()
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await entry_store(hass, entry.entry_id).async_remove()
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if entry.version == 1:
         data = dict(entry.data)
@@ -68,8 +103,18 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             version=2,
         )
         _LOGGER.debug("Migrated Lake Level entry to version 2")
+    if entry.version == 2:
+        data = dict(entry.data)
+        lake = data.pop(CONF_LAKE, None)
+        data.setdefault(CONF_LAKES, [lake] if lake else [])
+        data.setdefault(CONF_ALL_LAKES, False)
+        hass.config_entries.async_update_entry(entry, data=data, version=3)
+        _LOGGER.debug("Migrated Lake Level entry to version 3")
     return True
 
 
 async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    await hass.config_entries.async_reload(entry.entry_id)
+    # Options are applied in place so adding or removing lakes does not
+    # reload the entry or refetch lakes that are already tracked.
+    coordinator: LakeLevelCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    await coordinator.async_update_options({**entry.data, **entry.options})
@@ -0,0 +1,296 @@
+"""Bulk creation of Lake Level entries from YAML or CSV rows."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Mapping
+import csv
+from dataclasses import dataclass
+import io
+import logging
+import re
+from typing import Any
+
+from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.dt import parse_time
+
+from .const import (
+    CONF_ALL_LAKES,
+    CONF_FETCH_TIME,
+    CONF_FETCH_TIMES,
+    CONF_LAKE,
+    CONF_LAKES,
+    CONF_RETRIES,
+    CONF_RIVER,
+    CONF_SCHEDULE,
+    CONF_UPDATES_PER_DAY,
+    DEFAULT_FETCH_TIME,
+    DEFAULT_RETRIES,
+    DOMAIN,
+    MAX_UPDATES_PER_DAY,
+)
+from .fetch import source_lists
+from .lib import NameIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+ALL_LAKES = "*"
+_SCHEDULE_SEPARATORS = re.compile(r"[\s,;]+")
+
+
+@dataclass(frozen=True)
+class _Row:
+    number: int
+    river: str
+    lake: str | None
+    fetch_times: tuple[str, ...]
+
+
+@dataclass
+class _Group:
+    """Lakes (``None`` for every lake) and fetch times of one river's entry."""
+
+    entry: ConfigEntry | None
+    lakes: list[str] | None
+    fetch_times: list[str]
+    original: tuple[list[str] | None, list[str]]
+
+    @classmethod
+    def for_entry(cls, entry: ConfigEntry | None) -> _Group:
+        if entry is None:
+            return cls(entry=None, lakes=[], fetch_times=[], original=([], []))
+        config = {**entry.data, **entry.options}
+        lakes = None if config.get(CONF_ALL_LAKES) else list(config.get(CONF_LAKES, []))
+        times = _entry_times(config)
+        return cls(
+            entry=entry,
+            lakes=lakes,
+            fetch_times=times,
+            original=(None if lakes is None else list(lakes), list(times)),
+        )
+
+    @property
+    def changed(self) -> bool:
+        return (self.lakes, self.fetch_times) != self.original
+
+
+def rows_from_csv(text: str) -> list[dict[str, str]]:
+    """Read ``river,lake,schedule`` rows; the header row is required.
+
+    ``schedule`` holds up to four HH:MM times separated by spaces or
+    semicolons, and ``*`` as lake selects every lake of the river.
+    """
+    reader = csv.DictReader(io.StringIO(text.strip()))
+    if reader.fieldnames is None or CONF_RIVER not in reader.fieldnames:
+        raise HomeAssistantError("CSV import needs a header row with a 'river' column")
+    return [{key: value for key, value in row.items() if key} for row in reader]
+
+
+async def async_import_entries(
+    hass: HomeAssistant, rows: Iterable[Mapping[str, Any]]
+) -> dict[str, Any]:
+    """Create or extend one entry per river from ``rows``.
+
+    Rows are validated against the source with one landing page and one
+    river table download per distinct river. Rows of a river add their
+    lakes and fetch times to its entry, creating it if needed; rows that
+    would take a river past ``MAX_UPDATES_PER_DAY`` times are rejected.
+    Invalid rows are reported and skipped; the rest are still imported.
+    """
+    errors: list[dict[str, Any]] = []
+    parsed: list[_Row] = []
+    total = 0
+    for number, row in enumerate(rows, start=1):
+        total = number
+        try:
+            parsed.append(_parse_row(number, row))
+        except ValueError as exc:
+            errors.append(_row_error(number, row, str(exc)))
+
+    lists = source_lists(hass)
+    try:
+        rivers = NameIndex(await lists.async_rivers())
+    except Exception as exc:
+        raise HomeAssistantError(f"Could not load rivers: {exc}") from exc
+
+    resolved = {row.river: rivers.resolve(row.river) for row in parsed}
+    distinct = sorted({river for river in resolved.values() if river is not None})
+    results = await asyncio.gather(
+        *(lists.async_lakes(river) for river in distinct), return_exceptions=True
+    )
+    lakes_by_river = dict(zip(distinct, results))
+
+    # One entry per river: rows for a river share its entry, and their
+    # schedules are combined, since lakes of two entries on one river would
+    # get the same sensor unique IDs.
+    groups: dict[str, _Group] = {}
+    for row in parsed:
+        river = resolved[row.river]
+        if river is None:
+            errors.append(_row_error(row.number, row, _unknown("river", row.river, rivers)))
+            continue
+        lakes = lakes_by_river[river]
+        if isinstance(lakes, BaseException):
+            errors.append(_row_error(row.number, row, f"Could not load lakes: {lakes}"))
+            continue
+
+        lake = None
+        if row.lake is not None:
+            index = NameIndex(lakes)
+            lake = index.resolve(row.lake)
+            if lake is None:
+                errors.append(_row_error(row.number, row, _unknown("lake", row.lake, index)))
+                continue
+
+        if river not in groups:
+            groups[river] = _Group.for_entry(_existing_entry(hass, river))
+        group = groups[river]
+        added = [time for time in row.fetch_times if time not in group.fetch_times]
+        if len(group.fetch_times) + len(added) > MAX_UPDATES_PER_DAY:
+            errors.append(
+                _row_error(
+                    row.number,
+                    row,
+                    f"River {river} would have more than {MAX_UPDATES_PER_DAY} fetch times "
+                    f"per day ({', '.join([*group.fetch_times, *added])})",
+                )
+            )
+            continue
+        group.fetch_times.extend(added)
+        if lake is None:
+            group.lakes = None
+        elif group.lakes is not None and lake not in group.lakes:
+            group.lakes.append(lake)
+
+    created: list[str] = []
+    updated: list[str] = []
+    for river, group in groups.items():
+        if group.entry is None:
+            if not group.fetch_times:
+                group.fetch_times.append(DEFAULT_FETCH_TIME)
+            result = await hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": SOURCE_IMPORT},
+                data={
+                    CONF_RIVER: river,
+                    CONF_LAKES: group.lakes or [],
+                    CONF_ALL_LAKES: group.lakes is None,
+                    CONF_FETCH_TIMES: list(group.fetch_times),
+                    CONF_UPDATES_PER_DAY: len(group.fetch_times),
+                    CONF_RETRIES: DEFAULT_RETRIES,
+                },
+            )
+            if "result" in result:
+                created.append(result["result"].entry_id)
+            continue
+
+        if not group.changed:
+            continue
+        hass.config_entries.async_update_entry(
+            group.entry,
+            options={
+                **group.entry.options,
+                CONF_LAKES: group.lakes or [],
+                CONF_ALL_LAKES: group.lakes is None,
+                CONF_FETCH_TIMES: list(group.fetch_times),
+                CONF_UPDATES_PER_DAY: len(group.fetch_times),
+            },
+        )
+        updated.append(group.entry.entry_id)
+
+    _LOGGER.info(
+        "Imported %s rows: %s entries created, %s updated, %s rows rejected",
+        total,
+        len(created),
+        len(updated),
+        len(errors),
+    )
+    return {
+        "created": created,
+        "updated": updated,
+        "errors": sorted(errors, key=lambda error: error["row"]),
+    }
+
+
+async def async_import_yaml(hass: HomeAssistant, rows: list[dict[str, Any]]) -> None:
+    """Import the ``entries`` list of ``configuration.yaml``, logging rejected rows."""
+    try:
+        result = await async_import_entries(hass, rows)
+    except HomeAssistantError as exc:
+        _LOGGER.warning("Lake Level YAML import failed: %s", exc)
+        return
+    for error in result["errors"]:
+        _LOGGER.warning("Lake Level YAML import skipped entry %s: %s", error["row"], error["error"])
+
+
+def _parse_row(number: int, row: Mapping[str, Any]) -> _Row:
+    if not isinstance(row, Mapping):
+        raise ValueError("Row must be a mapping with river, lake and schedule")
+    river = str(row.get(CONF_RIVER) or "").strip()
+    if not river:
+        raise ValueError("Missing river")
+    lake = str(row.get(CONF_LAKE) or "").strip()
+    if not lake:
+        raise ValueError(f"Missing lake (use '{ALL_LAKES}' for every lake)")
+
+    # Without a schedule a row only adds its lake; new entries fall back to
+    # the default time.
+    schedule = row.get(CONF_SCHEDULE) or []
+    if isinstance(schedule, str):
+        schedule = [value for value in _SCHEDULE_SEPARATORS.split(schedule) if value]
+    times: list[str] = []
+    for value in schedule:
+        formatted = _format_time(value)
+        if formatted is None:
+            raise ValueError(f"Invalid time '{value}'")
+        times.append(formatted)
+    times = list(dict.fromkeys(times))
+    if len(times) > MAX_UPDATES_PER_DAY:
+        raise ValueError(f"At most {MAX_UPDATES_PER_DAY} fetch times per day")
+
+    return _Row(
+        number=number,
+        river=river,
+        lake=None if lake == ALL_LAKES else lake,
+        fetch_times=tuple(times),
+    )
+
+
+def _existing_entry(hass: HomeAssistant, river: str) -> ConfigEntry | None:
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if {**entry.data, **entry.options}.get(CONF_RIVER) == river:
+            return entry
+    return None
+
+
+def _entry_times(config: Mapping[str, Any]) -> list[str]:
+    stored = config.get(CONF_FETCH_TIMES) or [config.get(CONF_FETCH_TIME, DEFAULT_FETCH_TIME)]
+    updates = config.get(CONF_UPDATES_PER_DAY, len(stored))
+    # Stored times may be unpadded ("6:00") or carry seconds.
+    times = [_format_time(value) for value in stored[:updates]]
+    return list(dict.fromkeys(time for time in times if time))
+
+
+def _format_time(value: Any) -> str | None:
+    parsed = parse_time(str(value))
+    return parsed.strftime("%H:%M") if parsed is not None else None
+
+
+def _unknown(kind: str, name: str, index: NameIndex) -> str:
+    message = f"Unknown {kind} '{name}'"
+    suggestions = index.suggest(name)
+    if suggestions:
+        message += f". Did you mean: {', '.join(suggestions)}?"
+    return message
+
+
+def _row_error(number: int, row: Any, error: str) -> dict[str, Any]:
+    if isinstance(row, _Row):
+        river, lake = row.river, row.lake or ALL_LAKES
+    elif isinstance(row, Mapping):
+        river, lake = row.get(CONF_RIVER), row.get(CONF_LAKE)
+    else:
+        river = lake = None
+    return {"row": number, CONF_RIVER: river, CONF_LAKE: lake, "error": error}
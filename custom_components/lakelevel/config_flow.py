@@ -6,21 +6,34 @@ import logging
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv
 from homeassistant.util.dt import parse_time
 
-from .lib import list_lakes, list_rivers
+from .fetch import source_lists
+from .lib import NameIndex
 
 from .const import (
+    CONF_ALL_LAKES,
+    CONF_CONNECT_TIMEOUT,
+    CONF_FETCH_BUDGET,
+    CONF_FETCH_TIME,
     CONF_FETCH_TIMES,
-    CONF_LAKE,
+    CONF_JITTER_WINDOW,
+    CONF_LAKES,
+    CONF_READ_TIMEOUT,
     CONF_RIVER,
     CONF_RETRIES,
     CONF_UPDATES_PER_DAY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FETCH_BUDGET,
+    DEFAULT_JITTER_WINDOW,
+    DEFAULT_READ_TIMEOUT,
     DEFAULT_RETRIES,
     DEFAULT_FETCH_TIME,
     DOMAIN,
+    MAX_JITTER_WINDOW,
     MAX_UPDATES_PER_DAY,
 )
 
@@ -33,21 +46,35 @@ _DEFAULT_TIMES = ["06:00", "12:00", "18:00", "00:00"]
 class LakeLevelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Lake Level."""
 
-    VERSION = 2
+    VERSION = 3
 
     def __init__(self) -> None:
         self._selected_river: str | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> LakeLevelOptionsFlowHandler:
+        return LakeLevelOptionsFlowHandler(config_entry)
+
     async def async_step_user(self, user_input: dict | None = None) -> FlowResult:
         hass: HomeAssistant = self.hass
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            self._selected_river = user_input[CONF_RIVER]
+            river = user_input[CONF_RIVER]
+            # One entry per river; more lakes are added from its options.
+            await self.async_set_unique_id(river.lower())
+            self._abort_if_unique_id_configured()
+            if self._river_configured(river):
+                return self.async_abort(reason="already_configured")
+            self._selected_river = river
+            source_lists(hass).prefetch_lakes(self._selected_river)
             return await self.async_step_lake()
 
         try:
-            rivers = await hass.async_add_executor_job(list_rivers)
+            rivers = await source_lists(hass).async_rivers()
         except Exception as exc:  # pragma: no cover - network failure path
             _LOGGER.exception("Failed to load rivers", exc_info=exc)
             errors["base"] = "cannot_connect"
@@ -65,7 +92,7 @@ class LakeLevelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         try:
             _LOGGER.debug("Loading lakes for river %s", self._selected_river)
-            lakes = await self.hass.async_add_executor_job(list_lakes, self._selected_river)
+            lakes = await source_lists(self.hass).async_lakes(self._selected_river)
         except Exception as exc:  # pragma: no cover - network failure path
             _LOGGER.exception("Failed to load lakes", exc_info=exc)
             errors["base"] = "cannot_connect"
@@ -91,6 +118,9 @@ class LakeLevelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         except (TypeError, ValueError):
             current_retries = DEFAULT_RETRIES
 
+        current_lakes = list(current_input.get(CONF_LAKES, []))
+        current_all_lakes = bool(current_input.get(CONF_ALL_LAKES, False))
+
         valid_times: list[str] = []
         if user_input is not None and "base" not in errors:
             for index in range(current_updates):
@@ -101,24 +131,27 @@ class LakeLevelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 else:
                     valid_times.append(value)
 
+            if not current_lakes and not current_all_lakes:
+                errors[CONF_LAKES] = "no_lakes"
+
             if not errors:
                 data = {
                     CONF_RIVER: self._selected_river,
-                    CONF_LAKE: user_input[CONF_LAKE],
+                    CONF_LAKES: current_lakes,
+                    CONF_ALL_LAKES: current_all_lakes,
                     CONF_FETCH_TIMES: valid_times,
                     CONF_UPDATES_PER_DAY: current_updates,
                     CONF_RETRIES: current_retries,
                 }
-                return self.async_create_entry(
-                    title=f"{data[CONF_LAKE]} ({data[CONF_RIVER]})", data=data
-                )
+                return self.async_create_entry(title=_entry_title(data), data=data)
 
         schema = (
             vol.Schema({})
-            if errors
+            if "base" in errors
             else vol.Schema(
                 {
-                    vol.Required(CONF_LAKE): vol.In(lakes),
+                    vol.Optional(CONF_LAKES, default=current_lakes): cv.multi_select(lakes),
+                    vol.Optional(CONF_ALL_LAKES, default=current_all_lakes): bool,
                     vol.Required(
                         CONF_UPDATES_PER_DAY, default=current_updates
                     ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_UPDATES_PER_DAY)),
@@ -148,6 +181,22 @@ class LakeLevelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={"river": self._selected_river},
         )
 
+    async def async_step_import(self, import_data: dict) -> FlowResult:
+        """Create an entry from rows already validated by the bulk import."""
+        river = import_data[CONF_RIVER]
+        await self.async_set_unique_id(river.lower())
+        self._abort_if_unique_id_configured()
+        if self._river_configured(river):
+            return self.async_abort(reason="already_configured")
+        return self.async_create_entry(title=_entry_title(import_data), data=import_data)
+
+    def _river_configured(self, river: str) -> bool:
+        # Entries created before rivers became unique IDs have none set.
+        return any(
+            entry.data.get(CONF_RIVER, "").lower() == river.lower()
+            for entry in self._async_current_entries()
+        )
+
     def _default_times(self) -> list[str]:
         defaults = list(_DEFAULT_TIMES)
         defaults[0] = DEFAULT_FETCH_TIME
@@ -161,6 +210,22 @@ class LakeLevelOptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input: dict | None = None) -> FlowResult:
         data = {**self._entry.data, **self._entry.options}
         errors: dict[str, str] = {}
+        river = data[CONF_RIVER]
+        existing_lakes = list(data.get(CONF_LAKES, []))
+
+        try:
+            lakes = await source_lists(self.hass).async_lakes(river)
+        except Exception as exc:  # pragma: no cover - network failure path
+            _LOGGER.warning("Failed to load lakes for %s: %s", river, exc)
+            lakes = []
+        # Match configured lakes to the source spelling so a lake stored as
+        # "Orsasjon" does not show up twice next to "Orsasjön".
+        index = NameIndex(lakes)
+        existing_lakes = list(
+            dict.fromkeys(index.resolve(lake) or lake for lake in existing_lakes)
+        )
+        # Keep configured lakes selectable even if the source is unreachable.
+        lakes = list(dict.fromkeys([*lakes, *existing_lakes]))
 
         existing_times = data.get(CONF_FETCH_TIMES) or [data.get(CONF_FETCH_TIME, DEFAULT_FETCH_TIME)]
         existing_times = (existing_times + _DEFAULT_TIMES)[:MAX_UPDATES_PER_DAY]
@@ -187,6 +252,20 @@ class LakeLevelOptionsFlowHandler(config_entries.OptionsFlow):
         except (TypeError, ValueError):
             current_retries = DEFAULT_RETRIES
 
+        current_budget = _int_option(current_input, data, CONF_FETCH_BUDGET, DEFAULT_FETCH_BUDGET)
+        current_connect = _int_option(
+            current_input, data, CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+        )
+        current_read = _int_option(current_input, data, CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
+        current_jitter = _int_option(
+            current_input, data, CONF_JITTER_WINDOW, DEFAULT_JITTER_WINDOW
+        )
+
+        current_lakes = list(current_input.get(CONF_LAKES, existing_lakes))
+        current_all_lakes = bool(
+            current_input.get(CONF_ALL_LAKES, data.get(CONF_ALL_LAKES, False))
+        )
+
         valid_times: list[str] = []
         if user_input is not None:
             for index in range(current_updates):
@@ -197,16 +276,27 @@ class LakeLevelOptionsFlowHandler(config_entries.OptionsFlow):
                 else:
                     valid_times.append(value)
 
+            if not current_lakes and not current_all_lakes:
+                errors[CONF_LAKES] = "no_lakes"
+
             if not errors:
                 options = {
+                    CONF_LAKES: current_lakes,
+                    CONF_ALL_LAKES: current_all_lakes,
                     CONF_FETCH_TIMES: valid_times,
                     CONF_UPDATES_PER_DAY: current_updates,
                     CONF_RETRIES: current_retries,
+                    CONF_FETCH_BUDGET: current_budget,
+                    CONF_CONNECT_TIMEOUT: current_connect,
+                    CONF_READ_TIMEOUT: current_read,
+                    CONF_JITTER_WINDOW: current_jitter,
                 }
                 return self.async_create_entry(title="", data=options)
 
         schema = vol.Schema(
             {
+                vol.Optional(CONF_LAKES, default=current_lakes): cv.multi_select(lakes),
+                vol.Optional(CONF_ALL_LAKES, default=current_all_lakes): bool,
                 vol.Required(
                     CONF_UPDATES_PER_DAY, default=current_updates
                 ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_UPDATES_PER_DAY)),
@@ -225,11 +315,41 @@ class LakeLevelOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(CONF_RETRIES, default=current_retries): vol.All(
                     vol.Coerce(int), vol.Range(min=1, max=10)
                 ),
+                vol.Optional(CONF_JITTER_WINDOW, default=current_jitter): vol.All(
+                    vol.Coerce(int), vol.Range(min=0, max=MAX_JITTER_WINDOW)
+                ),
+                vol.Optional(CONF_FETCH_BUDGET, default=current_budget): vol.All(
+                    vol.Coerce(int), vol.Range(min=10, max=3600)
+                ),
+                vol.Optional(CONF_CONNECT_TIMEOUT, default=current_connect): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=300)
+                ),
+                vol.Optional(CONF_READ_TIMEOUT, default=current_read): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=600)
+                ),
             }
         )
 
-        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+        return self.async_show_form(
+            step_id="init",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={"river": river},
+        )
+
+
+def _int_option(current_input: dict, data: dict, key: str, default: int) -> int:
+    try:
+        return int(current_input.get(key, data.get(key, default)))
+    except (TypeError, ValueError):
+        return default
 
 
-async def async_get_options_flow(entry: config_entries.ConfigEntry) -> LakeLevelOptionsFlowHandler:
-    return LakeLevelOptionsFlowHandler(entry)
+def _entry_title(data: dict) -> str:
+    river = data[CONF_RIVER]
+    lakes = data[CONF_LAKES]
+    if data.get(CONF_ALL_LAKES):
+        return f"{river} (all lakes)"
+    if len(lakes) == 1:
+        return f"{lakes[0]} ({river})"
+    return f"{river} ({len(lakes)} lakes)"
@@ -3,11 +3,45 @@
 DOMAIN = "lakelevel"
 CONF_RIVER = "river"
 CONF_LAKE = "lake"
+CONF_LAKES = "lakes"
+CONF_ALL_LAKES = "all_lakes"
 CONF_FETCH_TIME = "fetch_time"
 CONF_RETRIES = "retries"
 CONF_FETCH_TIMES = "fetch_times"
 CONF_UPDATES_PER_DAY = "updates_per_day"
+CONF_FETCH_BUDGET = "fetch_budget"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_JITTER_WINDOW = "jitter_window"
+CONF_SCHEDULE = "schedule"
+CONF_ENTRIES = "entries"
+
+DATA_RIVER_FETCHES = f"{DOMAIN}_river_fetches"
+DATA_SOURCE_LISTS = f"{DOMAIN}_source_lists"
+
+# Per-entry state kept across restarts, stored as "lakelevel.<entry_id>".
+STORAGE_VERSION = 1
+# Seconds; writes of the per-entry state are batched over this delay.
+STORAGE_SAVE_DELAY = 10
 
 DEFAULT_FETCH_TIME = "06:00"
 DEFAULT_RETRIES = 3
 MAX_UPDATES_PER_DAY = 4
+# Seconds; the budget spans every attempt of one scheduled refresh.
+DEFAULT_FETCH_BUDGET = 300
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+# Minutes; scheduled fetches start at a stable per-river offset in this window.
+DEFAULT_JITTER_WINDOW = 15
+MAX_JITTER_WINDOW = 60
+# Seconds; lakelevel.refresh answers from the last fetch of a river that is
+# younger than this instead of downloading it again.
+MIN_REFRESH_INTERVAL = 300
+# Seconds the river and lake lists shown by the config forms are reused.
+SOURCE_LISTS_TTL = 600
+
+EVENT_ANOMALY = "lakelevel_anomaly"
+
+# Readings and day labels on vattenreglering.se are in Swedish local time.
+SOURCE_TIMEZONE = "Europe/Stockholm"
+FORECAST_HORIZON_DAYS = 7
@@ -2,59 +2,169 @@
 
 from __future__ import annotations
 
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
+import hashlib
 import logging
-from typing import Any, Callable, List
+from typing import TYPE_CHECKING, Any, Callable, Iterable, List
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers import instance_id
 from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 from homeassistant.util.dt import parse_time
 
-from .lib import LakeLevelError, LakeMeasurement, get_lake_level
+from .lib import (
+    AnomalyDetector,
+    Deadline,
+    DeadlineExceeded,
+    LakeLevelError,
+    LakeMeasurement,
+    LakeTrend,
+    NameIndex,
+    compute_trends,
+    measurement_history,
+)
+
+if TYPE_CHECKING:
+    from .lib import Forecast
 
 from .const import (
+    CONF_ALL_LAKES,
+    CONF_CONNECT_TIMEOUT,
+    CONF_FETCH_BUDGET,
     CONF_FETCH_TIME,
     CONF_FETCH_TIMES,
+    CONF_JITTER_WINDOW,
     CONF_LAKE,
+    CONF_LAKES,
+    CONF_READ_TIMEOUT,
     CONF_RIVER,
     CONF_RETRIES,
     CONF_UPDATES_PER_DAY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_FETCH_BUDGET,
     DEFAULT_FETCH_TIME,
+    DEFAULT_JITTER_WINDOW,
+    DEFAULT_READ_TIMEOUT,
     DEFAULT_RETRIES,
+    DOMAIN,
+    EVENT_ANOMALY,
+    FORECAST_HORIZON_DAYS,
     MAX_UPDATES_PER_DAY,
+    MIN_REFRESH_INTERVAL,
+    SOURCE_TIMEZONE,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
 )
+from .fetch import river_fetches
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class LakeLevelCoordinator(DataUpdateCoordinator[LakeMeasurement | None]):
-    """Coordinator that fetches lake data according to schedule."""
+class LakeLevelCoordinator(DataUpdateCoordinator[dict[str, LakeMeasurement] | None]):
+    """Coordinator that fetches every configured lake of a river on schedule."""
 
-    def __init__(self, hass: HomeAssistant, config: dict[str, Any]) -> None:
+    def __init__(
+        self, hass: HomeAssistant, config: dict[str, Any], entry_id: str
+    ) -> None:
         super().__init__(
             hass,
             _LOGGER,
             name="Lake Level",
+            # Unchanged measurements must not produce state writes.
+            always_update=False,
         )
         self._river: str = config[CONF_RIVER]
-        self._lake: str = config[CONF_LAKE]
+        self._lakes: list[str] = self._parse_lakes(config)
+        self._all_lakes: bool = bool(config.get(CONF_ALL_LAKES, False))
         self._retries: int = config.get(CONF_RETRIES, DEFAULT_RETRIES)
+        self._fetch_budget: float = config.get(CONF_FETCH_BUDGET, DEFAULT_FETCH_BUDGET)
+        self._connect_timeout: float = config.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+        self._read_timeout: float = config.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT)
         self._fetch_times: list[time] = self._parse_fetch_times(config)
+        self._jitter_window: int = config.get(CONF_JITTER_WINDOW, DEFAULT_JITTER_WINDOW)
         self._unsubs: List[Callable[[], None]] = []
+        # Age of a shared river result that refreshes accept instead of
+        # fetching; only on-demand refreshes raise it above zero.
+        self._max_age: float = 0
+        # When each lake's current measurement was first received; unchanged
+        # fetches leave it alone so they do not write state.
+        self.changed_at: dict[str, datetime] = {}
+        self.trends: dict[str, LakeTrend] = {}
+        self.forecasts: dict[str, Forecast] = {}
+        self._detector = AnomalyDetector()
+        self._store: Store[dict[str, Any]] = entry_store(hass, entry_id)
+        # Lakes of the last successful fetch, so all-lakes entries keep their
+        # sensors while the source is down after a restart.
+        self._known_lakes: list[str] = []
+        # Configured lake names mapped to the source spelling that keys
+        # ``data``, so a lake stored as "Orsasjon" finds "Orsasjön".
+        self._lake_names: dict[str, str] = {}
+
+    @property
+    def river(self) -> str:
+        return self._river
+
+    @property
+    def lakes(self) -> list[str]:
+        """Lakes that should currently have a sensor."""
+        if self._all_lakes:
+            return list(self.data) if self.data else list(self._known_lakes)
+        return list(dict.fromkeys(self._lake_names.get(lake, lake) for lake in self._lakes))
 
-    async def async_config_entry_first_refresh(self) -> None:
+    async def async_start(self) -> None:
+        """Load the stored state and arm the fetch schedule.
+
+        Does not wait for a live refresh.
+        """
+        stored = await self._store.async_load() or {}
+        self._known_lakes = list(stored.get("lakes", []))
+        self._resolve_lake_names(self._known_lakes)
         await self._schedule_updates()
-        await super().async_config_entry_first_refresh()
 
-    async def _async_update_data(self) -> LakeMeasurement:
+    async def async_refresh_on_demand(self) -> bool:
+        """Refresh now, reusing a river result younger than ``MIN_REFRESH_INTERVAL``.
+
+        Returns whether the refresh succeeded.
+        """
+        self._max_age = MIN_REFRESH_INTERVAL
+        try:
+            await self.async_refresh()
+        finally:
+            self._max_age = 0
+        return self.last_update_success
+
+    async def async_shutdown(self) -> None:
+        self._cancel_schedule()
+        await super().async_shutdown()
+
+    async def _async_update_data(self) -> dict[str, LakeMeasurement]:
         retries = self._retries
+        lakes = None if self._all_lakes else list(self._lakes)
+        # One budget for the whole refresh, shared by every retry.
+        deadline = Deadline(
+            budget_s=self._fetch_budget,
+            connect_timeout=self._connect_timeout,
+            read_timeout=self._read_timeout,
+        )
         last_exception: Exception | None = None
         for attempt in range(retries):
             try:
-                measurement = await self.hass.async_add_executor_job(
-                    get_lake_level, self._river, self._lake
+                measurements = _select_lakes(
+                    await river_fetches(self.hass).async_fetch(
+                        self._river, deadline, max_age=self._max_age
+                    ),
+                    lakes,
                 )
+                if not measurements:
+                    raise LakeLevelError(
+                        f"No configured lakes found for river '{self._river}'"
+                    )
+            except DeadlineExceeded as err:
+                _LOGGER.warning("Gave up fetching lake level: %s", err)
+                raise
             except LakeLevelError as err:
                 last_exception = err
                 _LOGGER.warning("Failed to fetch lake level (attempt %s/%s)", attempt + 1, retries)
@@ -64,24 +174,82 @@ class LakeLevelCoordinator(DataUpdateCoordinator[LakeMeasurement | None]):
                 _LOGGER.exception("Unexpected error fetching lake level", exc_info=err)
                 continue
             else:
-                return measurement
+                data = self._process_measurements(measurements)
+                # A failed forecast must not discard measurements that are
+                # already processed; the previous forecasts are kept.
+                try:
+                    self.forecasts = await self.hass.async_add_executor_job(
+                        _forecast, data
+                    )
+                except Exception as err:
+                    _LOGGER.exception("Failed to forecast lake levels", exc_info=err)
+                return data
 
         raise last_exception or LakeLevelError("Unknown error")
 
-    async def _schedule_updates(self) -> None:
+    def _process_measurements(
+        self, measurements: list[LakeMeasurement]
+    ) -> dict[str, LakeMeasurement]:
+        previous = self.data or {}
+        now = dt_util.utcnow()
+        data = {measurement.lake: measurement for measurement in measurements}
+        self._resolve_lake_names(data)
+        for lake, measurement in data.items():
+            if previous.get(lake) != measurement:
+                self.changed_at[lake] = now
+        # Trend sensors read from this in one batch rather than per entity.
+        self.trends = compute_trends(data.values())
+        self._fire_anomalies(data)
+        if list(data) != self._known_lakes:
+            self._known_lakes = list(data)
+            self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+        return data
+
+    def _resolve_lake_names(self, source_lakes: Iterable[str]) -> None:
+        # A lake missing from one fetch keeps its earlier spelling, so its
+        # sensors are not replaced under the configured name.
+        resolved = NameIndex(source_lakes).resolve_all(self._lakes)
+        self._lake_names = {
+            lake: self._lake_names.get(lake, name) if name == lake else name
+            for lake, name in resolved.items()
+        }
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        return {"lakes": self._known_lakes}
+
+    def _fire_anomalies(self, data: dict[str, LakeMeasurement]) -> None:
+        now = dt_util.now(dt_util.get_time_zone(SOURCE_TIMEZONE))
+        for measurement in data.values():
+            for event in self._detector.update(measurement, now):
+                self.hass.bus.async_fire(
+                    EVENT_ANOMALY,
+                    {
+                        "kind": event.kind,
+                        "river": event.river,
+                        "lake": event.lake,
+                        "level_m": float(event.level_m),
+                        "timestamp": event.timestamp,
+                        "detail": event.detail,
+                    },
+                )
+
+    def _cancel_schedule(self) -> None:
         for unsub in self._unsubs:
             if unsub:
                 unsub()
         self._unsubs = []
 
+    async def _schedule_updates(self) -> None:
+        self._cancel_schedule()
+
+        offset = await self._async_jitter_offset()
         unique_times = sorted(
-            {time(hour=t.hour, minute=t.minute) for t in self._fetch_times},
-            key=lambda t: (t.hour, t.minute),
+            {_shift(time(hour=t.hour, minute=t.minute), offset) for t in self._fetch_times}
         )
 
         @callback
         def _handle_time(_: datetime) -> None:
-            self.async_set_updated_data(None)
             self.hass.async_create_task(self.async_request_refresh())
 
         for fetch_time in unique_times:
@@ -90,13 +258,37 @@ class LakeLevelCoordinator(DataUpdateCoordinator[LakeMeasurement | None]):
                 _handle_time,
                 hour=fetch_time.hour,
                 minute=fetch_time.minute,
-                second=0,
+                second=fetch_time.second,
             )
             self._unsubs.append(unsub)
 
+    async def _async_jitter_offset(self) -> timedelta:
+        """Stable delay for this river within the jitter window.
+
+        The offset comes from the installation ID and the river, so entries
+        of the same river fire together and share one fetch, different rivers
+        are spread across the window, and installations do not line up.
+        """
+        window = int(self._jitter_window) * 60
+        if window <= 0:
+            return timedelta(0)
+        seed = f"{await instance_id.async_get(self.hass)}:{self._river}".encode()
+        digest = int.from_bytes(hashlib.sha256(seed).digest()[:8], "big")
+        return timedelta(seconds=digest % window)
+
     async def async_update_options(self, options: dict[str, Any]) -> None:
         if CONF_RETRIES in options:
             self._retries = options[CONF_RETRIES]
+        self._fetch_budget = options.get(CONF_FETCH_BUDGET, self._fetch_budget)
+        self._connect_timeout = options.get(CONF_CONNECT_TIMEOUT, self._connect_timeout)
+        self._read_timeout = options.get(CONF_READ_TIMEOUT, self._read_timeout)
+        if options.get(CONF_JITTER_WINDOW, self._jitter_window) != self._jitter_window:
+            self._jitter_window = options[CONF_JITTER_WINDOW]
+            await self._schedule_updates()
+        if CONF_LAKES in options or CONF_ALL_LAKES in options:
+            lakes_changed = self._apply_lake_options(options)
+        else:
+            lakes_changed = False
         if CONF_FETCH_TIMES in options or CONF_FETCH_TIME in options:
             config = {CONF_FETCH_TIMES: options.get(CONF_FETCH_TIMES)}
             if CONF_FETCH_TIME in options:
@@ -105,6 +297,34 @@ class LakeLevelCoordinator(DataUpdateCoordinator[LakeMeasurement | None]):
                 config[CONF_UPDATES_PER_DAY] = options[CONF_UPDATES_PER_DAY]
             self._fetch_times = self._parse_fetch_times(config)
             await self._schedule_updates()
+        if lakes_changed:
+            # Let the sensor platform add and remove entities right away, then
+            # fetch the newly selected lakes.
+            self.async_update_listeners()
+            await self.async_request_refresh()
+
+    def _apply_lake_options(self, options: dict[str, Any]) -> bool:
+        lakes = list(dict.fromkeys(options.get(CONF_LAKES, self._lakes)))
+        all_lakes = bool(options.get(CONF_ALL_LAKES, self._all_lakes))
+        if lakes == self._lakes and all_lakes == self._all_lakes:
+            return False
+
+        self._lakes = lakes
+        self._all_lakes = all_lakes
+        self._resolve_lake_names(self.data or self._known_lakes)
+        if self.data is not None and not all_lakes:
+            wanted = set(self.lakes)
+            for lake in set(self.data) - wanted:
+                self._detector.forget(self._river, lake)
+            self.data = {lake: m for lake, m in self.data.items() if lake in wanted}
+        return True
+
+    @staticmethod
+    def _parse_lakes(config: dict[str, Any]) -> list[str]:
+        lakes = config.get(CONF_LAKES)
+        if lakes is None and config.get(CONF_LAKE):
+            lakes = [config[CONF_LAKE]]
+        return list(dict.fromkeys(lakes or []))
 
     def _parse_fetch_times(self, config: dict[str, Any]) -> list[time]:
         times = config.get(CONF_FETCH_TIMES)
@@ -122,3 +342,33 @@ class LakeLevelCoordinator(DataUpdateCoordinator[LakeMeasurement | None]):
         if not parsed:
             parsed.append(parse_time(DEFAULT_FETCH_TIME) or time(6, 0))
         return parsed[:MAX_UPDATES_PER_DAY]
+
+
+def entry_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Storage for the state of one config entry that outlives restarts."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+
+
+def _select_lakes(
+    measurements: list[LakeMeasurement], lakes: list[str] | None
+) -> list[LakeMeasurement]:
+    if lakes is None:
+        return measurements
+    index = NameIndex(m.lake for m in measurements)
+    wanted = {index.resolve(lake) for lake in lakes}
+    return [m for m in measurements if m.lake in wanted]
+
+
+def _shift(fetch_time: time, offset: timedelta) -> time:
+    shifted = datetime.combine(datetime.min, fetch_time) + offset
+    return shifted.time()
+
+
+def _forecast(data: dict[str, LakeMeasurement]) -> dict[str, Forecast]:
+    from .lib import forecast_levels
+
+    today = dt_util.now(dt_util.get_time_zone(SOURCE_TIMEZONE)).date()
+    history = {lake: measurement_history(m, today) for lake, m in data.items()}
+    if not any(history.values()):
+        return {}
+    return forecast_levels(history, horizon_days=FORECAST_HORIZON_DAYS)
@@ -0,0 +1,150 @@
+"""River table fetches shared between config entries."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from functools import partial
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DATA_RIVER_FETCHES,
+    DATA_SOURCE_LISTS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    SOURCE_LISTS_TTL,
+)
+from .lib import ConditionalClient, Deadline, LakeMeasurement, SourceCatalog
+
+
+class RiverFetches:
+    """Coalesce concurrent fetches of the same river into one request.
+
+    Entries that follow different lakes of one river are scheduled at the
+    same moment, so whichever refresh starts first downloads the river table
+    and the others await the same result. The last successful result of
+    each river is kept so on-demand refreshes can be answered without a
+    request. Fetches revalidate the landing page and river tables with
+    conditional requests, so an unchanged table is neither downloaded nor
+    parsed again.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._client = ConditionalClient()
+        self._pending: dict[str, asyncio.Future[list[LakeMeasurement]]] = {}
+        self._latest: dict[str, tuple[float, list[LakeMeasurement]]] = {}
+
+    async def async_fetch(
+        self, river: str, deadline: Deadline, max_age: float = 0
+    ) -> list[LakeMeasurement]:
+        """Every lake of ``river``, from an in-flight fetch when there is one.
+
+        A result fetched less than ``max_age`` seconds ago is returned
+        without a new request.
+        """
+        cached = self.cached(river, max_age)
+        if cached is not None:
+            return cached
+        pending = self._pending.get(river)
+        if pending is None:
+            pending = self._hass.async_add_executor_job(self._fetch, river, deadline)
+            self._pending[river] = pending
+            pending.add_done_callback(partial(self._finished, river))
+        # One caller being cancelled must not cancel the fetch for the others.
+        return await asyncio.shield(pending)
+
+    def cached(self, river: str, max_age: float) -> list[LakeMeasurement] | None:
+        """The last result of ``river`` if it is younger than ``max_age`` seconds."""
+        latest = self._latest.get(river)
+        if latest is None or time.monotonic() - latest[0] >= max_age:
+            return None
+        return latest[1]
+
+    def _fetch(self, river: str, deadline: Deadline) -> list[LakeMeasurement]:
+        return list(self._client.fetch_river(river, deadline=deadline).measurements)
+
+    def _finished(
+        self, river: str, future: asyncio.Future[list[LakeMeasurement]]
+    ) -> None:
+        self._pending.pop(river, None)
+        if not future.cancelled() and future.exception() is None:
+            self._latest[river] = (time.monotonic(), future.result())
+
+
+class SourceLists:
+    """River and lake names for the config and options flows.
+
+    One :class:`SourceCatalog` answers every step and redisplay of a flow,
+    and flows opened shortly after each other, so the landing page and each
+    river table are downloaded once. Failed lookups are forgotten so the
+    next attempt retries, and the catalog is replaced after
+    ``SOURCE_LISTS_TTL`` seconds to pick up renamed rivers and lakes.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._catalog: SourceCatalog | None = None
+        self._created = 0.0
+        self._pending: dict[tuple[str, ...], asyncio.Future[list[str]]] = {}
+
+    async def async_rivers(self) -> list[str]:
+        """River names from the landing page."""
+        catalog = self._current()
+        return await asyncio.shield(self._lookup(("rivers",), catalog.rivers))
+
+    async def async_lakes(self, river: str) -> list[str]:
+        """Lake names of ``river``, from a prefetch when one was started."""
+        return await asyncio.shield(self.prefetch_lakes(river))
+
+    def prefetch_lakes(self, river: str) -> asyncio.Future[list[str]]:
+        """Start loading the lakes of ``river`` in the background."""
+        catalog = self._current()
+        return self._lookup(("lakes", river), partial(catalog.lakes, river))
+
+    def _current(self) -> SourceCatalog:
+        now = time.monotonic()
+        if self._catalog is None or now - self._created > SOURCE_LISTS_TTL:
+            self._catalog = SourceCatalog(
+                deadline=Deadline(
+                    connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                    read_timeout=DEFAULT_READ_TIMEOUT,
+                )
+            )
+            self._created = now
+            self._pending = {}
+        return self._catalog
+
+    def _lookup(
+        self, key: tuple[str, ...], target: Callable[[], list[str]]
+    ) -> asyncio.Future[list[str]]:
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._hass.async_add_executor_job(target)
+            self._pending[key] = pending
+            pending.add_done_callback(partial(self._forget_failed, key))
+        return pending
+
+    def _forget_failed(self, key: tuple[str, ...], future: asyncio.Future[list[str]]) -> None:
+        # Retrieving the exception also keeps unawaited prefetches quiet.
+        if future.cancelled() or future.exception() is not None:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+
+def river_fetches(hass: HomeAssistant) -> RiverFetches:
+    """The fetch coordinator shared by every entry of this installation."""
+    fetches: RiverFetches | None = hass.data.get(DATA_RIVER_FETCHES)
+    if fetches is None:
+        fetches = hass.data[DATA_RIVER_FETCHES] = RiverFetches(hass)
+    return fetches
+
+
+def source_lists(hass: HomeAssistant) -> SourceLists:
+    """The river and lake lists shared by every config and options flow."""
+    lists: SourceLists | None = hass.data.get(DATA_SOURCE_LISTS)
+    if lists is None:
+        lists = hass.data[DATA_SOURCE_LISTS] = SourceLists(hass)
+    return lists
@@ -2,39 +2,100 @@
 
 from __future__ import annotations
 
+from importlib import import_module
+from typing import Any
+
 try:  # pragma: no cover - executed when package installed separately
     from lakelevel import (  # type: ignore[import]
+        AnomalyDetector,
+        AnomalyEvent,
+        ConditionalClient,
         DEFAULT_LAKE,
         DEFAULT_RIVER,
         DEFAULT_TIMEOUT,
+        Deadline,
+        DeadlineExceeded,
         LakeLevelError,
         LakeMeasurement,
+        LakeTrend,
+        NameIndex,
+        SourceCatalog,
+        compute_trends,
         get_lake_level,
+        get_lake_levels,
         get_siljan_level,
         list_lakes,
         list_rivers,
+        measurement_history,
+        parse_day_label,
+        parse_measurement_time,
     )
+    from lakelevel.rollups import HOUR, Rollup, rollup  # type: ignore[import]
+
+    _ANALYSIS = "lakelevel.analysis"
 except Exception:  # pragma: no cover - fallback to vendored copy
     from ._vendor import (  # noqa: F401
         DEFAULT_LAKE,
         DEFAULT_RIVER,
         DEFAULT_TIMEOUT,
+        Deadline,
+        DeadlineExceeded,
         LakeLevelError,
         LakeMeasurement,
+        SourceCatalog,
         get_lake_level,
+        get_lake_levels,
         get_siljan_level,
         list_lakes,
         list_rivers,
+        measurement_history,
+        parse_day_label,
+        parse_measurement_time,
     )
+    from ._vendor_names import NameIndex  # noqa: F401
+    from ._vendor_anomaly import AnomalyDetector, AnomalyEvent  # noqa: F401
+    from ._vendor_trends import LakeTrend, compute_trends  # noqa: F401
+    from ._vendor_rollups import HOUR, Rollup, rollup  # noqa: F401
+    from ._vendor_conditional import ConditionalClient  # noqa: F401
+
+    _ANALYSIS = f"{__name__}._vendor_analysis"
 
 __all__ = [
+    "AnomalyDetector",
+    "AnomalyEvent",
+    "ConditionalClient",
     "DEFAULT_LAKE",
     "DEFAULT_RIVER",
     "DEFAULT_TIMEOUT",
+    "Deadline",
+    "DeadlineExceeded",
+    "Forecast",
+    "HOUR",
     "LakeLevelError",
     "LakeMeasurement",
+    "LakeTrend",
+    "NameIndex",
+    "Rollup",
+    "SourceCatalog",
+    "compute_trends",
+    "forecast_levels",
     "get_lake_level",
+    "get_lake_levels",
     "get_siljan_level",
     "list_lakes",
     "list_rivers",
+    "measurement_history",
+    "parse_day_label",
+    "parse_measurement_time",
+    "rollup",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Forecasting needs NumPy; import it on first use rather than when Home
+    # Assistant loads the integration.
+    if name in ("Forecast", "forecast_levels"):
+        value = getattr(import_module(_ANALYSIS), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
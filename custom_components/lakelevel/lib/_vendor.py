@@ -2,33 +2,148 @@
 
 from __future__ import annotations
 
+from contextvars import ContextVar
 from dataclasses import dataclass
+from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import Dict, List, Optional
+from functools import lru_cache
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urlencode
 
-import requests
-from bs4 import BeautifulSoup
+from ._vendor_names import NameIndex, fold_name
+
+if TYPE_CHECKING:
+    # requests and BeautifulSoup are imported on first fetch or parse so that
+    # importing the package (and ``lakelevel --help``) stays cheap.
+    import requests
+    from bs4 import BeautifulSoup
+    from bs4.element import Tag
 
 LAKE_LEVEL_URL = "https://login.vattenreglering.se/m/vattenstand.asp"
 DEFAULT_TIMEOUT = 180
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+PHASE_LANDING = "landing page"
+PHASE_RIVER_TABLE = "river table"
+PHASE_PARSE = "parsing"
 DEFAULT_RIVER = "Dalälven"
 DEFAULT_LAKE = "Siljan"
 _FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+# Deadline and phase of the request being sent, so transport adapters can
+# bound their own waits by the same budget.
+_REQUEST_DEADLINE: ContextVar[Optional[Tuple["Deadline", str]]] = ContextVar(
+    "lakelevel_request_deadline", default=None
+)
+_SOURCE_ENCODING = "iso-8859-1"
+# Cell layout of a row when the table has no header row to derive it from.
 _VALUE_CELL_INDEX = 8
 _TIMESTAMP_CELL_INDEX = 9
+_DAILY_CELL_INDEXES = range(2, 7)
+_REFERENCE_CELL_INDEXES = (10, 11, 12, 13)
+_VALUE_HEADERS = {"varde"}
+_TIMESTAMP_HEADERS = {"tid"}
+# Position of each reference column in ReferenceStats order when labelled.
+_REFERENCE_HEADERS = {"min": 0, "medel": 1, "max": 2, "period": 3}
+# Header cells of one group sit next to each other; groups are split by spacers.
+_HEADER_GROUPS = {"name": 0, "daily": 1}
+_SWEDISH_MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mar": 3,
+    "apr": 4,
+    "maj": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "okt": 10,
+    "nov": 11,
+    "dec": 12,
+}
+_DAY_LABEL_PATTERN = re.compile(r"([a-zåäö]{3})[a-zåäö]*\.?\s+(\d{1,2})")
+_CLOCK_PATTERN = re.compile(r"(\d{1,2}):(\d{2})")
 
 
 class LakeLevelError(RuntimeError):
     """Raised when a measurement cannot be parsed."""
 
 
+class UnknownNameError(LakeLevelError):
+    def __init__(self, message: str, suggestions: List[str]) -> None:
+        if suggestions:
+            message = f"{message}. Did you mean: {', '.join(suggestions)}?"
+        super().__init__(message)
+        self.suggestions = suggestions
+
+
+class DeadlineExceeded(LakeLevelError):
+    def __init__(self, phase: str, budget_s: float) -> None:
+        super().__init__(f"Time budget of {budget_s:g} s ran out during {phase}")
+        self.phase = phase
+        self.budget_s = budget_s
+
+
+class Deadline:
+    def __init__(
+        self,
+        budget_s: float | None = None,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget_s = budget_s
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._clock = clock
+        self._expires_at = None if budget_s is None else clock() + budget_s
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def remaining(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return self._expires_at - self._clock()
+
+    def check(self, phase: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(phase, self.budget_s or 0)
+
+    def request_timeout(self, phase: str) -> Tuple[float, float]:
+        self.check(phase)
+        remaining = self.remaining()
+        if remaining is None:
+            return self.connect_timeout, self.read_timeout
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+
+@dataclass(frozen=True)
+class DailyLevel:
+    label: str
+    level_m: Optional[Decimal]
+
+
+@dataclass(frozen=True)
+class ReferenceStats:
+    min_m: Decimal
+    mean_m: Decimal
+    max_m: Decimal
+    period: str
+
+
 @dataclass(frozen=True)
 class LakeMeasurement:
     river: str
     lake: str
     level_m: Decimal
     timestamp: str
+    daily: Tuple[DailyLevel, ...] = ()
+    reference: Optional[ReferenceStats] = None
 
 
 def get_lake_level(
@@ -36,31 +151,41 @@ def get_lake_level(
     lake: str,
     session: Optional[requests.Session] = None,
     timeout: float | None = None,
+    deadline: Optional[Deadline] = None,
 ) -> LakeMeasurement:
-    session = session or requests.Session()
-    resolved_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
-
-    landing_html = _prime_session(session, resolved_timeout)
-    river_options = _parse_river_options(landing_html)
+    deadline = _resolve_deadline(timeout, deadline)
+    label, table_html = _load_river_table(session, river, deadline)
+    deadline.check(PHASE_PARSE)
+    return parse_lake_level(table_html, label, lake)
 
-    river_key = _normalise(river)
-    if river_key not in river_options:
-        raise LakeLevelError(f"River '{river}' not found on source page")
 
-    table_html = _fetch_river_table(
-        session, river_options[river_key], resolved_timeout
-    )
-    return parse_lake_level(table_html, river, lake)
+def get_lake_levels(
+    river: str,
+    lakes: Optional[Iterable[str]] = None,
+    session: Optional[requests.Session] = None,
+    timeout: float | None = None,
+    deadline: Optional[Deadline] = None,
+) -> List[LakeMeasurement]:
+    deadline = _resolve_deadline(timeout, deadline)
+    label, table_html = _load_river_table(session, river, deadline)
+    deadline.check(PHASE_PARSE)
+    measurements = parse_lake_levels(table_html, label)
+    if lakes is None:
+        return measurements
+    return _filter_lakes(measurements, lakes)
 
 
 def get_siljan_level(
-    session: Optional[requests.Session] = None, timeout: float | None = None
+    session: Optional[requests.Session] = None,
+    timeout: float | None = None,
+    deadline: Optional[Deadline] = None,
 ) -> LakeMeasurement:
     return get_lake_level(
         DEFAULT_RIVER,
         DEFAULT_LAKE,
         session=session,
         timeout=timeout,
+        deadline=deadline,
     )
 
 
@@ -68,31 +193,25 @@ def list_lakes(
     river: str,
     session: Optional[requests.Session] = None,
     timeout: float | None = None,
+    deadline: Optional[Deadline] = None,
 ) -> List[str]:
-    session = session or requests.Session()
-    resolved_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
-
-    landing_html = _prime_session(session, resolved_timeout)
-    river_options = _parse_river_options(landing_html)
-
-    river_key = _normalise(river)
-    if river_key not in river_options:
-        raise LakeLevelError(f"River '{river}' not found on source page")
-
-    table_html = _fetch_river_table(
-        session, river_options[river_key], resolved_timeout
-    )
+    deadline = _resolve_deadline(timeout, deadline)
+    _, table_html = _load_river_table(session, river, deadline)
+    deadline.check(PHASE_PARSE)
     return _extract_lake_names(table_html)
 
 
 def list_rivers(
-    session: Optional[requests.Session] = None, timeout: float | None = None
+    session: Optional[requests.Session] = None,
+    timeout: float | None = None,
+    deadline: Optional[Deadline] = None,
 ) -> List[str]:
-    session = session or requests.Session()
-    resolved_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    session = session or _new_session()
+    deadline = _resolve_deadline(timeout, deadline)
 
-    landing_html = _prime_session(session, resolved_timeout)
-    soup = BeautifulSoup(landing_html, "html.parser")
+    landing_html = _prime_session(session, deadline)
+    deadline.check(PHASE_PARSE)
+    soup = _soup(landing_html)
     select = soup.find("select", attrs={"name": "Ralv"})
     if select is None:
         raise LakeLevelError("Could not find river dropdown on landing page")
@@ -103,95 +222,385 @@ def list_rivers(
     return rivers
 
 
+class SourceCatalog:
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float | None = None,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        self._session = session or _new_session()
+        self._deadline = _resolve_deadline(timeout, deadline)
+        self._lock = threading.Lock()
+        self._river_options: Optional[Dict[str, str]] = None
+        self._river_index = NameIndex(())
+        self._lakes: Dict[str, List[str]] = {}
+
+    def rivers(self) -> List[str]:
+        return list(self._options())
+
+    def lakes(self, river: str) -> List[str]:
+        options = self._options()
+        label = lookup_name(
+            self._river_index, river, f"River '{river}' not found on source page"
+        )
+        with self._lock:
+            lakes = self._lakes.get(label)
+        if lakes is None:
+            table_html = _fetch_river_table(self._session, options[label], self._deadline)
+            self._deadline.check(PHASE_PARSE)
+            lakes = _extract_lake_names(table_html)
+            with self._lock:
+                self._lakes[label] = lakes
+        return list(lakes)
+
+    def _options(self) -> Dict[str, str]:
+        # Held across the download so concurrent first calls share one GET.
+        with self._lock:
+            if self._river_options is None:
+                landing_html = _prime_session(self._session, self._deadline)
+                self._deadline.check(PHASE_PARSE)
+                self._river_options = dict(_river_choices(landing_html))
+                self._river_index = _name_index(tuple(self._river_options))
+            return self._river_options
+
+
 def parse_lake_level(html: str, river: str, lake_name: str) -> LakeMeasurement:
-    target = _normalise(lake_name)
-    soup = BeautifulSoup(html, "html.parser")
+    headers, rows = _read_table(html)
+    cells_by_name: Dict[str, List[Tag]] = {}
+    for name, cells in rows:
+        cells_by_name.setdefault(name, cells)
+    name = lookup_name(
+        _name_index(tuple(cells_by_name)),
+        lake_name,
+        f"Lake '{lake_name}' not found in river table",
+    )
+    cells = cells_by_name[name]
+    return _measurement_from_cells(river, name, cells, _column_schema(headers, len(cells)))
+
+
+def parse_lake_levels(html: str, river: str) -> List[LakeMeasurement]:
+    measurements: List[LakeMeasurement] = []
+    headers, rows = _read_table(html)
+    for name, cells in rows:
+        if not name:
+            continue
+        schema = _column_schema(headers, len(cells))
+        try:
+            measurements.append(_measurement_from_cells(river, name, cells, schema))
+        except LakeLevelError:
+            continue
+    return measurements
+
+
+def parse_day_label(label: str, today: date) -> Optional[date]:
+    match = _DAY_LABEL_PATTERN.search(label.lower())
+    if match is None:
+        return None
+    month = _SWEDISH_MONTHS.get(match.group(1))
+    if month is None:
+        return None
+
+    for year in (today.year, today.year - 1):
+        try:
+            candidate = date(year, month, int(match.group(2)))
+        except ValueError:
+            continue
+        # Allow one day of slack for readings published around midnight.
+        if candidate <= today + timedelta(days=1):
+            return candidate
+    return None
+
+
+def parse_measurement_time(timestamp: str, today: date) -> Optional[datetime]:
+    day = parse_day_label(timestamp, today)
+    clock = _CLOCK_PATTERN.search(timestamp)
+    if day is None or clock is None:
+        return None
+    hour, minute = int(clock.group(1)), int(clock.group(2))
+    if hour > 23 or minute > 59:
+        return None
+    return datetime(day.year, day.month, day.day, hour, minute)
+
+
+def measurement_history(
+    measurement: LakeMeasurement, today: date
+) -> List[Tuple[datetime, Decimal]]:
+    points: Dict[datetime, Decimal] = {}
+    for day in measurement.daily:
+        if day.level_m is None:
+            continue
+        resolved = parse_day_label(day.label, today)
+        if resolved is not None:
+            points[datetime(resolved.year, resolved.month, resolved.day)] = day.level_m
+
+    measured_at = parse_measurement_time(measurement.timestamp, today)
+    if measured_at is not None:
+        points[measured_at] = measurement.level_m
+    return sorted(points.items())
+
+
+def lookup_name(index: NameIndex, query: str, message: str) -> str:
+    name = index.resolve(query)
+    if name is None:
+        raise UnknownNameError(message, index.suggest(query))
+    return name
+
+
+@lru_cache(maxsize=128)
+def _name_index(names: Tuple[str, ...]) -> NameIndex:
+    return NameIndex(names)
+
+
+def _resolve_deadline(timeout: float | None, deadline: Optional[Deadline]) -> Deadline:
+    if deadline is not None:
+        return deadline
+    resolved_timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    return Deadline(connect_timeout=resolved_timeout, read_timeout=resolved_timeout)
+
+
+def _filter_lakes(
+    measurements: Iterable[LakeMeasurement], lakes: Iterable[str]
+) -> List[LakeMeasurement]:
+    measurements = list(measurements)
+    index = _name_index(tuple(m.lake for m in measurements))
+    wanted = {index.resolve(lake) for lake in lakes}
+    return [m for m in measurements if m.lake in wanted]
+
+
+def _load_river_table(
+    session: Optional[requests.Session], river: str, deadline: Deadline
+) -> Tuple[str, str]:
+    session = session or _new_session()
+
+    landing_html = _prime_session(session, deadline)
+    river_options = dict(_river_choices(landing_html))
+    label = lookup_name(
+        _name_index(tuple(river_options)), river, f"River '{river}' not found on source page"
+    )
+    return label, _fetch_river_table(session, river_options[label], deadline)
+
+
+@dataclass(frozen=True)
+class _ColumnSchema:
+    value: int
+    timestamp: int
+    daily: Tuple[Tuple[str, int], ...]
+    reference: Optional[Tuple[int, int, int, int]]
+
+
+def _new_session() -> requests.Session:
+    import requests
+
+    return requests.Session()
+
+
+def _soup(html: str) -> BeautifulSoup:
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser")
+
+
+def _read_table(html: str) -> Tuple[Tuple[str, ...], List[Tuple[str, List[Tag]]]]:
+    soup = _soup(html)
     table = soup.find("table", id="iseqchart")
     if table is None:
         raise LakeLevelError("Could not locate the lake data table in the response")
 
+    headers: Tuple[str, ...] = ()
+    rows: List[Tuple[str, List[Tag]]] = []
     for row in table.find_all("tr"):
-        first_cell = row.find("td")
-        if first_cell is None:
-            continue
-        cell_text = first_cell.get_text(strip=True)
-        if _normalise(cell_text) != target:
+        cells = row.find_all("td")
+        if not cells:
+            if not headers:
+                headers = tuple(cell.get_text(" ", strip=True) for cell in row.find_all("th"))
             continue
+        rows.append((cells[0].get_text(strip=True), cells))
+    return headers, rows
+
+
+@lru_cache(maxsize=64)
+def _column_schema(headers: Tuple[str, ...], width: int) -> _ColumnSchema:
+    if not headers:
+        return _ColumnSchema(
+            value=_VALUE_CELL_INDEX,
+            timestamp=_TIMESTAMP_CELL_INDEX,
+            daily=tuple(("", index) for index in _DAILY_CELL_INDEXES),
+            reference=_REFERENCE_CELL_INDEXES if width > max(_REFERENCE_CELL_INDEXES) else None,
+        )
 
-        cells = row.find_all("td")
-        if len(cells) <= max(_VALUE_CELL_INDEX, _TIMESTAMP_CELL_INDEX):
-            raise LakeLevelError(
-                f"Row for lake '{lake_name}' is missing expected columns"
-            )
-
-        value_text = cells[_VALUE_CELL_INDEX].get_text(strip=True).replace("\xa0", " ")
-        level = _parse_decimal(value_text)
-        timestamp = cells[_TIMESTAMP_CELL_INDEX].get_text(" ", strip=True).replace(
-            "\xa0", " "
+    kinds = [_header_kind(position, label) for position, label in enumerate(headers)]
+    groups = [_HEADER_GROUPS.get(kind, 2) for kind, _ in kinds]
+    boundaries = sum(1 for left, right in zip(groups, groups[1:]) if left != right)
+    spacers = max(0, min(boundaries, width - len(headers)))
+
+    value: Optional[int] = None
+    timestamp: Optional[int] = None
+    daily: List[Tuple[str, int]] = []
+    reference: List[Optional[int]] = [None] * len(_REFERENCE_HEADERS)
+    cell = 0
+    for position, (label, (kind, slot)) in enumerate(zip(headers, kinds)):
+        if position and groups[position] != groups[position - 1] and spacers:
+            cell += 1
+            spacers -= 1
+        if kind == "daily":
+            daily.append((label, cell))
+        elif kind == "value" and value is None:
+            value = cell
+        elif kind == "timestamp" and timestamp is None:
+            timestamp = cell
+        elif kind == "reference":
+            reference[slot] = cell
+        cell += 1
+
+    if value is None or timestamp is None:
+        raise LakeLevelError(
+            f"River table header has no value and time columns: {', '.join(headers)}"
         )
-        return LakeMeasurement(
-            river=river,
-            lake=cell_text,
-            level_m=level,
-            timestamp=timestamp,
+    if all(index is None for index in reference) and width - cell >= len(reference):
+        reference = list(range(cell, cell + len(reference)))
+    return _ColumnSchema(
+        value=value,
+        timestamp=timestamp,
+        daily=tuple(daily),
+        reference=None if None in reference else tuple(reference),  # type: ignore[arg-type]
+    )
+
+
+def _header_kind(position: int, label: str) -> Tuple[str, int]:
+    if position == 0:
+        return "name", 0
+    key = fold_name(label)
+    if key in _VALUE_HEADERS:
+        return "value", 0
+    if key in _TIMESTAMP_HEADERS:
+        return "timestamp", 0
+    if key in _REFERENCE_HEADERS:
+        return "reference", _REFERENCE_HEADERS[key]
+    match = _DAY_LABEL_PATTERN.search(label.lower())
+    if match and match.group(1) in _SWEDISH_MONTHS:
+        return "daily", 0
+    return "other", 0
+
+
+def _measurement_from_cells(
+    river: str, name: str, cells: List[Tag], schema: _ColumnSchema
+) -> LakeMeasurement:
+    if len(cells) <= max(schema.value, schema.timestamp):
+        raise LakeLevelError(f"Row for lake '{name}' is missing expected columns")
+
+    level = _parse_decimal(_cell_text(cells[schema.value]))
+    timestamp = cells[schema.timestamp].get_text(" ", strip=True).replace("\xa0", " ")
+    daily = tuple(
+        DailyLevel(
+            label=label,
+            level_m=_parse_optional_decimal(_cell_text(cells[index])) if index < len(cells) else None,
         )
+        for label, index in schema.daily
+    )
+    return LakeMeasurement(
+        river=river,
+        lake=name,
+        level_m=level,
+        timestamp=timestamp,
+        daily=daily,
+        reference=_parse_reference(cells, schema.reference),
+    )
+
 
-    raise LakeLevelError(f"Lake '{lake_name}' not found in river table")
+def _parse_reference(
+    cells: List[Tag], indexes: Optional[Tuple[int, int, int, int]]
+) -> Optional[ReferenceStats]:
+    if indexes is None or len(cells) <= max(indexes):
+        return None
+
+    min_index, mean_index, max_index, period_index = indexes
+    minimum = _parse_optional_decimal(_cell_text(cells[min_index]))
+    mean = _parse_optional_decimal(_cell_text(cells[mean_index]))
+    maximum = _parse_optional_decimal(_cell_text(cells[max_index]))
+    if minimum is None or mean is None or maximum is None:
+        return None
+    return ReferenceStats(
+        min_m=minimum,
+        mean_m=mean,
+        max_m=maximum,
+        period=_cell_text(cells[period_index]),
+    )
 
 
-def _prime_session(session: requests.Session, timeout: float) -> str:
-    response = session.get(LAKE_LEVEL_URL, timeout=timeout)
-    response.raise_for_status()
-    response.encoding = "iso-8859-1"
+def _cell_text(cell: Tag) -> str:
+    return cell.get_text(strip=True).replace("\xa0", " ")
+
+
+def _prime_session(session: requests.Session, deadline: Deadline) -> str:
+    response = _request(session, "GET", PHASE_LANDING, deadline)
+    response.encoding = _SOURCE_ENCODING
     return response.text
 
 
 def _fetch_river_table(
-    session: requests.Session, river_value: str, timeout: float
+    session: requests.Session, river_value: str, deadline: Deadline
 ) -> str:
-    body = urlencode({"Ralv": river_value}, encoding="iso-8859-1")
-    response = session.post(
-        LAKE_LEVEL_URL, data=body, headers=_FORM_HEADERS, timeout=timeout
+    return _fetch_river_content(session, river_value, deadline).decode(_SOURCE_ENCODING)
+
+
+def _fetch_river_content(
+    session: requests.Session, river_value: str, deadline: Deadline
+) -> bytes:
+    body = urlencode({"Ralv": river_value}, encoding=_SOURCE_ENCODING)
+    response = _request(
+        session, "POST", PHASE_RIVER_TABLE, deadline, data=body, headers=_FORM_HEADERS
     )
+    return response.content
+
+
+def _request(
+    session: requests.Session,
+    method: str,
+    phase: str,
+    deadline: Deadline,
+    **kwargs: object,
+) -> requests.Response:
+    import requests
+
+    token = _REQUEST_DEADLINE.set((deadline, phase))
+    try:
+        response = session.request(
+            method, LAKE_LEVEL_URL, timeout=deadline.request_timeout(phase), **kwargs
+        )
+    except requests.Timeout as exc:
+        if deadline.expired:
+            raise DeadlineExceeded(phase, deadline.budget_s or 0) from exc
+        raise
+    finally:
+        _REQUEST_DEADLINE.reset(token)
     response.raise_for_status()
-    response.encoding = "iso-8859-1"
-    return response.text
+    return response
 
 
-def _parse_river_options(html: str) -> Dict[str, str]:
-    soup = BeautifulSoup(html, "html.parser")
+def _river_choices(html: str) -> List[Tuple[str, str]]:
+    soup = _soup(html)
     select = soup.find("select", attrs={"name": "Ralv"})
     if select is None:
         raise LakeLevelError("Could not find river dropdown on landing page")
 
-    options: Dict[str, str] = {}
+    choices: List[Tuple[str, str]] = []
     for option in select.find_all("option"):
         value = option.get("value")
         label = option.get_text(strip=True)
         if not value or not label:
             continue
-        options[_normalise(label)] = value
+        choices.append((label, value))
 
-    if not options:
+    if not choices:
         raise LakeLevelError("No rivers discovered on landing page")
 
-    return options
+    return choices
 
 
 def _extract_lake_names(html: str) -> List[str]:
-    soup = BeautifulSoup(html, "html.parser")
-    table = soup.find("table", id="iseqchart")
-    if table is None:
-        raise LakeLevelError("Could not locate the lake data table in the response")
-
-    names: List[str] = []
-    for row in table.find_all("tr"):
-        first_cell = row.find("td")
-        if first_cell is None:
-            continue
-        name = first_cell.get_text(strip=True)
-        if name:
-            names.append(name)
+    _, rows = _read_table(html)
+    names = [name for name, _ in rows if name]
 
     if not names:
         raise LakeLevelError("No lake rows found in river table")
@@ -207,5 +616,11 @@ def _parse_decimal(value: str) -> Decimal:
         raise LakeLevelError(f"Could not parse numeric value '{value}'") from exc
 
 
-def _normalise(value: str) -> str:
-    return " ".join(value.strip().lower().split())
+def _parse_optional_decimal(value: str) -> Optional[Decimal]:
+    if not value.strip():
+        return None
+    try:
+        return _parse_decimal(value)
+    except LakeLevelError:
+        return None
+
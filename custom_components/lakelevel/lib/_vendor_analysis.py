@@ -0,0 +1,188 @@
+"""Vendored lake level analysis for Home Assistant integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from statistics import NormalDist
+from typing import Dict, Hashable, Mapping, Sequence, Tuple, TypeVar, Union
+
+import numpy as np
+
+Observation = Tuple[Union[date, datetime], Union[Decimal, float]]
+K = TypeVar("K", bound=Hashable)
+
+DEFAULT_HORIZON_DAYS = 7
+DEFAULT_WINDOW_DAYS = 14
+DEFAULT_CONFIDENCE = 0.95
+_DAYS_PER_YEAR = 366
+_SEASONAL_SMOOTHING_DAYS = 15
+_MIN_FIT_POINTS = 3
+
+
+@dataclass(frozen=True)
+class DailyGrid:
+    keys: Tuple[Hashable, ...]
+    start: date
+    values: np.ndarray
+
+    @property
+    def dates(self) -> np.ndarray:
+        return np.datetime64(self.start, "D") + np.arange(self.values.shape[1])
+
+
+@dataclass(frozen=True)
+class Forecast:
+    dates: Tuple[date, ...]
+    level_m: Tuple[float, ...]
+    lower_m: Tuple[float, ...]
+    upper_m: Tuple[float, ...]
+    slope_m_per_day: float
+
+
+def align_daily(history: Mapping[K, Sequence[Observation]]) -> DailyGrid:
+    keys = tuple(history)
+    days = [_as_date(moment) for points in history.values() for moment, _ in points]
+    if not days:
+        raise ValueError("No observations to align")
+
+    start = min(days)
+    values = np.full((len(keys), (max(days) - start).days + 1), np.nan)
+    for row, key in enumerate(keys):
+        points = sorted(history[key], key=lambda point: _as_datetime(point[0]))
+        if not points:
+            continue
+        offsets = np.fromiter(
+            ((_as_date(moment) - start).days for moment, _ in points),
+            dtype=np.int64,
+            count=len(points),
+        )
+        levels = np.fromiter((float(level) for _, level in points), dtype=float, count=len(points))
+        unique, first = np.unique(offsets[::-1], return_index=True)
+        values[row, unique] = levels[::-1][first]
+    return DailyGrid(keys=keys, start=start, values=values)
+
+
+def rolling_slope(values: np.ndarray, window: int) -> np.ndarray:
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    result = np.full(values.shape, np.nan)
+    if window < 2 or values.shape[1] < window:
+        return result
+
+    mask = ~np.isnan(values)
+    x = np.where(mask, np.arange(values.shape[1], dtype=float), 0.0)
+    y = np.where(mask, values, 0.0)
+    n, sx, sy, sxy, sxx = (
+        _window_sums(column, window) for column in (mask.astype(float), x, y, x * y, x * x)
+    )
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sxy - sx * sy) / denominator
+    slope[(n < 2) | (denominator <= 0)] = np.nan
+    result[:, window - 1 :] = slope
+    return result
+
+
+def seasonal_baseline(grid: DailyGrid) -> np.ndarray:
+    rows, _ = grid.values.shape
+    day_of_year = _day_of_year(grid.dates)
+    mask = ~np.isnan(grid.values)
+    row_index, column_index = np.nonzero(mask)
+
+    sums = np.zeros((rows, _DAYS_PER_YEAR))
+    counts = np.zeros((rows, _DAYS_PER_YEAR))
+    np.add.at(sums, (row_index, day_of_year[column_index]), grid.values[mask])
+    np.add.at(counts, (row_index, day_of_year[column_index]), 1.0)
+
+    half = _SEASONAL_SMOOTHING_DAYS // 2
+    smoothed_sums = _window_sums(_wrap(sums, half), _SEASONAL_SMOOTHING_DAYS)
+    smoothed_counts = _window_sums(_wrap(counts, half), _SEASONAL_SMOOTHING_DAYS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(smoothed_counts > 0, smoothed_sums / smoothed_counts, np.nan)
+
+
+def forecast_levels(
+    history: Mapping[K, Sequence[Observation]],
+    horizon_days: int = DEFAULT_HORIZON_DAYS,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seasonal: bool = True,
+) -> Dict[K, Forecast]:
+    if horizon_days < 1:
+        raise ValueError("horizon_days must be at least 1")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+
+    grid = align_daily(history)
+    values = grid.values
+    rows, steps = values.shape
+    future_x = np.arange(steps, steps + horizon_days, dtype=float)
+    future_dates = grid.dates[-1] + np.arange(1, horizon_days + 1)
+
+    adjustment = np.zeros_like(values)
+    future_adjustment = np.zeros((rows, horizon_days))
+    if seasonal and steps >= 365:
+        baseline = seasonal_baseline(grid)
+        covered = ~np.isnan(baseline).any(axis=1)
+        adjustment[covered] = baseline[covered][:, _day_of_year(grid.dates)]
+        future_adjustment[covered] = baseline[covered][:, _day_of_year(future_dates)]
+
+    window = min(window_days, steps)
+    recent = (values - adjustment)[:, -window:]
+    x = np.arange(steps - window, steps, dtype=float)
+    mask = ~np.isnan(recent)
+    n = mask.sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = np.where(mask, x, 0.0).sum(axis=1) / n
+        mean_y = np.where(mask, recent, 0.0).sum(axis=1) / n
+        dx = np.where(mask, x - mean_x[:, None], 0.0)
+        dy = np.where(mask, recent - mean_y[:, None], 0.0)
+        sxx = (dx * dx).sum(axis=1)
+        slope = (dx * dy).sum(axis=1) / sxx
+        intercept = mean_y - slope * mean_x
+        residuals = np.where(mask, recent - (intercept[:, None] + slope[:, None] * x), 0.0)
+        sigma = np.sqrt((residuals * residuals).sum(axis=1) / (n - 2))
+
+        predicted = intercept[:, None] + slope[:, None] * future_x + future_adjustment
+        spread = sigma[:, None] * np.sqrt(
+            1.0 + 1.0 / n[:, None] + (future_x - mean_x[:, None]) ** 2 / sxx[:, None]
+        )
+    band = NormalDist().inv_cdf(0.5 + confidence / 2) * spread
+
+    dates = tuple(day.item() for day in future_dates)
+    forecasts: Dict[K, Forecast] = {}
+    for row in np.flatnonzero((n >= _MIN_FIT_POINTS) & (sxx > 0)):
+        forecasts[grid.keys[row]] = Forecast(
+            dates=dates,
+            level_m=tuple(predicted[row].tolist()),
+            lower_m=tuple((predicted[row] - band[row]).tolist()),
+            upper_m=tuple((predicted[row] + band[row]).tolist()),
+            slope_m_per_day=float(slope[row]),
+        )
+    return forecasts
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    cumulative = np.cumsum(values, axis=1)
+    cumulative = np.concatenate([np.zeros((values.shape[0], 1)), cumulative], axis=1)
+    return cumulative[:, window:] - cumulative[:, :-window]
+
+
+def _wrap(values: np.ndarray, width: int) -> np.ndarray:
+    return np.concatenate([values[:, -width:], values, values[:, :width]], axis=1)
+
+
+def _day_of_year(dates: np.ndarray) -> np.ndarray:
+    return (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+
+
+def _as_date(moment: Union[date, datetime]) -> date:
+    return moment.date() if isinstance(moment, datetime) else moment
+
+
+def _as_datetime(moment: Union[date, datetime]) -> datetime:
+    if isinstance(moment, datetime):
+        return moment
+    return datetime(moment.year, moment.month, moment.day)
@@ -0,0 +1,160 @@
+"""Vendored anomaly detection for Home Assistant integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from ._vendor import LakeMeasurement, parse_measurement_time
+
+BELOW_BAND = "below_reference_min"
+ABOVE_BAND = "above_reference_max"
+BACK_IN_BAND = "back_in_band"
+RAPID_CHANGE = "rapid_change"
+STALLED = "stalled"
+
+DEFAULT_RAPID_CHANGE_M_PER_DAY = Decimal("0.10")
+DEFAULT_STALL_AFTER = timedelta(days=2)
+
+_INSIDE = "inside"
+_UNKNOWN = "unknown"
+_SECONDS_PER_DAY = Decimal(86400)
+
+
+@dataclass(frozen=True)
+class AnomalyEvent:
+    kind: str
+    river: str
+    lake: str
+    level_m: Decimal
+    timestamp: str
+    detail: str
+
+
+@dataclass
+class _LakeState:
+    band: str
+    level_m: Decimal
+    timestamp: str
+    measured_at: Optional[datetime]
+    advanced_at: datetime
+    stall_reported: bool = False
+
+
+class AnomalyDetector:
+    def __init__(
+        self,
+        rapid_change_m_per_day: Decimal = DEFAULT_RAPID_CHANGE_M_PER_DAY,
+        stall_after: timedelta = DEFAULT_STALL_AFTER,
+    ) -> None:
+        self._rapid_change = rapid_change_m_per_day
+        self._stall_after = stall_after
+        self._states: Dict[Tuple[str, str], _LakeState] = {}
+
+    def update(
+        self, measurement: LakeMeasurement, now: Optional[datetime] = None
+    ) -> List[AnomalyEvent]:
+        now = now or datetime.now()
+        key = (measurement.river, measurement.lake)
+        previous = self._states.get(key)
+        measured_at = parse_measurement_time(measurement.timestamp, now.date())
+        band = _band(measurement)
+        events: List[AnomalyEvent] = []
+
+        if previous is None:
+            state = _LakeState(
+                band=band,
+                level_m=measurement.level_m,
+                timestamp=measurement.timestamp,
+                measured_at=measured_at,
+                advanced_at=now,
+            )
+            self._states[key] = state
+            if band not in (_INSIDE, _UNKNOWN):
+                events.append(_event(band, measurement, _band_detail(measurement)))
+            rate = _first_rate(measurement)
+        else:
+            state = previous
+            if band != state.band and band != _UNKNOWN:
+                if band != _INSIDE:
+                    events.append(_event(band, measurement, _band_detail(measurement)))
+                elif state.band != _UNKNOWN:
+                    events.append(_event(BACK_IN_BAND, measurement, _band_detail(measurement)))
+                state.band = band
+
+            rate = None
+            if measurement.timestamp != state.timestamp:
+                rate = _rate(state.level_m, state.measured_at, measurement.level_m, measured_at)
+                state.level_m = measurement.level_m
+                state.timestamp = measurement.timestamp
+                state.measured_at = measured_at
+                state.advanced_at = now
+                state.stall_reported = False
+            elif not state.stall_reported and now - state.advanced_at >= self._stall_after:
+                state.stall_reported = True
+                events.append(
+                    _event(
+                        STALLED,
+                        measurement,
+                        f"timestamp unchanged since {state.advanced_at.isoformat()}",
+                    )
+                )
+
+        if rate is not None and abs(rate) >= self._rapid_change:
+            events.append(
+                _event(RAPID_CHANGE, measurement, f"{rate:+.3f} m/day")
+            )
+        return events
+
+    def forget(self, river: str, lake: str) -> None:
+        self._states.pop((river, lake), None)
+
+
+def _band(measurement: LakeMeasurement) -> str:
+    reference = measurement.reference
+    if reference is None:
+        return _UNKNOWN
+    if measurement.level_m < reference.min_m:
+        return BELOW_BAND
+    if measurement.level_m > reference.max_m:
+        return ABOVE_BAND
+    return _INSIDE
+
+
+def _band_detail(measurement: LakeMeasurement) -> str:
+    reference = measurement.reference
+    if reference is None:  # pragma: no cover - only called with a known band
+        return ""
+    return f"reference {reference.min_m}–{reference.max_m} m ({reference.period})"
+
+
+def _first_rate(measurement: LakeMeasurement) -> Optional[Decimal]:
+    # Without a previous reading, compare against yesterday's daily column.
+    if len(measurement.daily) < 2 or measurement.daily[-2].level_m is None:
+        return None
+    return measurement.level_m - measurement.daily[-2].level_m
+
+
+def _rate(
+    previous_level: Decimal,
+    previous_at: Optional[datetime],
+    level: Decimal,
+    measured_at: Optional[datetime],
+) -> Optional[Decimal]:
+    if previous_at is None or measured_at is None or measured_at <= previous_at:
+        return None
+    elapsed = Decimal((measured_at - previous_at).total_seconds())
+    return (level - previous_level) * _SECONDS_PER_DAY / elapsed
+
+
+def _event(kind: str, measurement: LakeMeasurement, detail: str) -> AnomalyEvent:
+    return AnomalyEvent(
+        kind=kind,
+        river=measurement.river,
+        lake=measurement.lake,
+        level_m=measurement.level_m,
+        timestamp=measurement.timestamp,
+        detail=detail,
+    )
@@ -0,0 +1,75 @@
+"""Vendored name index for Home Assistant integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, Iterator, List, Optional
+import unicodedata
+
+DEFAULT_SUGGESTIONS = 5
+_MIN_SIMILARITY = 0.6
+
+
+def normalise_name(value: str) -> str:
+    return " ".join(value.strip().casefold().split())
+
+
+def fold_name(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return normalise_name(stripped)
+
+
+class NameIndex:
+    def __init__(self, names: Iterable[str]) -> None:
+        self._names: List[str] = list(dict.fromkeys(name for name in names if name.strip()))
+        self._exact: Dict[str, str] = {}
+        self._folded: Dict[str, List[str]] = {}
+        for name in self._names:
+            self._exact.setdefault(normalise_name(name), name)
+            self._folded.setdefault(fold_name(name), []).append(name)
+        self._sorted_keys = sorted(self._folded)
+
+    def __contains__(self, query: object) -> bool:
+        return isinstance(query, str) and self.resolve(query) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def resolve(self, query: str) -> Optional[str]:
+        exact = self._exact.get(normalise_name(query))
+        if exact is not None:
+            return exact
+        folded = self._folded.get(fold_name(query), [])
+        return folded[0] if len(folded) == 1 else None
+
+    def resolve_all(self, queries: Iterable[str]) -> Dict[str, str]:
+        return {query: self.resolve(query) or query for query in queries}
+
+    def prefix(self, query: str) -> List[str]:
+        key = fold_name(query)
+        matches: List[str] = []
+        for position in range(bisect_left(self._sorted_keys, key), len(self._sorted_keys)):
+            candidate = self._sorted_keys[position]
+            if not candidate.startswith(key):
+                break
+            matches.extend(self._folded[candidate])
+        return matches
+
+    def suggest(self, query: str, limit: int = DEFAULT_SUGGESTIONS) -> List[str]:
+        key = fold_name(query)
+        ranked = self.prefix(query)
+        scored = []
+        for candidate in self._sorted_keys:
+            if candidate.startswith(key):
+                continue
+            ratio = SequenceMatcher(None, key, candidate).ratio()
+            if ratio >= _MIN_SIMILARITY:
+                scored.append((-ratio, candidate))
+        for _, candidate in sorted(scored):
+            ranked.extend(self._folded[candidate])
+        return ranked[:limit]
@@ -0,0 +1,127 @@
+"""Vendored rollup helpers for Home Assistant integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+RAW = "raw"
+HOUR = "hour"
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+# Resolutions a history can be queried at, finest first.
+RESOLUTIONS = (RAW, DAY, WEEK, MONTH)
+ROLLUP_RESOLUTIONS = (DAY, WEEK, MONTH)
+# Points per series a range query returns unless asked otherwise.
+DEFAULT_MAX_POINTS = 500
+
+_MEAN_QUANTUM = Decimal("0.0001")
+
+Point = Tuple[datetime, Decimal]
+
+
+@dataclass(frozen=True)
+class Rollup:
+    start: datetime
+    min_m: Decimal
+    max_m: Decimal
+    mean_m: Decimal
+    last_m: Decimal
+    last_at: datetime
+    count: int
+
+
+def bucket_start(when: datetime, resolution: str) -> datetime:
+    if resolution == RAW:
+        return when
+    if resolution == HOUR:
+        return when.replace(minute=0, second=0, microsecond=0)
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if resolution == DAY:
+        return day
+    if resolution == WEEK:
+        return day - timedelta(days=day.weekday())
+    if resolution == MONTH:
+        return day.replace(day=1)
+    raise ValueError(f"Unknown resolution '{resolution}'")
+
+
+def next_bucket(start: datetime, resolution: str) -> datetime:
+    if resolution == HOUR:
+        return start + timedelta(hours=1)
+    if resolution == DAY:
+        return start + timedelta(days=1)
+    if resolution == WEEK:
+        return start + timedelta(days=7)
+    if resolution == MONTH:
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    raise ValueError(f"Resolution '{resolution}' has no fixed buckets")
+
+
+def rollup(points: Iterable[Point], resolution: str) -> List[Rollup]:
+    buckets: Dict[datetime, List[Point]] = {}
+    for when, level in sorted(points, key=lambda point: point[0]):
+        buckets.setdefault(bucket_start(when, resolution), []).append((when, level))
+    return [_summarise(start, bucket) for start, bucket in buckets.items()]
+
+
+def downsample(rollups: Sequence[Rollup], max_points: int) -> List[Rollup]:
+    if max_points < 1:
+        raise ValueError("max_points must be at least 1")
+    if len(rollups) <= max_points:
+        return list(rollups)
+    if max_points == 1:
+        return [rollups[-1]]
+    if max_points == 2:
+        return [rollups[0], rollups[-1]]
+
+    origin = rollups[0].start
+    xs = [(item.start - origin).total_seconds() for item in rollups]
+    ys = [float(item.mean_m) for item in rollups]
+    width = (len(rollups) - 2) / (max_points - 2)
+
+    selected = [rollups[0]]
+    previous = 0
+    for bucket in range(max_points - 2):
+        first = int(bucket * width) + 1
+        stop = int((bucket + 1) * width) + 1
+        # Average of the following bucket is the third corner.
+        next_stop = min(int((bucket + 2) * width) + 1, len(rollups))
+        if bucket == max_points - 3:
+            next_x, next_y = xs[-1], ys[-1]
+        else:
+            span = range(stop, next_stop)
+            next_x = sum(xs[i] for i in span) / len(span)
+            next_y = sum(ys[i] for i in span) / len(span)
+
+        best, best_area = first, -1.0
+        for index in range(first, stop):
+            area = abs(
+                (xs[previous] - next_x) * (ys[index] - ys[previous])
+                - (xs[previous] - xs[index]) * (next_y - ys[previous])
+            )
+            if area > best_area:
+                best, best_area = index, area
+        selected.append(rollups[best])
+        previous = best
+    selected.append(rollups[-1])
+    return selected
+
+
+def _summarise(start: datetime, points: List[Point]) -> Rollup:
+    levels = [level for _, level in points]
+    mean = sum(levels, Decimal(0)) / len(levels)
+    return Rollup(
+        start=start,
+        min_m=min(levels),
+        max_m=max(levels),
+        mean_m=mean.quantize(_MEAN_QUANTUM),
+        last_m=levels[-1],
+        last_at=points[-1][0],
+        count=len(levels),
+    )
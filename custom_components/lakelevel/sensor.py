@@ -2,17 +2,83 @@
 
 from __future__ import annotations
 
-from decimal import Decimal
-from typing import Any
+from collections.abc import Callable
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Any
 
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_LAKE, CONF_RIVER, DOMAIN
+from .const import DOMAIN
 from .coordinator import LakeLevelCoordinator
+from .lib import LakeMeasurement, LakeTrend
+
+if TYPE_CHECKING:
+    from .lib import Forecast
+
+ATTR_RIVER = "river"
+ATTR_TIMESTAMP = "timestamp"
+ATTR_CHANGED_AT = "changed_at"
+# Written by earlier versions; restored as changed_at.
+ATTR_FETCHED_AT = "fetched_at"
+ATTR_RESTORED = "restored"
+ATTR_AGE = "age_seconds"
+ATTR_FORECAST = "forecast"
+ATTR_SLOPE = "slope_m_per_day"
+
+
+@dataclass(frozen=True, kw_only=True)
+class LakeTrendSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor derived from a lake's history columns."""
+
+    value_fn: Callable[[LakeTrend], Decimal | None]
+
+
+TREND_SENSORS: tuple[LakeTrendSensorEntityDescription, ...] = (
+    LakeTrendSensorEntityDescription(
+        key="change_24h",
+        name="24 h change",
+        native_unit_of_measurement="m",
+        value_fn=lambda trend: trend.change_24h_m,
+    ),
+    LakeTrendSensorEntityDescription(
+        key="change_5d",
+        name="5 day change",
+        native_unit_of_measurement="m",
+        value_fn=lambda trend: trend.change_5d_m,
+    ),
+    LakeTrendSensorEntityDescription(
+        key="rate",
+        name="rate of change",
+        native_unit_of_measurement="m/d",
+        value_fn=lambda trend: trend.rate_m_per_day,
+    ),
+    LakeTrendSensorEntityDescription(
+        key="deviation_from_mean",
+        name="deviation from reference mean",
+        native_unit_of_measurement="m",
+        value_fn=lambda trend: trend.deviation_from_mean_m,
+    ),
+    LakeTrendSensorEntityDescription(
+        key="band_position",
+        name="reference band position",
+        native_unit_of_measurement="%",
+        value_fn=lambda trend: trend.band_position_pct,
+    ),
+)
 
 
 async def async_setup_entry(
@@ -22,34 +88,209 @@ async def async_setup_entry(
 ) -> None:
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: LakeLevelCoordinator = data["coordinator"]
-    async_add_entities([LakeLevelSensor(coordinator, entry.data)])
+    entities: dict[str, list[SensorEntity]] = {}
 
+    @callback
+    def _async_sync_lakes() -> None:
+        wanted = coordinator.lakes
+        registry = er.async_get(hass)
+        for lake in [lake for lake in entities if lake not in wanted]:
+            for entity in entities.pop(lake):
+                if entity.registry_entry is not None:
+                    registry.async_remove(entity.entity_id)
+                else:
+                    hass.async_create_task(entity.async_remove())
 
-class LakeLevelSensor(CoordinatorEntity[LakeLevelCoordinator], SensorEntity):
+        new_entities: list[SensorEntity] = []
+        for lake in wanted:
+            if lake in entities:
+                continue
+            lake_entities: list[SensorEntity] = [LakeLevelSensor(coordinator, lake)]
+            lake_entities.extend(
+                LakeTrendSensor(coordinator, lake, description)
+                for description in TREND_SENSORS
+            )
+            lake_entities.append(LakeForecastSensor(coordinator, lake))
+            entities[lake] = lake_entities
+            new_entities.extend(lake_entities)
+        if new_entities:
+            async_add_entities(new_entities)
+
+    _async_sync_lakes()
+    entry.async_on_unload(coordinator.async_add_listener(_async_sync_lakes))
+
+
+def river_device_info(river: str) -> DeviceInfo:
+    """Device shared by every lake sensor of a river."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, river.lower())},
+        name=river,
+        manufacturer="Vattenregleringsföretagen",
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+class LakeLevelSensor(CoordinatorEntity[LakeLevelCoordinator], RestoreSensor):
     _attr_device_class = SensorDeviceClass.DISTANCE
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "m"
 
-    def __init__(self, coordinator: LakeLevelCoordinator, config: dict[str, Any]) -> None:
+    def __init__(self, coordinator: LakeLevelCoordinator, lake: str) -> None:
         super().__init__(coordinator)
-        self._lake = config[CONF_LAKE]
-        self._river = config[CONF_RIVER]
+        self._lake = lake
+        self._river = coordinator.river
         self._attr_name = f"{self._lake} water level"
         self._attr_unique_id = f"lakelevel_{self._river}_{self._lake}".lower().replace(" ", "_")
+        self._attr_device_info = river_device_info(self._river)
+        self._restored_value: Decimal | None = None
+        self._restored_attributes: dict[str, Any] = {}
+
+    @property
+    def lake(self) -> str:
+        return self._lake
+
+    @property
+    def measurement(self) -> LakeMeasurement | None:
+        data = self.coordinator.data
+        return data.get(self._lake) if data else None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self.measurement is not None:
+            return
+
+        last_data = await self.async_get_last_sensor_data()
+        if last_data is None or last_data.native_value is None:
+            return
+        try:
+            self._restored_value = Decimal(str(last_data.native_value))
+        except InvalidOperation:
+            return
+
+        last_state = await self.async_get_last_state()
+        if last_state is None:
+            return
+        attributes = last_state.attributes
+        self._restored_attributes = {
+            key: attributes[key] for key in (ATTR_RIVER, ATTR_TIMESTAMP) if key in attributes
+        }
+        # States written before changed_at existed still carry a usable age.
+        self._restored_attributes[ATTR_CHANGED_AT] = attributes.get(
+            ATTR_CHANGED_AT,
+            attributes.get(ATTR_FETCHED_AT, last_state.last_updated.isoformat()),
+        )
+
+    @property
+    def available(self) -> bool:
+        if self.measurement is None and self._restored_value is not None:
+            return True
+        return super().available
 
     @property
     def native_value(self) -> Decimal | None:
+        measurement = self.measurement
+        if measurement is None:
+            return self._restored_value
         if not self.coordinator.last_update_success:
             return None
-        data = self.coordinator.data
-        return data.level_m if data else None
+        return measurement.level_m
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
-        data = self.coordinator.data
-        if not data:
+        measurement = self.measurement
+        if measurement is None:
+            return self._restored_state_attributes()
+        attributes: dict[str, Any] = {
+            ATTR_RIVER: measurement.river,
+            ATTR_TIMESTAMP: measurement.timestamp,
+        }
+        changed_at = self.coordinator.changed_at.get(self._lake)
+        if changed_at is not None:
+            attributes[ATTR_CHANGED_AT] = changed_at.isoformat()
+        return attributes
+
+    def _restored_state_attributes(self) -> dict[str, Any] | None:
+        if self._restored_value is None:
+            return None
+        attributes = dict(self._restored_attributes)
+        attributes[ATTR_RESTORED] = True
+        changed_at = dt_util.parse_datetime(str(attributes.get(ATTR_CHANGED_AT, "")))
+        if changed_at is not None:
+            attributes[ATTR_AGE] = int((dt_util.utcnow() - changed_at).total_seconds())
+        return attributes
+
+
+class LakeTrendSensor(CoordinatorEntity[LakeLevelCoordinator], SensorEntity):
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    entity_description: LakeTrendSensorEntityDescription
+
+    def __init__(
+        self,
+        coordinator: LakeLevelCoordinator,
+        lake: str,
+        description: LakeTrendSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._lake = lake
+        river = coordinator.river
+        self._attr_name = f"{lake} {description.name}"
+        self._attr_unique_id = (
+            f"lakelevel_{river}_{lake}_{description.key}".lower().replace(" ", "_")
+        )
+        self._attr_device_info = river_device_info(river)
+
+    @property
+    def native_value(self) -> Decimal | None:
+        if not self.coordinator.last_update_success:
+            return None
+        trend = self.coordinator.trends.get(self._lake)
+        return self.entity_description.value_fn(trend) if trend else None
+
+
+class LakeForecastSensor(CoordinatorEntity[LakeLevelCoordinator], SensorEntity):
+    """Forecast level at the end of the horizon, with the daily path as attribute."""
+
+    _attr_device_class = SensorDeviceClass.DISTANCE
+    _attr_native_unit_of_measurement = "m"
+    _unrecorded_attributes = frozenset({ATTR_FORECAST})
+
+    def __init__(self, coordinator: LakeLevelCoordinator, lake: str) -> None:
+        super().__init__(coordinator)
+        self._lake = lake
+        river = coordinator.river
+        self._attr_name = f"{lake} forecast"
+        self._attr_unique_id = f"lakelevel_{river}_{lake}_forecast".lower().replace(" ", "_")
+        self._attr_device_info = river_device_info(river)
+
+    @property
+    def _forecast(self) -> Forecast | None:
+        if not self.coordinator.last_update_success:
+            return None
+        return self.coordinator.forecasts.get(self._lake)
+
+    @property
+    def native_value(self) -> float | None:
+        forecast = self._forecast
+        return round(forecast.level_m[-1], 3) if forecast else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        forecast = self._forecast
+        if forecast is None:
             return None
         return {
-            "river": data.river,
-            "timestamp": data.timestamp,
+            ATTR_SLOPE: round(forecast.slope_m_per_day, 4),
+            ATTR_FORECAST: [
+                {
+                    "date": day.isoformat(),
+                    "level_m": round(level, 3),
+                    "lower_m": round(lower, 3),
+                    "upper_m": round(upper, 3),
+                }
+                for day, level, lower, upper in zip(
+                    forecast.dates, forecast.level_m, forecast.lower_m, forecast.upper_m
+                )
+            ],
         }
@@ -0,0 +1,227 @@
+"""Services for the Lake Level integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+import logging
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util, slugify
+
+from .bulk import async_import_entries, rows_from_csv
+from .const import DOMAIN, MIN_REFRESH_INTERVAL, SOURCE_TIMEZONE
+from .coordinator import LakeLevelCoordinator
+from .fetch import river_fetches
+from .lib import HOUR, LakeMeasurement, NameIndex, Rollup, measurement_history, rollup
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_IMPORT_HISTORY = "import_history"
+SERVICE_IMPORT_ENTRIES = "import_entries"
+SERVICE_REFRESH = "refresh"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_RIVER = "river"
+ATTR_ENTRIES = "entries"
+ATTR_CSV = "csv"
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string])}
+)
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_RIVER): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+IMPORT_ENTRIES_SCHEMA = vol.Schema(
+    {
+        vol.Exclusive(ATTR_ENTRIES, "rows"): vol.All(cv.ensure_list, [dict]),
+        vol.Exclusive(ATTR_CSV, "rows"): cv.string,
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration-wide services."""
+
+    async def _async_import_history(call: ServiceCall) -> ServiceResponse:
+        imported: dict[str, int] = {}
+        for coordinator in _coordinators_for_call(hass, call):
+            if coordinator.data is None:
+                await coordinator.async_refresh()
+            for measurement in (coordinator.data or {}).values():
+                statistic_id = statistic_id_for(measurement)
+                imported[statistic_id] = await _async_import_measurement(
+                    hass, statistic_id, measurement
+                )
+        return {"imported": imported}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        _async_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_refresh(call: ServiceCall) -> ServiceResponse:
+        coordinators = _coordinators_for_refresh(hass, call)
+        fetches = river_fetches(hass)
+        rivers: dict[str, dict[str, Any]] = {}
+        for entry_id, coordinator in coordinators.items():
+            river = rivers.setdefault(
+                coordinator.river,
+                {
+                    "cached": fetches.cached(coordinator.river, MIN_REFRESH_INTERVAL)
+                    is not None,
+                    "entries": {},
+                },
+            )
+            river["entries"][entry_id] = None
+        # Entries of one river share a single fetch through RiverFetches.
+        results = await asyncio.gather(
+            *(coordinator.async_refresh_on_demand() for coordinator in coordinators.values())
+        )
+        for (entry_id, coordinator), success in zip(coordinators.items(), results):
+            rivers[coordinator.river]["entries"][entry_id] = success
+        return {"rivers": rivers}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REFRESH,
+        _async_refresh,
+        schema=REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def _async_import_entries(call: ServiceCall) -> ServiceResponse:
+        if ATTR_CSV in call.data:
+            rows = rows_from_csv(call.data[ATTR_CSV])
+        elif ATTR_ENTRIES in call.data:
+            rows = call.data[ATTR_ENTRIES]
+        else:
+            raise ServiceValidationError("Provide either entries or csv")
+        return await async_import_entries(hass, rows)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_ENTRIES,
+        _async_import_entries,
+        schema=IMPORT_ENTRIES_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+def statistic_id_for(measurement: LakeMeasurement) -> str:
+    """External statistic that holds the imported history of a lake."""
+    return f"{DOMAIN}:{slugify(measurement.river)}_{slugify(measurement.lake)}"
+
+
+def hourly_rollups(measurement: LakeMeasurement, today: date) -> list[Rollup]:
+    """Roll the daily columns and the current reading up into hourly buckets.
+
+    Readings that share an hour become one row with their min, max and mean.
+    """
+    source_tz = dt_util.get_time_zone(SOURCE_TIMEZONE)
+    return rollup(
+        (
+            (observed_at.replace(tzinfo=source_tz), level)
+            for observed_at, level in measurement_history(measurement, today)
+        ),
+        HOUR,
+    )
+
+
+async def _async_import_measurement(
+    hass: HomeAssistant, statistic_id: str, measurement: LakeMeasurement
+) -> int:
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, statistic_id, True, {"mean"}
+    )
+    last_rows = last.get(statistic_id)
+    last_start = dt_util.utc_from_timestamp(last_rows[0]["start"]) if last_rows else None
+
+    today = dt_util.now(dt_util.get_time_zone(SOURCE_TIMEZONE)).date()
+    statistics = [
+        StatisticData(
+            start=hour.start,
+            mean=float(hour.mean_m),
+            min=float(hour.min_m),
+            max=float(hour.max_m),
+            state=float(hour.last_m),
+        )
+        for hour in hourly_rollups(measurement, today)
+        if last_start is None or hour.start > last_start
+    ]
+    if not statistics:
+        return 0
+
+    metadata = StatisticMetaData(
+        has_mean=True,
+        has_sum=False,
+        name=f"{measurement.lake} water level",
+        source=DOMAIN,
+        statistic_id=statistic_id,
+        unit_of_measurement="m",
+    )
+    async_add_external_statistics(hass, metadata, statistics)
+    _LOGGER.debug("Imported %s statistics rows into %s", len(statistics), statistic_id)
+    return len(statistics)
+
+
+def _coordinators_for_call(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[LakeLevelCoordinator]:
+    loaded: dict = hass.data.get(DOMAIN, {})
+    entry_ids = call.data.get(ATTR_ENTRY_ID) or list(loaded)
+    coordinators: list[LakeLevelCoordinator] = []
+    for entry_id in entry_ids:
+        if entry_id not in loaded:
+            raise ServiceValidationError(f"Lake Level entry {entry_id} is not loaded")
+        coordinators.append(loaded[entry_id]["coordinator"])
+    return coordinators
+
+
+def _coordinators_for_refresh(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, LakeLevelCoordinator]:
+    """Coordinators of the requested entries and rivers, or of every entry."""
+    loaded: dict = hass.data.get(DOMAIN, {})
+    entry_ids = call.data.get(ATTR_ENTRY_ID)
+    river_names = call.data.get(ATTR_RIVER)
+    if not entry_ids and not river_names:
+        entry_ids = list(loaded)
+
+    selected: dict[str, LakeLevelCoordinator] = {}
+    for entry_id in entry_ids or []:
+        if entry_id not in loaded:
+            raise ServiceValidationError(f"Lake Level entry {entry_id} is not loaded")
+        selected[entry_id] = loaded[entry_id]["coordinator"]
+    if river_names:
+        by_river: dict[str, list[str]] = {}
+        for entry_id, data in loaded.items():
+            by_river.setdefault(data["coordinator"].river, []).append(entry_id)
+        index = NameIndex(by_river)
+        for name in river_names:
+            river = index.resolve(name)
+            if river is None:
+                raise ServiceValidationError(f"No Lake Level entry follows river {name}")
+            for entry_id in by_river[river]:
+                selected[entry_id] = loaded[entry_id]["coordinator"]
+    return selected
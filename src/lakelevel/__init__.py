@@ -1,25 +1,171 @@
-"""Utilities for fetching lake levels."""
-
-from .siljan import (
-    DEFAULT_LAKE,
-    DEFAULT_RIVER,
-    DEFAULT_TIMEOUT,
-    LakeLevelError,
-    LakeMeasurement,
-    get_lake_level,
-    get_siljan_level,
-    list_lakes,
-    list_rivers,
-)
+"""Utilities for fetching lake levels.
+
+Public names are imported from their submodules on first access, so
+``import lakelevel`` does not pull in requests, BeautifulSoup or SQLite
+until a fetch, parse or store is actually used.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, List
+
+_EXPORTS = {
+    "DEFAULT_LAKE": "siljan",
+    "DEFAULT_RIVER": "siljan",
+    "DEFAULT_TIMEOUT": "siljan",
+    "DailyLevel": "siljan",
+    "Deadline": "siljan",
+    "DeadlineExceeded": "siljan",
+    "LakeLevelError": "siljan",
+    "LakeMeasurement": "siljan",
+    "ReferenceStats": "siljan",
+    "SourceCatalog": "siljan",
+    "UnknownNameError": "siljan",
+    "get_lake_level": "siljan",
+    "get_lake_levels": "siljan",
+    "get_siljan_level": "siljan",
+    "list_lakes": "siljan",
+    "list_rivers": "siljan",
+    "measurement_history": "siljan",
+    "parse_day_label": "siljan",
+    "parse_lake_levels": "siljan",
+    "parse_measurement_time": "siljan",
+    "ResponseArchive": "archive",
+    "archive_session": "archive",
+    "replay_session": "archive",
+    "ConditionalClient": "conditional",
+    "RiverTable": "conditional",
+    "AnomalyDetector": "anomaly",
+    "AnomalyEvent": "anomaly",
+    "CursorExpiredError": "delta",
+    "DeltaEvent": "delta",
+    "DeltaFeed": "delta",
+    "export_rows": "export",
+    "history_rows": "export",
+    "snapshot_rows": "export",
+    "HistoryRange": "history",
+    "HistoryStore": "history",
+    "AdaptiveLimiter": "limiter",
+    "LimiterStats": "limiter",
+    "LimitingAdapter": "limiter",
+    "limited_session": "limiter",
+    "MqttSink": "publish",
+    "Publisher": "publish",
+    "WebhookSink": "publish",
+    "publish_changes": "publish",
+    "Rollup": "rollups",
+    "downsample": "rollups",
+    "rollup": "rollups",
+    "NameIndex": "names",
+    "fold_name": "names",
+    "aiter_measurements": "snapshot",
+    "fetch_snapshot": "snapshot",
+    "iter_measurements": "snapshot",
+    "LakeTrend": "trends",
+    "compute_trends": "trends",
+}
+
+if TYPE_CHECKING:
+    from .siljan import (
+        DEFAULT_LAKE,
+        DEFAULT_RIVER,
+        DEFAULT_TIMEOUT,
+        DailyLevel,
+        Deadline,
+        DeadlineExceeded,
+        LakeLevelError,
+        LakeMeasurement,
+        ReferenceStats,
+        SourceCatalog,
+        UnknownNameError,
+        get_lake_level,
+        get_lake_levels,
+        get_siljan_level,
+        list_lakes,
+        list_rivers,
+        measurement_history,
+        parse_day_label,
+        parse_lake_levels,
+        parse_measurement_time,
+    )
+    from .archive import ResponseArchive, archive_session, replay_session
+    from .anomaly import AnomalyDetector, AnomalyEvent
+    from .conditional import ConditionalClient, RiverTable
+    from .delta import CursorExpiredError, DeltaEvent, DeltaFeed
+    from .export import export_rows, history_rows, snapshot_rows
+    from .history import HistoryRange, HistoryStore
+    from .limiter import AdaptiveLimiter, LimiterStats, LimitingAdapter, limited_session
+    from .publish import MqttSink, Publisher, WebhookSink, publish_changes
+    from .names import NameIndex, fold_name
+    from .rollups import Rollup, downsample, rollup
+    from .snapshot import aiter_measurements, fetch_snapshot, iter_measurements
+    from .trends import LakeTrend, compute_trends
 
 __all__ = [
+    "AdaptiveLimiter",
+    "AnomalyDetector",
+    "AnomalyEvent",
+    "ConditionalClient",
+    "CursorExpiredError",
+    "aiter_measurements",
     "DEFAULT_LAKE",
     "DEFAULT_RIVER",
     "DEFAULT_TIMEOUT",
+    "Deadline",
+    "DeadlineExceeded",
+    "DeltaEvent",
+    "DeltaFeed",
+    "archive_session",
+    "compute_trends",
+    "downsample",
+    "export_rows",
+    "fetch_snapshot",
+    "fold_name",
     "get_lake_level",
+    "get_lake_levels",
     "get_siljan_level",
+    "history_rows",
+    "iter_measurements",
+    "limited_session",
     "list_lakes",
     "list_rivers",
+    "measurement_history",
+    "parse_day_label",
+    "parse_lake_levels",
+    "parse_measurement_time",
+    "publish_changes",
+    "replay_session",
+    "rollup",
+    "snapshot_rows",
     "LakeLevelError",
+    "DailyLevel",
+    "HistoryRange",
+    "HistoryStore",
     "LakeMeasurement",
+    "LakeTrend",
+    "LimiterStats",
+    "LimitingAdapter",
+    "MqttSink",
+    "NameIndex",
+    "Publisher",
+    "ReferenceStats",
+    "ResponseArchive",
+    "RiverTable",
+    "Rollup",
+    "SourceCatalog",
+    "UnknownNameError",
+    "WebhookSink",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    # Cache on the package so later lookups skip this hook.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,276 @@
+"""Archive of raw source responses with offline replay.
+
+Mount :class:`ArchivingAdapter` on a session to keep every landing page and
+river table that is fetched, or :class:`ReplayAdapter` to serve those
+requests from the archive without touching the network. Both plug into the
+``session`` argument of the client functions::
+
+    archive = ResponseArchive("raw")
+    get_lake_level("Dalälven", "Siljan", session=archive_session(archive))
+    get_lake_level("Dalälven", "Siljan", session=replay_session(archive))
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, Mapping, Optional, Union
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .siljan import LAKE_LEVEL_URL
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fetched_at TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    elapsed_s REAL NOT NULL
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS fetches_request ON fetches (method, url, body, fetched_at)"
+
+
+@dataclass(frozen=True)
+class ArchivedFetch:
+    """Metadata of one archived response; the payload is ``read(digest)``."""
+
+    id: int
+    fetched_at: datetime
+    method: str
+    url: str
+    body: str
+    status: int
+    headers: Mapping[str, str]
+    digest: str
+    size: int
+    elapsed_s: float
+
+
+class ResponseArchive:
+    """Content-addressed store of raw response bytes plus fetch metadata.
+
+    Payloads are gzip-compressed under ``objects/`` and named by the SHA-256
+    of the uncompressed bytes, so an unchanged page is stored once however
+    often it is fetched. Each fetch is recorded in ``fetches.sqlite`` with
+    its request (method, URL, form body), status, headers and timing.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        (self.path / "objects").mkdir(parents=True, exist_ok=True)
+        # Snapshot downloads share one session across threads.
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            str(self.path / "fetches.sqlite"), check_same_thread=False
+        )
+        self._connection.execute(_SCHEMA)
+        self._connection.execute(_INDEX)
+
+    def __enter__(self) -> "ResponseArchive":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def store(
+        self,
+        method: str,
+        url: str,
+        body: str,
+        status: int,
+        headers: Mapping[str, str],
+        content: bytes,
+        fetched_at: Optional[datetime] = None,
+        elapsed_s: float = 0.0,
+    ) -> ArchivedFetch:
+        """Record one response and write its payload unless already present."""
+        digest = hashlib.sha256(content).hexdigest()
+        target = self._object_path(digest)
+        if not target.exists():
+            target.parent.mkdir(exist_ok=True)
+            temporary = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+            temporary.write_bytes(gzip.compress(content))
+            os.replace(temporary, target)
+
+        fetched = fetched_at or datetime.now(timezone.utc)
+        header_json = json.dumps(dict(headers), ensure_ascii=False)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO fetches (fetched_at, method, url, body, status, headers, digest, "
+                "size, elapsed_s) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (fetched.isoformat(), method, url, body, status, header_json, digest,
+                 len(content), elapsed_s),
+            )
+        return ArchivedFetch(
+            id=int(cursor.lastrowid),
+            fetched_at=fetched,
+            method=method,
+            url=url,
+            body=body,
+            status=status,
+            headers=dict(headers),
+            digest=digest,
+            size=len(content),
+            elapsed_s=elapsed_s,
+        )
+
+    def read(self, digest: str) -> bytes:
+        """Return the uncompressed payload stored under ``digest``."""
+        return gzip.decompress(self._object_path(digest).read_bytes())
+
+    def latest(
+        self, method: str, url: str, body: str, as_of: Optional[datetime] = None
+    ) -> Optional[ArchivedFetch]:
+        """The most recent fetch of a request, optionally no later than ``as_of``.
+
+        Naive ``as_of`` values are taken as UTC, like the recorded times.
+        """
+        query = "SELECT * FROM fetches WHERE method = ? AND url = ? AND body = ?"
+        params: list[Any] = [method, url, body]
+        if as_of is not None:
+            if as_of.tzinfo is None:
+                as_of = as_of.replace(tzinfo=timezone.utc)
+            query += " AND fetched_at <= ?"
+            params.append(as_of.astimezone(timezone.utc).isoformat())
+        query += " ORDER BY fetched_at DESC, id DESC LIMIT 1"
+        with self._lock:
+            row = self._connection.execute(query, params).fetchone()
+        return None if row is None else _fetch_from_row(row)
+
+    def fetches(self, method: Optional[str] = None) -> Iterator[ArchivedFetch]:
+        """Every recorded fetch in capture order, e.g. for bulk re-parsing."""
+        query = "SELECT * FROM fetches"
+        params: list[Any] = []
+        if method is not None:
+            query += " WHERE method = ?"
+            params.append(method)
+        query += " ORDER BY id"
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        for row in rows:
+            yield _fetch_from_row(row)
+
+    def _object_path(self, digest: str) -> Path:
+        return self.path / "objects" / digest[:2] / f"{digest[2:]}.gz"
+
+
+class ArchivingAdapter(HTTPAdapter):
+    """HTTP adapter that stores every response it receives in an archive."""
+
+    def __init__(self, archive: ResponseArchive, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        started = time.monotonic()
+        response = super().send(request, **kwargs)
+        content = response.content
+        self.archive.store(
+            method=request.method or "GET",
+            url=request.url or "",
+            body=_body_text(request.body),
+            status=response.status_code,
+            headers=response.headers,
+            content=content,
+            elapsed_s=time.monotonic() - started,
+        )
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that answers requests from an archive instead of the network.
+
+    Each request is served the latest archived response to the same method,
+    URL and form body, or the latest one captured no later than ``as_of``.
+    Requests that were never archived raise ``requests.ConnectionError``.
+    """
+
+    def __init__(self, archive: ResponseArchive, as_of: Optional[datetime] = None) -> None:
+        super().__init__()
+        self.archive = archive
+        self.as_of = as_of
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        fetch = self.archive.latest(
+            request.method or "GET", request.url or "", _body_text(request.body), self.as_of
+        )
+        if fetch is None:
+            raise requests.ConnectionError(
+                f"No archived response for {request.method} {request.url}", request=request
+            )
+
+        response = requests.Response()
+        response.status_code = fetch.status
+        response.headers = CaseInsensitiveDict(fetch.headers)
+        response._content = self.archive.read(fetch.digest)
+        response.url = request.url or ""
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def archive_session(
+    archive: ResponseArchive, session: Optional[requests.Session] = None
+) -> requests.Session:
+    """Return ``session`` (or a new one) archiving responses from the source."""
+    session = session or requests.Session()
+    session.mount(LAKE_LEVEL_URL, ArchivingAdapter(archive))
+    return session
+
+
+def replay_session(
+    archive: ResponseArchive, as_of: Optional[datetime] = None
+) -> requests.Session:
+    """Return a session that serves every request from ``archive``."""
+    session = requests.Session()
+    adapter = ReplayAdapter(archive, as_of)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _body_text(body: Union[str, bytes, None]) -> str:
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        return body.decode("ascii", errors="replace")
+    return body
+
+
+def _fetch_from_row(row: tuple) -> ArchivedFetch:
+    row_id, fetched_at, method, url, body, status, headers, digest, size, elapsed_s = row
+    return ArchivedFetch(
+        id=row_id,
+        fetched_at=datetime.fromisoformat(fetched_at),
+        method=method,
+        url=url,
+        body=body,
+        status=status,
+        headers=json.loads(headers),
+        digest=digest,
+        size=size,
+        elapsed_s=elapsed_s,
+    )
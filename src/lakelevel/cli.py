@@ -3,21 +3,33 @@
 from __future__ import annotations
 
 import argparse
+import csv
+from datetime import datetime
+import json
 import sys
-from typing import Sequence
-
-import requests
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Type
 
+from .names import NameIndex
 from .siljan import (
     DEFAULT_LAKE,
     DEFAULT_RIVER,
     DEFAULT_TIMEOUT,
+    Deadline,
     LakeLevelError,
+    LakeMeasurement,
     get_lake_level,
+    get_lake_levels,
     list_lakes,
     list_rivers,
+    lookup_name,
 )
 
+if TYPE_CHECKING:
+    import requests
+
+    from .history import HistoryStore
+
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -26,7 +38,15 @@ def build_parser() -> argparse.ArgumentParser:
             "Examples:\n"
             "  ./scripts/run --alv Dalälven --lake Siljan\n"
             "  ./scripts/run --list-rivers\n"
-            "  ./scripts/run --alv Dalälven --list-lakes"
+            "  ./scripts/run --alv Dalälven --list-lakes\n"
+            "\n"
+            "Commands:\n"
+            "  delta     Print lakes changed since the last run as NDJSON (see delta --help)\n"
+            "  export    Write a snapshot or stored history as Parquet, Arrow or CSV (see export --help)\n"
+            "  forecast  Forecast lake levels from stored history (see forecast --help)\n"
+            "  history   Print stored history at a resolution that fits a point budget (see history --help)\n"
+            "  publish   Push changed lakes to MQTT or webhooks (see publish --help)\n"
+            "  snapshot  Print every lake of several or all rivers (see snapshot --help)"
         ),
         formatter_class=argparse.RawTextHelpFormatter,
     )
@@ -40,6 +60,22 @@ def build_parser() -> argparse.ArgumentParser:
         default=DEFAULT_LAKE,
         help=f"Lake name to read (default: {DEFAULT_LAKE})",
     )
+    _add_timeout_arguments(parser)
+    parser.add_argument(
+        "--list-lakes",
+        action="store_true",
+        help="List all lakes for the selected river and exit",
+    )
+    parser.add_argument(
+        "--list-rivers",
+        action="store_true",
+        help="List all available rivers and exit",
+    )
+    _add_archive_arguments(parser)
+    return parser
+
+
+def _add_timeout_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--timeout",
         type=float,
@@ -47,18 +83,655 @@ def build_parser() -> argparse.ArgumentParser:
         help=f"Timeout in seconds for each HTTP request (default: {DEFAULT_TIMEOUT})",
     )
     parser.add_argument(
-        "--list-lakes",
+        "--connect-timeout",
+        type=float,
+        default=None,
+        help="Connect timeout in seconds for each HTTP request (overrides --timeout)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=None,
+        help="Read timeout in seconds for each HTTP request (overrides --timeout)",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=None,
+        help="Total seconds allowed for all requests and parsing (default: unlimited)",
+    )
+
+
+def _deadline_for(args: argparse.Namespace) -> Optional[Deadline]:
+    if args.connect_timeout is None and args.read_timeout is None and args.budget is None:
+        return None
+    timeout = DEFAULT_TIMEOUT if args.timeout is None else args.timeout
+    return Deadline(
+        budget_s=args.budget,
+        connect_timeout=timeout if args.connect_timeout is None else args.connect_timeout,
+        read_timeout=timeout if args.read_timeout is None else args.read_timeout,
+    )
+
+
+def _add_archive_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--archive",
+        metavar="DIR",
+        help="Keep the raw responses in this archive directory",
+    )
+    group.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve requests from this archive directory instead of the network",
+    )
+
+
+def _session_for(args: argparse.Namespace) -> Optional[requests.Session]:
+    if not (args.archive or args.replay):
+        return None
+    from .archive import ResponseArchive, archive_session, replay_session
+
+    if args.archive:
+        return archive_session(ResponseArchive(args.archive))
+    return replay_session(ResponseArchive(args.replay))
+
+
+def _fetch_errors() -> Tuple[Type[BaseException], ...]:
+    # Evaluated only when an exception is being handled, so requests is not
+    # imported just to print help or parse arguments.
+    import requests
+
+    return (LakeLevelError, requests.exceptions.RequestException)
+
+
+def build_forecast_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lakelevel forecast",
+        description="Record the latest river table and forecast lake levels",
+        epilog=(
+            "Examples:\n"
+            "  ./scripts/run forecast --alv Dalälven --history-db lakes.sqlite\n"
+            "  ./scripts/run forecast --lake Siljan --horizon 14"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--alv",
+        default=DEFAULT_RIVER,
+        help=f"River/älv to query (default: {DEFAULT_RIVER})",
+    )
+    parser.add_argument(
+        "--lake",
+        action="append",
+        help="Lake to forecast; repeat for several (default: every lake in the river)",
+    )
+    parser.add_argument(
+        "--history-db",
+        help="SQLite history file to record into and forecast from (default: in-memory)",
+    )
+    parser.add_argument(
+        "--horizon",
+        type=int,
+        default=7,
+        help="Days ahead to forecast (default: 7)",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=14,
+        help="Days of recent history used for the trend fit (default: 14)",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence level of the forecast band (default: 0.95)",
+    )
+    _add_timeout_arguments(parser)
+    return parser
+
+
+def run_forecast(args: argparse.Namespace) -> int:
+    from .history import HistoryStore
+
+    try:
+        from .analysis import forecast_levels
+    except ImportError:
+        print(
+            "Forecasting requires NumPy: pip install lakelevel[analysis]",
+            file=sys.stderr,
+        )
+        return 1
+
+    try:
+        measurements = get_lake_levels(
+            args.alv, args.lake, timeout=args.timeout, deadline=_deadline_for(args)
+        )
+    except _fetch_errors() as exc:
+        print(f"Error fetching lake level: {exc}", file=sys.stderr)
+        return 1
+    if not measurements:
+        print("Error fetching lake level: no matching lakes", file=sys.stderr)
+        return 1
+
+    # Measurements carry the source's river label, which may be spelled
+    # differently from --alv; history is stored under that label.
+    with HistoryStore(args.history_db or ":memory:") as store:
+        store.record(measurements)
+        history = store.series(
+            river=measurements[0].river, lakes=[m.lake for m in measurements]
+        )
+    if not history:
+        print("Error forecasting lake level: no dated history to fit", file=sys.stderr)
+        return 1
+
+    forecasts = forecast_levels(
+        history,
+        horizon_days=args.horizon,
+        window_days=args.window,
+        confidence=args.confidence,
+    )
+    for (river, lake), forecast in forecasts.items():
+        print(
+            f"{lake} ({river}) {forecast.dates[-1]}: {forecast.level_m[-1]:.2f} m "
+            f"({forecast.lower_m[-1]:.2f}–{forecast.upper_m[-1]:.2f}, "
+            f"{forecast.slope_m_per_day:+.4f} m/day)"
+        )
+    return 0
+
+
+def build_history_parser() -> argparse.ArgumentParser:
+    from .rollups import DEFAULT_MAX_POINTS, RESOLUTIONS
+
+    parser = argparse.ArgumentParser(
+        prog="lakelevel history",
+        description="Print stored history as CSV from raw readings or rollups",
+        epilog=(
+            "The finest of raw, day, week and month that keeps every lake within\n"
+            "--points is used unless --resolution is given.\n"
+            "\n"
+            "Examples:\n"
+            "  ./scripts/run history --history-db lakes.sqlite --lake Siljan --points 200\n"
+            "  ./scripts/run history --history-db lakes.sqlite --start 2020-01-01 --shape"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("--history-db", required=True, help="SQLite history file to read")
+    parser.add_argument("--alv", help="River/älv to include (default: all rivers)")
+    parser.add_argument(
+        "--lake",
+        action="append",
+        help="Lake to include; repeat for several (default: every lake)",
+    )
+    parser.add_argument(
+        "--start", type=datetime.fromisoformat, help="First date or time to include"
+    )
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Last date or time to include")
+    parser.add_argument(
+        "--points",
+        type=int,
+        default=DEFAULT_MAX_POINTS,
+        help=f"Maximum rows per lake (default: {DEFAULT_MAX_POINTS})",
+    )
+    parser.add_argument(
+        "--resolution",
+        choices=RESOLUTIONS,
+        help="Read this resolution instead of choosing one from --points",
+    )
+    parser.add_argument(
+        "--shape",
         action="store_true",
-        help="List all lakes for the selected river and exit",
+        help="Downsample a finer resolution to --points, keeping peaks and troughs",
+    )
+    return parser
+
+
+def run_history(args: argparse.Namespace) -> int:
+    from .history import HistoryStore
+    from .rollups import downsample
+
+    if args.points < 1:
+        print("--points must be at least 1", file=sys.stderr)
+        return 1
+    with HistoryStore(args.history_db) as store:
+        if args.resolution is None:
+            result = store.query(
+                args.alv, args.lake, args.start, args.end, args.points, shape=args.shape
+            )
+            resolution, series = result.resolution, result.series
+        else:
+            resolution = args.resolution
+            series = store.rollups(resolution, args.alv, args.lake, args.start, args.end)
+            if args.shape:
+                series = {key: downsample(points, args.points) for key, points in series.items()}
+
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(
+        ["river", "lake", "resolution", "start", "min_m", "max_m", "mean_m", "last_m", "count"]
+    )
+    for (river, lake), points in series.items():
+        for point in points:
+            writer.writerow(
+                [
+                    river,
+                    lake,
+                    resolution,
+                    point.start.isoformat(sep=" "),
+                    point.min_m,
+                    point.max_m,
+                    point.mean_m,
+                    point.last_m,
+                    point.count,
+                ]
+            )
+    return 0
+
+
+def build_snapshot_parser() -> argparse.ArgumentParser:
+    from .snapshot import DEFAULT_FETCH_WORKERS
+
+    parser = argparse.ArgumentParser(
+        prog="lakelevel snapshot",
+        description="Fetch every lake of several or all rivers",
+        epilog=(
+            "Examples:\n"
+            "  ./scripts/run snapshot\n"
+            "  ./scripts/run snapshot --alv Dalälven --alv Umeälven --parse-workers 0\n"
+            "  ./scripts/run snapshot --ndjson\n"
+            "  ./scripts/run snapshot --history-db lakes.sqlite"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
     )
     parser.add_argument(
-        "--list-rivers",
+        "--alv",
+        action="append",
+        help="River/älv to include; repeat for several (default: all rivers)",
+    )
+    parser.add_argument(
+        "--fetch-workers",
+        type=int,
+        default=DEFAULT_FETCH_WORKERS,
+        help=f"Concurrent river downloads (default: {DEFAULT_FETCH_WORKERS})",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parser processes; 0 parses in-process (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--ndjson",
         action="store_true",
-        help="List all available rivers and exit",
+        help="Stream one JSON object per lake as each river completes",
+    )
+    parser.add_argument(
+        "--history-db",
+        help="SQLite history file to also record every fetched lake into",
+    )
+    _add_timeout_arguments(parser)
+    _add_archive_arguments(parser)
+    return parser
+
+
+def run_snapshot(args: argparse.Namespace) -> int:
+    if args.history_db is None:
+        return _run_snapshot(args, None)
+
+    from .history import HistoryStore
+
+    with HistoryStore(args.history_db) as store:
+        return _run_snapshot(args, store)
+
+
+def _run_snapshot(args: argparse.Namespace, store: Optional[HistoryStore]) -> int:
+    from .snapshot import fetch_snapshot
+
+    if args.ndjson:
+        return _stream_snapshot(args, store)
+    try:
+        snapshot = fetch_snapshot(
+            args.alv,
+            session=_session_for(args),
+            timeout=args.timeout,
+            deadline=_deadline_for(args),
+            fetch_workers=args.fetch_workers,
+            parse_workers=args.parse_workers,
+        )
+    except _fetch_errors() as exc:
+        print(f"Error fetching lake level: {exc}", file=sys.stderr)
+        return 1
+
+    if store is not None:
+        store.record(m for measurements in snapshot.values() for m in measurements)
+    for measurements in snapshot.values():
+        for measurement in measurements:
+            _print_measurement(measurement)
+    return 0
+
+
+def _stream_snapshot(args: argparse.Namespace, store: Optional[HistoryStore]) -> int:
+    from .snapshot import iter_measurements
+
+    try:
+        for measurement in iter_measurements(
+            args.alv,
+            session=_session_for(args),
+            timeout=args.timeout,
+            deadline=_deadline_for(args),
+            fetch_workers=args.fetch_workers,
+        ):
+            if store is not None:
+                store.record([measurement])
+            print(_measurement_json(measurement), flush=True)
+    except _fetch_errors() as exc:
+        print(f"Error fetching lake level: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_delta_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="lakelevel delta",
+        description="Print lakes added, changed or removed since the last run as NDJSON",
+        epilog=(
+            "The state file holds the cursor and last-seen lakes; it is only\n"
+            "updated after the events have been written. The most recent events\n"
+            "are kept in FEED.events.ndjson beside it for --since.\n"
+            "\n"
+            "Examples:\n"
+            "  ./scripts/run delta --state feed.json\n"
+            "  ./scripts/run delta --state dalalven.json --alv Dalälven\n"
+            "  ./scripts/run delta --state feed.json --since 120"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--state",
+        required=True,
+        help="JSON file that stores the cursor between runs",
+    )
+    parser.add_argument(
+        "--alv",
+        action="append",
+        help="River/älv to include; repeat for several (default: all rivers)",
+    )
+    parser.add_argument(
+        "--since",
+        type=int,
+        metavar="CURSOR",
+        help="Print the logged events after CURSOR instead of fetching",
+    )
+    _add_timeout_arguments(parser)
+    return parser
+
+
+def run_delta(args: argparse.Namespace) -> int:
+    from .delta import CursorExpiredError, DeltaFeed
+    from .snapshot import fetch_snapshot
+
+    feed = DeltaFeed(args.state)
+    if args.since is not None:
+        try:
+            events = feed.since(args.since)
+        except CursorExpiredError as exc:
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        for event in events:
+            print(event.to_json())
+        return 0
+    try:
+        snapshot = fetch_snapshot(
+            args.alv, timeout=args.timeout, deadline=_deadline_for(args)
+        )
+    except _fetch_errors() as exc:
+        print(f"Error fetching lake level: {exc}", file=sys.stderr)
+        return 1
+
+    for event in feed.update(snapshot):
+        print(event.to_json())
+    sys.stdout.flush()
+    feed.save()
+    return 0
+
+
+def build_publish_parser() -> argparse.ArgumentParser:
+    from .publish import DEFAULT_PUBLISH_INTERVAL, DEFAULT_TOPIC_PREFIX
+
+    parser = argparse.ArgumentParser(
+        prog="lakelevel publish",
+        description="Fetch periodically and push changed lakes to MQTT topics or webhooks",
+        epilog=(
+            "Each lake is published retained on PREFIX/river/lake; webhooks receive\n"
+            'batches as {"events": [...]}. The state file is saved after delivery.\n'
+            "\n"
+            "Examples:\n"
+            "  ./scripts/run publish --state feed.json --mqtt broker.local\n"
+            "  ./scripts/run publish --state feed.json --webhook http://hub/lakes --once"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--state",
+        required=True,
+        help="JSON file that stores the cursor and last-seen lakes between runs",
+    )
+    parser.add_argument(
+        "--alv",
+        action="append",
+        help="River/älv to include; repeat for several (default: all rivers)",
+    )
+    parser.add_argument(
+        "--mqtt",
+        metavar="HOST[:PORT]",
+        help="MQTT broker to publish retained messages to (needs paho-mqtt)",
+    )
+    parser.add_argument(
+        "--mqtt-prefix",
+        default=DEFAULT_TOPIC_PREFIX,
+        help=f"Topic prefix (default: {DEFAULT_TOPIC_PREFIX})",
     )
+    parser.add_argument(
+        "--webhook",
+        action="append",
+        metavar="URL",
+        help="Webhook to POST batches to; repeat for several",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_PUBLISH_INTERVAL,
+        help=f"Seconds between fetches (default: {DEFAULT_PUBLISH_INTERVAL})",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Fetch and publish once, then exit",
+    )
+    _add_timeout_arguments(parser)
     return parser
 
 
+def run_publish(args: argparse.Namespace) -> int:
+    from .conditional import ConditionalClient
+    from .delta import DeltaFeed
+    from .publish import MqttSink, Publisher, PublishError, WebhookSink, publish_changes
+
+    sinks: list = [WebhookSink(url) for url in args.webhook or []]
+    try:
+        if args.mqtt:
+            host, _, port = args.mqtt.partition(":")
+            sinks.append(MqttSink(host, int(port or 1883), prefix=args.mqtt_prefix))
+    except (PublishError, OSError) as exc:
+        print(f"Error connecting to MQTT broker: {exc}", file=sys.stderr)
+        return 1
+    if not sinks:
+        print("Give at least one --mqtt or --webhook target", file=sys.stderr)
+        return 2
+
+    feed = DeltaFeed(args.state)
+    # Unchanged river tables are answered with 304 between fetches.
+    client = ConditionalClient()
+    with Publisher(sinks) as publisher:
+        try:
+            while True:
+                try:
+                    events = publish_changes(
+                        feed,
+                        publisher,
+                        args.alv,
+                        timeout=args.timeout,
+                        deadline=_deadline_for(args),
+                        conditional=client,
+                    )
+                except _fetch_errors() as exc:
+                    print(f"Error fetching lake level: {exc}", file=sys.stderr)
+                    if args.once:
+                        return 1
+                except PublishError as exc:
+                    print(f"Error publishing changes: {exc}", file=sys.stderr)
+                    if args.once:
+                        return 1
+                else:
+                    print(f"Published {len(events)} changes", file=sys.stderr)
+                if args.once:
+                    return 0
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+def build_export_parser() -> argparse.ArgumentParser:
+    from .export import DEFAULT_ROW_GROUP_SIZE, FORMATS
+
+    parser = argparse.ArgumentParser(
+        prog="lakelevel export",
+        description="Write a snapshot or stored history as Parquet, Arrow IPC or CSV",
+        epilog=(
+            "Without PyArrow the export falls back to CSV.\n"
+            "\n"
+            "Examples:\n"
+            "  ./scripts/run export levels.parquet --alv Dalälven\n"
+            "  ./scripts/run export history.arrow --history-db history.sqlite"
+        ),
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument("output", help="File to write; the suffix selects the format")
+    parser.add_argument(
+        "--alv",
+        action="append",
+        help="River/älv to include; repeat for several (default: all rivers)",
+    )
+    parser.add_argument(
+        "--history-db",
+        help="Export the observations stored in this SQLite file instead of fetching",
+    )
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=None,
+        help="Output format (default: from the file suffix, else parquet)",
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help=f"Rows per row group or record batch (default: {DEFAULT_ROW_GROUP_SIZE})",
+    )
+    _add_timeout_arguments(parser)
+    return parser
+
+
+def run_export(args: argparse.Namespace) -> int:
+    from .export import export_rows, history_rows, snapshot_rows
+    from .snapshot import iter_measurements
+
+    if args.history_db:
+        from .history import HistoryStore
+
+        with HistoryStore(args.history_db) as store:
+            try:
+                rivers = _stored_rivers(store, args.alv)
+            except LakeLevelError as exc:
+                print(f"Error reading history: {exc}", file=sys.stderr)
+                return 1
+            observations = (
+                observation
+                for river in rivers
+                for observation in store.observations(river=river)
+            )
+            result = export_rows(
+                history_rows(observations),
+                args.output,
+                format=args.format,
+                row_group_size=args.row_group_size,
+            )
+    else:
+        # Rows are written as rivers arrive, so a failure can leave a
+        # partial file behind.
+        try:
+            result = export_rows(
+                snapshot_rows(
+                    iter_measurements(
+                        args.alv, timeout=args.timeout, deadline=_deadline_for(args)
+                    )
+                ),
+                args.output,
+                format=args.format,
+                row_group_size=args.row_group_size,
+            )
+        except _fetch_errors() as exc:
+            print(f"Error fetching lake level: {exc}", file=sys.stderr)
+            return 1
+
+    print(f"Wrote {result.rows} rows to {result.path} ({result.format})")
+    return 0
+
+
+def _stored_rivers(
+    store: HistoryStore, queries: Optional[Sequence[str]]
+) -> List[Optional[str]]:
+    """Resolve ``--alv`` values to the river labels stored in ``store``.
+
+    ``None`` stands for every river when no ``--alv`` was given.
+    """
+    if not queries:
+        return [None]
+    index = NameIndex(store.rivers())
+    return [
+        lookup_name(index, query, f"River '{query}' not found in history") for query in queries
+    ]
+
+
+def _print_measurement(measurement: LakeMeasurement) -> None:
+    print(
+        f"{measurement.lake} ({measurement.river}) water level: {measurement.level_m} m "
+        f"(measured {measurement.timestamp})"
+    )
+
+
+def _measurement_json(measurement: LakeMeasurement) -> str:
+    return json.dumps(
+        {
+            "river": measurement.river,
+            "lake": measurement.lake,
+            "level_m": str(measurement.level_m),
+            "timestamp": measurement.timestamp,
+        },
+        ensure_ascii=False,
+    )
+
+
+_COMMANDS = {
+    "delta": (build_delta_parser, run_delta),
+    "export": (build_export_parser, run_export),
+    "forecast": (build_forecast_parser, run_forecast),
+    "history": (build_history_parser, run_history),
+    "publish": (build_publish_parser, run_publish),
+    "snapshot": (build_snapshot_parser, run_snapshot),
+}
+
+
 def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args_list = list(sys.argv[1:] if argv is None else argv)
@@ -67,31 +740,36 @@ def main(argv: Sequence[str] | None = None) -> int:
         parser.print_help()
         return 0
 
+    if args_list[0] in _COMMANDS:
+        build_command_parser, run_command = _COMMANDS[args_list[0]]
+        return run_command(build_command_parser().parse_args(args_list[1:]))
+
     args = parser.parse_args(args_list)
 
+    session = _session_for(args)
+    deadline = _deadline_for(args)
     try:
         if args.list_rivers:
-            for name in list_rivers(timeout=args.timeout):
+            for name in list_rivers(session=session, timeout=args.timeout, deadline=deadline):
                 print(name)
             return 0
 
         if args.list_lakes:
-            names = list_lakes(args.alv, timeout=args.timeout)
+            names = list_lakes(
+                args.alv, session=session, timeout=args.timeout, deadline=deadline
+            )
             for name in names:
                 print(name)
             return 0
 
         measurement = get_lake_level(
-            args.alv, args.lake, timeout=args.timeout
+            args.alv, args.lake, session=session, timeout=args.timeout, deadline=deadline
         )
-    except (LakeLevelError, requests.exceptions.RequestException) as exc:
+    except _fetch_errors() as exc:
         print(f"Error fetching lake level: {exc}", file=sys.stderr)
         return 1
 
-    print(
-        f"{measurement.lake} ({measurement.river}) water level: {measurement.level_m} m "
-        f"(measured {measurement.timestamp})"
-    )
+    _print_measurement(measurement)
     return 0
 
 
@@ -0,0 +1,276 @@
+"""Conditional fetching that skips unchanged river tables.
+
+:class:`ConditionalClient` remembers the validators of every response per
+request (URL and river form value): ``ETag``, ``Last-Modified``, the
+``Cache-Control`` lifetime and a SHA-256 of the body. Later landing page
+fetches are sent as conditional requests; river tables are POSTs, where a
+matched precondition means ``412`` rather than ``304``, so they are compared
+by body hash. A ``304``, an unchanged validator or an identical body is
+answered from the previous parse. Each result says which
+of these happened::
+
+    client = ConditionalClient()
+    table = client.fetch_river("Dalälven")
+    if table.changed:
+        store(table.measurements)
+
+Pass a long-lived client as ``conditional`` to :func:`~lakelevel.fetch_snapshot`
+or :func:`~lakelevel.iter_measurements` to revalidate every river of a
+repeated snapshot the same way.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import hashlib
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from .siljan import (
+    LAKE_LEVEL_URL,
+    PHASE_LANDING,
+    PHASE_PARSE,
+    PHASE_RIVER_TABLE,
+    Deadline,
+    LakeMeasurement,
+    _FORM_HEADERS,
+    _SOURCE_ENCODING,
+    _filter_lakes,
+    _name_index,
+    _new_session,
+    _request,
+    _resolve_deadline,
+    _river_choices,
+    lookup_name,
+    parse_lake_levels,
+)
+
+if TYPE_CHECKING:
+    import requests
+
+# Served from memory inside the Cache-Control lifetime; no request was sent.
+FRESH = "fresh"
+# The server answered the conditional request with 304 Not Modified.
+NOT_MODIFIED = "not_modified"
+# A full body arrived but its ETag, Last-Modified or hash matched.
+UNCHANGED = "unchanged"
+# New content that was parsed.
+MODIFIED = "modified"
+
+RequestKey = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class RiverTable:
+    """Lakes of one river and how the response that produced them was judged."""
+
+    river: str
+    measurements: Tuple[LakeMeasurement, ...]
+    freshness: str
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        """True when the measurements were parsed from new content."""
+        return self.freshness == MODIFIED
+
+
+@dataclass(frozen=True)
+class _Validators:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: str
+    fresh_until: float
+    value: Any
+
+
+class ConditionalClient:
+    """Fetch river tables, revalidating instead of re-downloading and re-parsing.
+
+    Validators and parsed results are kept in memory for the lifetime of
+    the client, one entry per request. The landing page is revalidated the
+    same way, so an unchanged river list is not parsed again either. Safe
+    to share between threads.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._session = session or _new_session()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[RequestKey, _Validators] = {}
+
+    def fetch_river(
+        self,
+        river: str,
+        lakes: Optional[Iterable[str]] = None,
+        timeout: float | None = None,
+        deadline: Optional[Deadline] = None,
+    ) -> RiverTable:
+        """Latest lakes of ``river`` (optionally only ``lakes``) with their freshness."""
+        deadline = _resolve_deadline(timeout, deadline)
+        options = dict(self.river_choices(deadline))
+        label = lookup_name(
+            _name_index(tuple(options)), river, f"River '{river}' not found on source page"
+        )
+        table = self.fetch_table(label, options[label], deadline)
+        if lakes is None:
+            return table
+        return replace(table, measurements=tuple(_filter_lakes(table.measurements, lakes)))
+
+    def river_choices(self, deadline: Deadline) -> List[Tuple[str, str]]:
+        """``(label, form value)`` of every river on the landing page."""
+        choices, _, _ = self._fetch("GET", "", PHASE_LANDING, deadline, _parse_choices)
+        return list(choices)
+
+    def fetch_table(self, label: str, value: str, deadline: Deadline) -> RiverTable:
+        """Lakes of the river with form ``value`` from :meth:`river_choices`."""
+        body = urlencode({"Ralv": value}, encoding=_SOURCE_ENCODING)
+        measurements, freshness, validators = self._fetch(
+            "POST",
+            body,
+            PHASE_RIVER_TABLE,
+            deadline,
+            lambda content: tuple(parse_lake_levels(content.decode(_SOURCE_ENCODING), label)),
+        )
+        return RiverTable(
+            river=label,
+            measurements=measurements,
+            freshness=freshness,
+            digest=validators.digest,
+            etag=validators.etag,
+            last_modified=validators.last_modified,
+        )
+
+    def forget(self) -> None:
+        """Drop every remembered validator so the next fetches download in full."""
+        with self._lock:
+            self._entries.clear()
+
+    def _fetch(
+        self,
+        method: str,
+        body: str,
+        phase: str,
+        deadline: Deadline,
+        parse: Callable[[bytes], Any],
+    ) -> Tuple[Any, str, _Validators]:
+        import requests
+
+        key = (method, LAKE_LEVEL_URL, body)
+        with self._lock:
+            cached = self._entries.get(key)
+        now = self._clock()
+        if cached is not None and now < cached.fresh_until:
+            return cached.value, FRESH, cached
+
+        headers: Dict[str, str] = dict(_FORM_HEADERS) if method == "POST" else {}
+        # A matched precondition on a POST is answered with 412, not 304, so
+        # river tables are compared by body hash instead.
+        conditional = cached is not None and method == "GET"
+        if conditional:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        kwargs: Dict[str, Any] = {"headers": headers}
+        if method == "POST":
+            kwargs["data"] = body
+        try:
+            response = _request(self._session, method, phase, deadline, **kwargs)
+        except requests.HTTPError as exc:
+            if not conditional or exc.response is None or exc.response.status_code != 412:
+                raise
+            # The server rejected the validators; forget them and ask again.
+            with self._lock:
+                self._entries.pop(key, None)
+            cached = None
+            kwargs["headers"] = {}
+            response = _request(self._session, method, phase, deadline, **kwargs)
+
+        lifetime = _lifetime(response.headers, now)
+        if cached is not None and response.status_code == 304:
+            freshness, value, digest = NOT_MODIFIED, cached.value, cached.digest
+            etag = response.headers.get("ETag") or cached.etag
+            last_modified = response.headers.get("Last-Modified") or cached.last_modified
+        else:
+            content = response.content
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            digest = hashlib.sha256(content).hexdigest()
+            if method == "POST":
+                same = cached is not None and digest == cached.digest
+            else:
+                same = cached is not None and _same_content(cached, etag, last_modified, digest)
+            if same:
+                freshness, value = UNCHANGED, cached.value
+            else:
+                deadline.check(PHASE_PARSE)
+                freshness, value = MODIFIED, parse(content)
+
+        validators = _Validators(
+            etag=etag,
+            last_modified=last_modified,
+            digest=digest,
+            fresh_until=now + (lifetime or 0.0),
+            value=value,
+        )
+        with self._lock:
+            if lifetime is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = validators
+        return value, freshness, validators
+
+
+def _parse_choices(content: bytes) -> Tuple[Tuple[str, str], ...]:
+    return tuple(_river_choices(content.decode(_SOURCE_ENCODING)))
+
+
+def _same_content(
+    cached: _Validators, etag: Optional[str], last_modified: Optional[str], digest: str
+) -> bool:
+    if etag and cached.etag:
+        return etag == cached.etag
+    if last_modified and cached.last_modified:
+        return last_modified == cached.last_modified
+    # No validators from the server: compare the bodies themselves.
+    return digest == cached.digest
+
+
+def _lifetime(headers: Any, now: float) -> Optional[float]:
+    """Seconds a response may be reused without asking, or None for no-store."""
+    directives: Dict[str, Optional[str]] = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    max_age = directives.get("max-age")
+    if max_age is not None:
+        try:
+            return max(0.0, float(max_age) - float(headers.get("Age", 0) or 0))
+        except ValueError:
+            return 0.0
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            expires_at = parsedate_to_datetime(expires)
+        except (TypeError, ValueError):
+            return 0.0
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return max(0.0, expires_at.timestamp() - now)
+    return 0.0
@@ -0,0 +1,295 @@
+"""Delta feed of lakes that changed between successive snapshots.
+
+A :class:`DeltaFeed` with a state file also keeps the most recent events
+in an NDJSON log beside it, so a consumer that fell behind can catch up
+from the last cursor it handled::
+
+    for event in DeltaFeed("feed.json").since(last_cursor):
+        handle(event)
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from .siljan import LakeMeasurement
+
+ADDED = "added"
+CHANGED = "changed"
+REMOVED = "removed"
+
+_STATE_VERSION = 1
+# Events kept in the log beside the state file for :meth:`DeltaFeed.since`.
+DEFAULT_MAX_LOG_EVENTS = 10_000
+
+LakeState = Tuple[Decimal, str]
+
+
+class _LogInfo(NamedTuple):
+    events: int
+    last_cursor: int
+    torn: bool
+
+
+@dataclass(frozen=True)
+class DeltaEvent:
+    """One changed lake; ``cursor`` increases by one per event."""
+
+    cursor: int
+    kind: str
+    river: str
+    lake: str
+    level_m: Optional[Decimal]
+    timestamp: Optional[str]
+    previous_level_m: Optional[Decimal] = None
+    previous_timestamp: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        """Plain JSON-ready fields, with levels as strings to keep precision."""
+        return {
+            key: str(value) if isinstance(value, Decimal) else value
+            for key, value in asdict(self).items()
+        }
+
+    def to_json(self) -> str:
+        """Serialise as one NDJSON line."""
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, object]) -> "DeltaEvent":
+        """Inverse of :meth:`to_dict`."""
+        fields = dict(data)
+        for key in ("level_m", "previous_level_m"):
+            if fields.get(key) is not None:
+                fields[key] = Decimal(str(fields[key]))
+        return cls(**fields)  # type: ignore[arg-type]
+
+
+class CursorExpiredError(ValueError):
+    """Raised when events after a cursor are no longer in the event log."""
+
+
+class DeltaFeed:
+    """Diff consecutive snapshots and number the resulting events.
+
+    Only the last level and timestamp of each lake is kept, so each update
+    costs O(lakes in the snapshot) and emits O(changes) events. Snapshots
+    may cover the whole network or a few rivers: lakes are only reported
+    removed from rivers that are present in the new snapshot.
+
+    Pass ``state_path`` to resume from the cursor and lakes stored by
+    :meth:`save`, so a restarted consumer continues where it stopped instead
+    of receiving every lake as added again. Call :meth:`save` once the
+    events have been delivered, or :meth:`revert` when they could not be.
+    Saved events are also appended to :attr:`log_path`, which keeps at
+    least the last ``max_log_events`` of them for :meth:`since`. The log is
+    trimmed back to that bound once it grows past twice the bound, so a
+    save costs O(changes) amortised.
+    """
+
+    def __init__(
+        self,
+        state_path: Union[str, Path, None] = None,
+        max_log_events: int = DEFAULT_MAX_LOG_EVENTS,
+    ) -> None:
+        if max_log_events < 1:
+            raise ValueError("max_log_events must be at least 1")
+        self._state_path = Path(state_path) if state_path is not None else None
+        self._max_log_events = max_log_events
+        self.cursor = 0
+        self._lakes: Dict[str, Dict[str, LakeState]] = {}
+        self._unsaved: List[DeltaEvent] = []
+        # Event count and last cursor of the log file, read on the first save.
+        self._log_info: Optional[_LogInfo] = None
+        if self._state_path is not None and self._state_path.exists():
+            self._load(self._state_path)
+        self._saved = (self.cursor, dict(self._lakes))
+
+    def update(
+        self, snapshot: Mapping[str, Iterable[LakeMeasurement]]
+    ) -> List[DeltaEvent]:
+        """Return the events for ``snapshot`` (measurements per river)."""
+        events: List[DeltaEvent] = []
+        for river, measurements in snapshot.items():
+            previous = self._lakes.get(river, {})
+            current: Dict[str, LakeState] = {}
+            for measurement in measurements:
+                state = (measurement.level_m, measurement.timestamp)
+                current[measurement.lake] = state
+                before = previous.get(measurement.lake)
+                if before == state:
+                    continue
+                events.append(
+                    self._event(
+                        ADDED if before is None else CHANGED,
+                        river,
+                        measurement.lake,
+                        state,
+                        before,
+                    )
+                )
+            for lake, before in previous.items():
+                if lake not in current:
+                    events.append(self._event(REMOVED, river, lake, None, before))
+            self._lakes[river] = current
+        self._unsaved.extend(events)
+        return events
+
+    @property
+    def log_path(self) -> Optional[Path]:
+        """NDJSON event log beside the state file, e.g. ``feed.events.ndjson``."""
+        if self._state_path is None:
+            return None
+        return _log_path(self._state_path)
+
+    def since(self, cursor: int) -> List[DeltaEvent]:
+        """Saved events after ``cursor``, oldest first.
+
+        Raises :class:`CursorExpiredError` when some of them have already
+        been trimmed from the log; start over from a fresh feed then.
+        """
+        if self._state_path is None:
+            raise ValueError("DeltaFeed was created without a state_path")
+        saved_cursor = self._saved[0]
+        if cursor >= saved_cursor:
+            return []
+        events = _read_log_after(_log_path(self._state_path), cursor, saved_cursor)
+        if not events or events[0].cursor != cursor + 1:
+            oldest = events[0].cursor if events else saved_cursor + 1
+            raise CursorExpiredError(
+                f"Events after cursor {cursor} are no longer retained "
+                f"(the log starts at {oldest})"
+            )
+        return events
+
+    def save(self) -> None:
+        """Persist the cursor and last-seen lakes to ``state_path``.
+
+        Events since the previous save are appended to the event log first.
+        """
+        if self._state_path is None:
+            raise ValueError("DeltaFeed was created without a state_path")
+        if self._unsaved:
+            self._append_log(_log_path(self._state_path), self._unsaved)
+            self._unsaved = []
+        data = {
+            "version": _STATE_VERSION,
+            "cursor": self.cursor,
+            "lakes": {
+                river: {lake: [str(level), timestamp] for lake, (level, timestamp) in lakes.items()}
+                for river, lakes in self._lakes.items()
+            },
+        }
+        _replace_file(self._state_path, json.dumps(data, ensure_ascii=False))
+        self._saved = (self.cursor, dict(self._lakes))
+
+    def revert(self) -> None:
+        """Forget the updates since the last save or load.
+
+        The next update emits their events again, with the same cursors.
+        """
+        cursor, lakes = self._saved
+        self.cursor = cursor
+        # Updates replace the lakes of a river rather than editing them, so a
+        # shallow copy is enough.
+        self._lakes = dict(lakes)
+        self._unsaved = []
+
+    def _append_log(self, path: Path, events: List[DeltaEvent]) -> None:
+        if self._log_info is None:
+            self._log_info = _scan_log(path)
+        count, last_cursor, torn = self._log_info
+        first = events[0].cursor
+        # Cursors reused after a crash between writing the log and the state
+        # replace the events that were never confirmed, and a torn append is
+        # dropped; both need a rewrite, as does trimming an oversized log.
+        if torn or last_cursor >= first or count + len(events) > 2 * self._max_log_events:
+            kept = [event for event in _read_log(path) if event.cursor < first]
+            kept = (kept + events)[-self._max_log_events :]
+            _replace_file(path, "".join(event.to_json() + "\n" for event in kept))
+            self._log_info = _LogInfo(len(kept), kept[-1].cursor, False)
+            return
+        with path.open("a", encoding="utf-8") as log:
+            log.write("".join(event.to_json() + "\n" for event in events))
+        self._log_info = _LogInfo(count + len(events), events[-1].cursor, False)
+
+    def _event(
+        self,
+        kind: str,
+        river: str,
+        lake: str,
+        state: Optional[LakeState],
+        before: Optional[LakeState],
+    ) -> DeltaEvent:
+        self.cursor += 1
+        return DeltaEvent(
+            cursor=self.cursor,
+            kind=kind,
+            river=river,
+            lake=lake,
+            level_m=state[0] if state else None,
+            timestamp=state[1] if state else None,
+            previous_level_m=before[0] if before else None,
+            previous_timestamp=before[1] if before else None,
+        )
+
+    def _load(self, path: Path) -> None:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != _STATE_VERSION:
+            raise ValueError(f"Unsupported delta state version in {path}")
+        self.cursor = int(data["cursor"])
+        self._lakes = {
+            river: {lake: (Decimal(level), timestamp) for lake, (level, timestamp) in lakes.items()}
+            for river, lakes in data["lakes"].items()
+        }
+
+
+def _log_path(state_path: Path) -> Path:
+    return state_path.with_name(f"{state_path.stem}.events.ndjson")
+
+
+def _log_lines(path: Path) -> List[str]:
+    # A line without its newline is an append cut short by a crash.
+    if not path.exists():
+        return []
+    with path.open(encoding="utf-8") as lines:
+        return [line for line in lines if line.endswith("\n") and line.strip()]
+
+
+def _read_log(path: Path) -> List[DeltaEvent]:
+    return [DeltaEvent.from_dict(json.loads(line)) for line in _log_lines(path)]
+
+
+def _read_log_after(path: Path, cursor: int, saved_cursor: int) -> List[DeltaEvent]:
+    """Confirmed events after ``cursor``, parsing only those from the tail."""
+    events: List[DeltaEvent] = []
+    for line in reversed(_log_lines(path)):
+        event = DeltaEvent.from_dict(json.loads(line))
+        if event.cursor <= cursor:
+            break
+        if event.cursor <= saved_cursor:
+            events.append(event)
+    events.reverse()
+    return events
+
+
+def _scan_log(path: Path) -> _LogInfo:
+    if not path.exists():
+        return _LogInfo(0, 0, False)
+    with path.open(encoding="utf-8") as log:
+        lines = list(log)
+    complete = [line for line in lines if line.endswith("\n") and line.strip()]
+    last_cursor = int(json.loads(complete[-1])["cursor"]) if complete else 0
+    return _LogInfo(len(complete), last_cursor, bool(lines) and not lines[-1].endswith("\n"))
+
+
+def _replace_file(path: Path, text: str) -> None:
+    # Write beside the target and rename so a crash never leaves a torn file.
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, path)
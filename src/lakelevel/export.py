@@ -0,0 +1,228 @@
+"""Columnar export of snapshots and stored history.
+
+Parquet and Arrow IPC output need PyArrow (``pip install lakelevel[export]``);
+without it, exports fall back to CSV with the same columns.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from .siljan import LakeMeasurement, parse_measurement_time
+
+if TYPE_CHECKING:
+    from .history import Observation
+
+PARQUET = "parquet"
+ARROW = "arrow"
+CSV = "csv"
+FORMATS = (PARQUET, ARROW, CSV)
+DEFAULT_ROW_GROUP_SIZE = 10_000
+
+COLUMNS = (
+    "river",
+    "lake",
+    "level_m",
+    "measured_at",
+    "fetched_at",
+    "reference_min_m",
+    "reference_mean_m",
+    "reference_max_m",
+    "reference_period",
+)
+
+_SUFFIX_FORMATS = {
+    ".parquet": PARQUET,
+    ".pq": PARQUET,
+    ".arrow": ARROW,
+    ".feather": ARROW,
+    ".ipc": ARROW,
+    ".csv": CSV,
+}
+
+ExportRow = Tuple[
+    str,
+    str,
+    Decimal,
+    Optional[datetime],
+    datetime,
+    Optional[Decimal],
+    Optional[Decimal],
+    Optional[Decimal],
+    Optional[str],
+]
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    """What an export wrote; ``format`` is ``csv`` when PyArrow was missing."""
+
+    path: Path
+    format: str
+    rows: int
+
+
+def snapshot_rows(
+    measurements: Union[Mapping[str, Iterable[LakeMeasurement]], Iterable[LakeMeasurement]],
+    fetched_at: Optional[datetime] = None,
+    today: Optional[date] = None,
+) -> Iterator[ExportRow]:
+    """Export rows for current readings, e.g. a :func:`fetch_snapshot` result.
+
+    ``measured_at`` is the source timestamp resolved against ``today`` (naive
+    Swedish local time); ``fetched_at`` defaults to now in UTC.
+    """
+    fetched = fetched_at or datetime.now(timezone.utc)
+    today = today or date.today()
+    if isinstance(measurements, Mapping):
+        measurements = (m for river in measurements.values() for m in river)
+    for measurement in measurements:
+        reference = measurement.reference
+        yield (
+            measurement.river,
+            measurement.lake,
+            measurement.level_m,
+            parse_measurement_time(measurement.timestamp, today),
+            fetched,
+            reference.min_m if reference else None,
+            reference.mean_m if reference else None,
+            reference.max_m if reference else None,
+            reference.period if reference else None,
+        )
+
+
+def history_rows(observations: Iterable[Observation]) -> Iterator[ExportRow]:
+    """Export rows for stored observations, e.g. ``HistoryStore.observations()``.
+
+    The store keeps no reference statistics, so those columns are empty.
+    """
+    for observation in observations:
+        yield (
+            observation.river,
+            observation.lake,
+            observation.level_m,
+            observation.observed_at,
+            observation.fetched_at,
+            None,
+            None,
+            None,
+            None,
+        )
+
+
+def export_rows(
+    rows: Iterable[ExportRow],
+    path: Union[str, Path],
+    format: Optional[str] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+) -> ExportResult:
+    """Write ``rows`` to ``path`` in ``row_group_size`` chunks.
+
+    The format is taken from ``format`` or the file suffix (default Parquet).
+    At most one chunk is held in memory at a time. When PyArrow is not
+    installed, CSV is written instead, next to ``path`` with a ``.csv``
+    suffix.
+    """
+    if row_group_size < 1:
+        raise ValueError("row_group_size must be at least 1")
+    path = Path(path)
+    format = format or _SUFFIX_FORMATS.get(path.suffix.lower(), PARQUET)
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format '{format}'")
+
+    if format != CSV:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            format = CSV
+            path = path.with_suffix(".csv")
+
+    chunks = _chunks(iter(rows), row_group_size)
+    if format == CSV:
+        count = _write_csv(chunks, path)
+    else:
+        count = _write_arrow(chunks, path, format)
+    return ExportResult(path=path, format=format, rows=count)
+
+
+def _chunks(rows: Iterator[ExportRow], size: int) -> Iterator[List[ExportRow]]:
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_csv(chunks: Iterator[List[ExportRow]], path: Path) -> int:
+    count = 0
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        for chunk in chunks:
+            writer.writerows(
+                tuple("" if value is None else _csv_value(value) for value in row)
+                for row in chunk
+            )
+            count += len(chunk)
+    return count
+
+
+def _csv_value(value: object) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _write_arrow(chunks: Iterator[List[ExportRow]], path: Path, format: str) -> int:
+    import pyarrow as pa
+
+    schema = pa.schema(
+        [
+            pa.field("river", pa.string(), nullable=False),
+            pa.field("lake", pa.string(), nullable=False),
+            pa.field("level_m", pa.float64(), nullable=False),
+            pa.field("measured_at", pa.timestamp("s")),
+            pa.field("fetched_at", pa.timestamp("us", tz="UTC"), nullable=False),
+            pa.field("reference_min_m", pa.float64()),
+            pa.field("reference_mean_m", pa.float64()),
+            pa.field("reference_max_m", pa.float64()),
+            pa.field("reference_period", pa.string()),
+        ]
+    )
+    if format == PARQUET:
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(str(path), schema)
+    else:
+        writer = pa.ipc.new_file(str(path), schema)
+
+    count = 0
+    with writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            arrays = [
+                pa.array(
+                    [_arrow_value(value) for value in column],
+                    type=field.type,
+                )
+                for column, field in zip(columns, schema)
+            ]
+            batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+            if format == PARQUET:
+                writer.write_table(pa.Table.from_batches([batch]), row_group_size=len(chunk))
+            else:
+                writer.write_batch(batch)
+            count += len(chunk)
+    return count
+
+
+def _arrow_value(value: object) -> object:
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
@@ -0,0 +1,387 @@
+"""Local history of lake level observations.
+
+Day, week and month rollups are maintained next to the raw observations as
+they are recorded, so range queries over years of data read a few hundred
+summary rows instead of every reading.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .rollups import (
+    DEFAULT_MAX_POINTS,
+    RAW,
+    RESOLUTIONS,
+    ROLLUP_RESOLUTIONS,
+    Rollup,
+    bucket_start,
+    downsample,
+    next_bucket,
+    rollup,
+)
+from .siljan import LakeMeasurement, measurement_history
+
+SeriesKey = Tuple[str, str]
+
+# With ``shape=True`` a resolution may return this many times the point
+# budget before downsampling brings it back within it.
+SHAPE_OVERSAMPLE = 8
+# Bump when the rollup layout changes; older files are rebuilt on open.
+_ROLLUP_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    river TEXT NOT NULL,
+    lake TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    level_m TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (river, lake, observed_at)
+)
+"""
+
+_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    river TEXT NOT NULL,
+    lake TEXT NOT NULL,
+    bucket_start TEXT NOT NULL,
+    min_m TEXT NOT NULL,
+    max_m TEXT NOT NULL,
+    mean_m TEXT NOT NULL,
+    last_m TEXT NOT NULL,
+    last_at TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (resolution, river, lake, bucket_start)
+)
+"""
+
+
+@dataclass(frozen=True)
+class Observation:
+    """One stored reading; ``observed_at`` is Swedish local, ``fetched_at`` UTC."""
+
+    river: str
+    lake: str
+    observed_at: datetime
+    level_m: Decimal
+    fetched_at: datetime
+
+
+@dataclass(frozen=True)
+class HistoryRange:
+    """Result of :meth:`HistoryStore.query`: one resolution for every series."""
+
+    resolution: str
+    series: Dict[SeriesKey, List[Rollup]]
+
+
+class HistoryStore:
+    """SQLite-backed store of dated lake level observations.
+
+    Observations are keyed by river, lake and observation time, so recording
+    overlapping river tables does not create duplicates. Times are naive
+    Swedish local time as published by the source; ``fetched_at`` is UTC.
+    Files written before rollups existed get them built when opened.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute(_SCHEMA)
+        self._connection.execute(_ROLLUP_SCHEMA)
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+        if version < _ROLLUP_VERSION:
+            self.rebuild_rollups()
+            self._connection.execute(f"PRAGMA user_version = {_ROLLUP_VERSION}")
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def record(
+        self,
+        measurements: Iterable[LakeMeasurement],
+        today: Optional[date] = None,
+        fetched_at: Optional[datetime] = None,
+    ) -> int:
+        """Store the daily columns and current reading of each measurement.
+
+        The rollups of the buckets these readings fall into are recomputed
+        in the same transaction.
+        """
+        today = today or date.today()
+        fetched = (fetched_at or datetime.now(timezone.utc)).isoformat()
+        rows = []
+        spans: Dict[SeriesKey, Tuple[datetime, datetime]] = {}
+        for measurement in measurements:
+            key = (measurement.river, measurement.lake)
+            for observed_at, level in measurement_history(measurement, today):
+                rows.append((*key, observed_at.isoformat(sep=" "), str(level), fetched))
+                first, last = spans.get(key, (observed_at, observed_at))
+                spans[key] = (min(first, observed_at), max(last, observed_at))
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO observations VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (river, lake, observed_at) "
+                "DO UPDATE SET level_m = excluded.level_m",
+                rows,
+            )
+            for key, (first, last) in spans.items():
+                self._refresh_rollups(key, first, last)
+        return len(rows)
+
+    def rebuild_rollups(self) -> None:
+        """Recompute every rollup from the stored observations."""
+        with self._connection:
+            self._connection.execute("DELETE FROM rollups")
+            spans = self._connection.execute(
+                "SELECT river, lake, MIN(observed_at), MAX(observed_at) "
+                "FROM observations GROUP BY river, lake"
+            ).fetchall()
+            for river, lake, first, last in spans:
+                self._refresh_rollups(
+                    (river, lake), datetime.fromisoformat(first), datetime.fromisoformat(last)
+                )
+
+    def rollups(
+        self,
+        resolution: str,
+        river: Optional[str] = None,
+        lakes: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict[SeriesKey, List[Rollup]]:
+        """Return time-ordered rollups per ``(river, lake)`` at ``resolution``.
+
+        Buckets that overlap ``start`` are included whole. At ``"raw"``
+        every observation is returned as a rollup of one reading.
+        """
+        result: Dict[SeriesKey, List[Rollup]] = {}
+        if resolution == RAW:
+            for observation in self.observations(river, lakes, start, end):
+                level = observation.level_m
+                result.setdefault((observation.river, observation.lake), []).append(
+                    Rollup(
+                        start=observation.observed_at,
+                        min_m=level,
+                        max_m=level,
+                        mean_m=level,
+                        last_m=level,
+                        last_at=observation.observed_at,
+                        count=1,
+                    )
+                )
+            return result
+
+        where, params = _rollup_filters(resolution, river, lakes, start, end)
+        query = (
+            "SELECT river, lake, bucket_start, min_m, max_m, mean_m, last_m, last_at, count "
+            f"FROM rollups WHERE {where} ORDER BY river, lake, bucket_start"
+        )
+        for row_river, row_lake, *row in self._connection.execute(query, params):
+            result.setdefault((row_river, row_lake), []).append(_rollup_from_row(row))
+        return result
+
+    def query(
+        self,
+        river: Optional[str] = None,
+        lakes: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+        shape: bool = False,
+    ) -> HistoryRange:
+        """Read a range at the finest resolution that fits ``max_points``.
+
+        The resolution is chosen from raw, day, week and month so that no
+        series has more than ``max_points`` points, falling back to months
+        when even those exceed it. With ``shape=True`` a finer resolution
+        of up to ``SHAPE_OVERSAMPLE`` times the budget is read and
+        downsampled with :func:`~lakelevel.rollups.downsample`, which keeps
+        peaks and troughs for charts and always honours the budget.
+        """
+        if max_points < 1:
+            raise ValueError("max_points must be at least 1")
+        lakes = None if lakes is None else list(lakes)
+        allowed = max_points * SHAPE_OVERSAMPLE if shape else max_points
+        chosen = RESOLUTIONS[-1]
+        for resolution in RESOLUTIONS:
+            if self._longest_series(resolution, river, lakes, start, end) <= allowed:
+                chosen = resolution
+                break
+        series = self.rollups(chosen, river, lakes, start, end)
+        if shape:
+            series = {key: downsample(points, max_points) for key, points in series.items()}
+        return HistoryRange(resolution=chosen, series=series)
+
+    def series(
+        self,
+        river: Optional[str] = None,
+        lakes: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict[SeriesKey, List[Tuple[datetime, Decimal]]]:
+        """Return time-ordered observations per ``(river, lake)``."""
+        result: Dict[SeriesKey, List[Tuple[datetime, Decimal]]] = {}
+        for observation in self.observations(river, lakes, start, end):
+            result.setdefault((observation.river, observation.lake), []).append(
+                (observation.observed_at, observation.level_m)
+            )
+        return result
+
+    def rivers(self) -> List[str]:
+        """Return the distinct river labels that have stored observations."""
+        rows = self._connection.execute(
+            "SELECT DISTINCT river FROM observations ORDER BY river"
+        ).fetchall()
+        return [river for (river,) in rows]
+
+    def observations(
+        self,
+        river: Optional[str] = None,
+        lakes: Optional[Iterable[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[Observation]:
+        """Stream stored observations ordered by river, lake and time.
+
+        Rows are read from the cursor as they are consumed, so exporting a
+        large history does not load it into memory.
+        """
+        where, params = _filters("observed_at", river, lakes, start, end)
+        query = (
+            "SELECT river, lake, observed_at, level_m, fetched_at "
+            f"FROM observations WHERE {where} ORDER BY river, lake, observed_at"
+        )
+
+        for row_river, row_lake, observed_at, level, fetched_at in self._connection.execute(
+            query, params
+        ):
+            yield Observation(
+                river=row_river,
+                lake=row_lake,
+                observed_at=datetime.fromisoformat(observed_at),
+                level_m=Decimal(level),
+                fetched_at=datetime.fromisoformat(fetched_at),
+            )
+
+    def _longest_series(
+        self,
+        resolution: str,
+        river: Optional[str],
+        lakes: Optional[List[str]],
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> int:
+        if resolution == RAW:
+            where, params = _filters("observed_at", river, lakes, start, end)
+            table = "observations"
+        else:
+            where, params = _rollup_filters(resolution, river, lakes, start, end)
+            table = "rollups"
+        (longest,) = self._connection.execute(
+            f"SELECT COALESCE(MAX(n), 0) FROM "
+            f"(SELECT COUNT(*) AS n FROM {table} WHERE {where} GROUP BY river, lake)",
+            params,
+        ).fetchone()
+        return longest
+
+    def _refresh_rollups(self, key: SeriesKey, first: datetime, last: datetime) -> None:
+        # Every bucket touched by [first, last] is recomputed whole, so the
+        # observations read must cover the outermost week and month.
+        lower = min(bucket_start(first, resolution) for resolution in ROLLUP_RESOLUTIONS)
+        upper = max(
+            next_bucket(bucket_start(last, resolution), resolution)
+            for resolution in ROLLUP_RESOLUTIONS
+        )
+        points = [
+            (datetime.fromisoformat(observed_at), Decimal(level))
+            for observed_at, level in self._connection.execute(
+                "SELECT observed_at, level_m FROM observations "
+                "WHERE river = ? AND lake = ? AND observed_at >= ? AND observed_at < ?",
+                (*key, lower.isoformat(sep=" "), upper.isoformat(sep=" ")),
+            )
+        ]
+        rows = []
+        for resolution in ROLLUP_RESOLUTIONS:
+            touched = (bucket_start(first, resolution), bucket_start(last, resolution))
+            for item in rollup(points, resolution):
+                if touched[0] <= item.start <= touched[1]:
+                    rows.append(
+                        (
+                            resolution,
+                            *key,
+                            item.start.isoformat(sep=" "),
+                            str(item.min_m),
+                            str(item.max_m),
+                            str(item.mean_m),
+                            str(item.last_m),
+                            item.last_at.isoformat(sep=" "),
+                            item.count,
+                        )
+                    )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+
+def _filters(
+    column: str,
+    river: Optional[str],
+    lakes: Optional[Iterable[str]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Tuple[str, List[str]]:
+    clauses: List[str] = ["1 = 1"]
+    params: List[str] = []
+    if river is not None:
+        clauses.append("river = ?")
+        params.append(river)
+    if lakes is not None:
+        names = list(lakes)
+        clauses.append(f"lake IN ({', '.join('?' for _ in names)})")
+        params.extend(names)
+    if start is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(start.isoformat(sep=" "))
+    if end is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(end.isoformat(sep=" "))
+    return " AND ".join(clauses), params
+
+
+def _rollup_filters(
+    resolution: str,
+    river: Optional[str],
+    lakes: Optional[Iterable[str]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Tuple[str, List[str]]:
+    if start is not None:
+        start = bucket_start(start, resolution)
+    where, params = _filters("bucket_start", river, lakes, start, end)
+    return f"resolution = ? AND {where}", [resolution, *params]
+
+
+def _rollup_from_row(row: List) -> Rollup:
+    start, min_m, max_m, mean_m, last_m, last_at, count = row
+    return Rollup(
+        start=datetime.fromisoformat(start),
+        min_m=Decimal(min_m),
+        max_m=Decimal(max_m),
+        mean_m=Decimal(mean_m),
+        last_m=Decimal(last_m),
+        last_at=datetime.fromisoformat(last_at),
+        count=count,
+    )
@@ -0,0 +1,318 @@
+"""Adaptive limit on concurrent requests to the source.
+
+:class:`AdaptiveLimiter` follows AIMD (additive increase, multiplicative
+decrease): every window of fast, successful responses raises the limit by
+one, while a slow response, a 429/5xx or a connection error cuts it in
+half. ``Retry-After`` pauses all requests until the server's time is up.
+:class:`LimitingAdapter` applies a limiter to a ``requests`` session::
+
+    limiter = AdaptiveLimiter(max_limit=8)
+    snapshot = fetch_snapshot(session=limited_session(limiter), fetch_workers=8)
+    print(limiter.stats())
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import logging
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+
+from .siljan import LAKE_LEVEL_URL, DeadlineExceeded, _REQUEST_DEADLINE, _new_session
+
+if TYPE_CHECKING:
+    import requests
+
+    from .siljan import Deadline
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 16
+# A response this many times slower than the fastest recent one counts as
+# congestion.
+DEFAULT_LATENCY_TOLERANCE = 2.0
+DEFAULT_BACKOFF_RATIO = 0.5
+# Longest Retry-After that is honoured; longer values are capped.
+MAX_RETRY_AFTER = 120.0
+DEFAULT_THROTTLE_RETRIES = 2
+# Pause after a 429/503 that did not say how long to wait.
+DEFAULT_THROTTLE_PAUSE = 1.0
+_THROTTLE_STATUSES = {429, 503}
+
+
+@dataclass(frozen=True)
+class LimiterStats:
+    """Point-in-time view of a limiter for logging or metrics."""
+
+    limit: int
+    in_flight: int
+    queue_depth: int
+    min_latency_s: Optional[float]
+    successes: int
+    throttled: int
+    errors: int
+    paused_for_s: float
+
+
+class AdaptiveLimiter:
+    """Thread-safe AIMD limit on in-flight requests.
+
+    ``limit`` starts at ``initial`` (default: ``max_limit``) and moves
+    between ``min_limit`` and ``max_limit``. Latency is judged against the
+    fastest response seen recently, which slowly decays so the baseline
+    follows the upstream over the day.
+    """
+
+    def __init__(
+        self,
+        initial: Optional[int] = None,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+        backoff_ratio: float = DEFAULT_BACKOFF_RATIO,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self._limit = float(max(min_limit, min(max_limit, initial or max_limit)))
+        self._tolerance = latency_tolerance
+        self._backoff_ratio = backoff_ratio
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._paused_until = 0.0
+        self._last_decrease = -math.inf
+        self._min_latency: Optional[float] = None
+        self._successes = 0
+        self._throttled = 0
+        self._errors = 0
+
+    @property
+    def limit(self) -> int:
+        """Requests currently allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers waiting for a slot."""
+        return self._waiting
+
+    def stats(self) -> LimiterStats:
+        with self._condition:
+            return LimiterStats(
+                limit=int(self._limit),
+                in_flight=self._in_flight,
+                queue_depth=self._waiting,
+                min_latency_s=self._min_latency,
+                successes=self._successes,
+                throttled=self._throttled,
+                errors=self._errors,
+                paused_for_s=max(0.0, self._paused_until - self._clock()),
+            )
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a slot; False when ``timeout`` seconds pass first."""
+        end = None if timeout is None else self._clock() + timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    now = self._clock()
+                    if now >= self._paused_until and self._in_flight < int(self._limit):
+                        self._in_flight += 1
+                        return True
+                    wait = self._paused_until - now if now < self._paused_until else None
+                    if end is not None:
+                        if now >= end:
+                            return False
+                        wait = min(wait, end - now) if wait is not None else end - now
+                    self._condition.wait(wait)
+            finally:
+                self._waiting -= 1
+
+    def release(
+        self,
+        latency_s: Optional[float],
+        throttled: bool = False,
+        failed: bool = False,
+        retry_after_s: Optional[float] = None,
+    ) -> None:
+        """Return a slot and adjust the limit from how the request went."""
+        with self._condition:
+            self._in_flight -= 1
+            now = self._clock()
+            if retry_after_s:
+                self._paused_until = max(
+                    self._paused_until, now + min(retry_after_s, MAX_RETRY_AFTER)
+                )
+            if throttled:
+                self._throttled += 1
+                self._decrease(now, latency_s, "throttled")
+            elif failed:
+                self._errors += 1
+                self._decrease(now, latency_s, "failed")
+            elif latency_s is not None:
+                self._successes += 1
+                self._observe(now, latency_s)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Hold a slot around a request whose outcome is not classified."""
+        self.acquire()
+        started = self._clock()
+        failed = False
+        finished = False
+        try:
+            yield
+            finished = True
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # An interrupt or an abandoned context says nothing about the
+            # source, so the slot is returned without a latency sample.
+            latency_s = self._clock() - started if finished or failed else None
+            self.release(latency_s, failed=failed)
+
+    def _observe(self, now: float, latency_s: float) -> None:
+        if self._min_latency is None or latency_s < self._min_latency:
+            self._min_latency = latency_s
+        else:
+            # Let the baseline drift up so one lucky response is not the
+            # yardstick forever.
+            self._min_latency += (latency_s - self._min_latency) * 0.01
+        if latency_s > self._tolerance * self._min_latency:
+            self._decrease(now, latency_s, "slow")
+        else:
+            # +1 per full window of successes.
+            self._set_limit(self._limit + 1 / max(1.0, self._limit))
+
+    def _decrease(self, now: float, latency_s: Optional[float], reason: str) -> None:
+        # One cut per round trip: requests already in flight when the
+        # limit dropped report the same congestion.
+        if now - self._last_decrease < (latency_s or 0.0):
+            return
+        self._last_decrease = now
+        self._set_limit(self._limit * self._backoff_ratio, reason)
+
+    def _set_limit(self, value: float, reason: str = "") -> None:
+        before = int(self._limit)
+        self._limit = max(float(self.min_limit), min(float(self.max_limit), value))
+        if int(self._limit) != before:
+            _LOGGER.debug(
+                "Concurrency limit %s -> %s%s", before, int(self._limit),
+                f" ({reason})" if reason else "",
+            )
+
+
+class LimitingAdapter(HTTPAdapter):
+    """HTTP adapter that sends every request through an :class:`AdaptiveLimiter`.
+
+    429 and 503 responses pause the limiter for their ``Retry-After`` and
+    are retried up to ``throttle_retries`` times; other 5xx responses and
+    connection errors only shrink the limit.
+
+    Requests sent by the client functions carry their :class:`Deadline`:
+    waiting for a slot is bounded by the remaining budget, the socket
+    timeouts are recomputed once a slot is free, and a ``Retry-After``
+    longer than the remaining budget raises :class:`DeadlineExceeded`
+    instead of retrying.
+    """
+
+    def __init__(
+        self,
+        limiter: AdaptiveLimiter,
+        throttle_retries: int = DEFAULT_THROTTLE_RETRIES,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.limiter = limiter
+        self.throttle_retries = throttle_retries
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        bound = _REQUEST_DEADLINE.get()
+        for attempt in range(self.throttle_retries + 1):
+            self._acquire(bound, kwargs)
+            started = time.monotonic()
+            try:
+                response = super().send(request, **kwargs)
+            except Exception:
+                self.limiter.release(time.monotonic() - started, failed=True)
+                raise
+            latency = time.monotonic() - started
+            throttled = response.status_code in _THROTTLE_STATUSES
+            retry_after = _retry_after(response.headers.get("Retry-After"))
+            pause = DEFAULT_THROTTLE_PAUSE if retry_after is None else retry_after
+            self.limiter.release(
+                latency,
+                throttled=throttled,
+                failed=response.status_code >= 500,
+                retry_after_s=pause if throttled else None,
+            )
+            if not throttled or attempt == self.throttle_retries:
+                return response
+            response.close()
+            if bound is not None:
+                deadline, phase = bound
+                remaining = deadline.remaining()
+                if remaining is not None and min(pause, MAX_RETRY_AFTER) >= remaining:
+                    raise DeadlineExceeded(phase, deadline.budget_s or 0)
+        return response
+
+    def _acquire(self, bound: Optional[Tuple[Deadline, str]], kwargs: Dict[str, Any]) -> None:
+        if bound is None:
+            self.limiter.acquire()
+            return
+        deadline, phase = bound
+        if not self.limiter.acquire(timeout=deadline.remaining()):
+            raise DeadlineExceeded(phase, deadline.budget_s or 0)
+        if deadline.expired:
+            self.limiter.release(None)
+            raise DeadlineExceeded(phase, deadline.budget_s or 0)
+        # Time spent queued for the slot comes out of this request's share.
+        kwargs["timeout"] = deadline.request_timeout(phase)
+
+
+def limited_session(
+    limiter: AdaptiveLimiter, session: Optional[requests.Session] = None
+) -> requests.Session:
+    """Return ``session`` (or a new one) with requests to the source limited."""
+    session = session or _new_session()
+    session.mount(
+        LAKE_LEVEL_URL,
+        LimitingAdapter(limiter, pool_connections=1, pool_maxsize=limiter.max_limit),
+    )
+    return session
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header given as seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,359 @@
+"""Push changed lakes to MQTT topics and HTTP webhooks.
+
+One process fetches and diffs the source with :class:`DeltaFeed` and a
+:class:`Publisher` fans the resulting events out to every sink, so adding
+consumers does not add upstream requests::
+
+    publisher = Publisher([WebhookSink("http://hub/lakes"), MqttSink("broker")])
+    feed = DeltaFeed("feed.json")
+    publish_changes(feed, publisher)
+
+Each sink has its own bounded queue and delivery thread. Events are sent
+in batches of up to ``max_batch``; a failed batch stays at the head of its
+queue and is retried with exponential backoff, and is dropped (and
+counted) after ``max_retries`` attempts. When a queue is full,
+:meth:`Publisher.publish` blocks, which slows the fetch loop down to the
+pace of the slowest sink instead of growing memory.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, replace
+import json
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Deque, Iterable, List, Optional, Sequence
+
+from .delta import REMOVED, DeltaEvent, DeltaFeed
+from .siljan import Deadline
+
+if TYPE_CHECKING:
+    import requests
+
+    from .conditional import ConditionalClient
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 100
+DEFAULT_MAX_QUEUE = 10_000
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+DEFAULT_TOPIC_PREFIX = "lakelevel"
+DEFAULT_SEND_TIMEOUT = 10.0
+# Seconds between fetches of the ``lakelevel publish`` command.
+DEFAULT_PUBLISH_INTERVAL = 900.0
+
+
+class PublishError(RuntimeError):
+    """Raised when a sink rejects a batch or the publisher cannot accept events."""
+
+
+class WebhookSink:
+    """POST each batch as ``{"events": [...]}`` JSON to ``url``."""
+
+    def __init__(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        timeout: float = DEFAULT_SEND_TIMEOUT,
+    ) -> None:
+        if session is None:
+            import requests
+
+            session = requests.Session()
+        self.url = url
+        self.name = url
+        self._session = session
+        self._timeout = timeout
+
+    def send(self, events: Sequence[DeltaEvent]) -> None:
+        response = self._session.post(
+            self.url,
+            data=json.dumps(
+                {"events": [event.to_dict() for event in events]}, ensure_ascii=False
+            ).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            timeout=self._timeout,
+        )
+        if response.status_code >= 300:
+            raise PublishError(f"Webhook {self.url} answered {response.status_code}")
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class MqttSink:
+    """Publish each lake as a retained message on ``prefix/river/lake``.
+
+    Removed lakes clear their retained message. Needs paho-mqtt
+    (``pip install lakelevel[publish]``) unless a connected ``client`` with
+    a paho-compatible ``publish`` method is passed in.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 1883,
+        prefix: str = DEFAULT_TOPIC_PREFIX,
+        qos: int = 1,
+        client: Any = None,
+    ) -> None:
+        self.prefix = prefix.rstrip("/")
+        self.name = f"mqtt://{host}:{port}/{self.prefix}"
+        self._qos = qos
+        self._owns_client = client is None
+        if client is None:
+            client = _connect_mqtt(host, port)
+        self._client = client
+
+    def topic(self, event: DeltaEvent) -> str:
+        return f"{self.prefix}/{_topic_level(event.river)}/{_topic_level(event.lake)}"
+
+    def send(self, events: Sequence[DeltaEvent]) -> None:
+        results = []
+        for event in events:
+            payload = "" if event.kind == REMOVED else event.to_json()
+            results.append(
+                self._client.publish(self.topic(event), payload, qos=self._qos, retain=True)
+            )
+        # One timeout for the whole batch rather than per message.
+        end = time.monotonic() + DEFAULT_SEND_TIMEOUT
+        for result in results:
+            if getattr(result, "rc", 0) != 0:
+                raise PublishError(f"MQTT publish to {self.name} failed with rc {result.rc}")
+            wait = getattr(result, "wait_for_publish", None)
+            if wait is not None:
+                wait(max(0.0, end - time.monotonic()))
+                if not result.is_published():
+                    raise PublishError(f"MQTT publish to {self.name} timed out")
+
+    def close(self) -> None:
+        if self._owns_client:
+            self._client.loop_stop()
+            self._client.disconnect()
+
+
+@dataclass
+class SinkStats:
+    """Delivery counters of one sink."""
+
+    name: str
+    queued: int = 0
+    sent: int = 0
+    retries: int = 0
+    dropped: int = 0
+
+
+class Publisher:
+    """Fan events out to sinks with batching, retries and backpressure."""
+
+    def __init__(
+        self,
+        sinks: Iterable[Any],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ) -> None:
+        if max_batch < 1 or max_queue < 1:
+            raise ValueError("max_batch and max_queue must be at least 1")
+        self._workers = [
+            _SinkWorker(sink, max_batch, max_queue, max_retries, backoff) for sink in sinks
+        ]
+        if not self._workers:
+            raise ValueError("Publisher needs at least one sink")
+
+    @property
+    def stats(self) -> List[SinkStats]:
+        """A copy of the counters per sink, e.g. to alert on dropped batches."""
+        return [worker.snapshot() for worker in self._workers]
+
+    def publish(self, events: Iterable[DeltaEvent], timeout: Optional[float] = None) -> None:
+        """Queue ``events`` for every sink, blocking while a queue is full.
+
+        Raises :class:`PublishError` when ``timeout`` seconds pass without
+        room in a queue.
+        """
+        events = list(events)
+        for worker in self._workers:
+            worker.put(events, timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queue is delivered or dropped; False on timeout."""
+        return all(worker.drain(timeout) for worker in self._workers)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush, stop the delivery threads and close the sinks."""
+        self.flush(timeout)
+        for worker in self._workers:
+            worker.stop()
+
+    def __enter__(self) -> "Publisher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def publish_changes(
+    feed: DeltaFeed,
+    publisher: Publisher,
+    rivers: Optional[Iterable[str]] = None,
+    timeout: float | None = None,
+    deadline: Optional[Deadline] = None,
+    flush_timeout: Optional[float] = None,
+    conditional: Optional[ConditionalClient] = None,
+) -> List[DeltaEvent]:
+    """Fetch once, publish what changed and save the state of ``feed``.
+
+    ``feed`` must have a ``state_path``. The state is saved only after
+    every sink has delivered the events, so a crash re-publishes rather
+    than loses them. When ``flush_timeout`` passes first or a sink drops a
+    batch, the feed is reverted instead and :class:`PublishError` is
+    raised; the next call produces the same events again. Reuse one
+    ``conditional`` client across calls so unchanged river tables are
+    revalidated instead of downloaded again.
+    """
+    from .snapshot import fetch_snapshot
+
+    snapshot = fetch_snapshot(
+        rivers, timeout=timeout, deadline=deadline, conditional=conditional
+    )
+    events = feed.update(snapshot)
+    if events:
+        dropped = _dropped(publisher)
+        publisher.publish(events)
+        delivered = publisher.flush(flush_timeout)
+        if not delivered or _dropped(publisher) > dropped:
+            feed.revert()
+            raise PublishError(
+                f"{len(events)} events were not delivered to every sink; state not saved"
+            )
+    feed.save()
+    return events
+
+
+def _dropped(publisher: Publisher) -> int:
+    return sum(stats.dropped for stats in publisher.stats)
+
+
+class _SinkWorker:
+    def __init__(
+        self, sink: Any, max_batch: int, max_queue: int, max_retries: int, backoff: float
+    ) -> None:
+        self.sink = sink
+        self.stats = SinkStats(name=getattr(sink, "name", type(sink).__name__))
+        self._max_batch = max_batch
+        self._max_queue = max_queue
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._queue: Deque[DeltaEvent] = deque()
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"lakelevel-publish-{self.stats.name}", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, events: List[DeltaEvent], timeout: Optional[float]) -> None:
+        with self._condition:
+            for event in events:
+                if not self._condition.wait_for(
+                    lambda: len(self._queue) < self._max_queue, timeout
+                ):
+                    raise PublishError(f"Queue for {self.stats.name} stayed full")
+                self._queue.append(event)
+                self.stats.queued = len(self._queue)
+                self._condition.notify_all()
+
+    def drain(self, timeout: Optional[float]) -> bool:
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._in_flight, timeout
+            )
+
+    def snapshot(self) -> SinkStats:
+        # The counters are updated by the worker thread under the condition.
+        with self._condition:
+            return replace(self.stats)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._thread.join()
+        close = getattr(self.sink, "close", None)
+        if close is not None:
+            close()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopping.is_set())
+                if not self._queue:
+                    return
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(self._max_batch, len(self._queue)))
+                ]
+                self._in_flight = len(batch)
+                self.stats.queued = len(self._queue)
+                self._condition.notify_all()
+            self._deliver(batch)
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def _deliver(self, batch: List[DeltaEvent]) -> None:
+        for attempt in range(self._max_retries + 1):
+            try:
+                self.sink.send(batch)
+            except Exception as exc:  # noqa: BLE001 - any sink failure is retried
+                if attempt == self._max_retries or self._stopping.is_set():
+                    _LOGGER.error(
+                        "Dropping %s events for %s after %s attempts: %s",
+                        len(batch),
+                        self.stats.name,
+                        attempt + 1,
+                        exc,
+                    )
+                    with self._condition:
+                        self.stats.dropped += len(batch)
+                    return
+                with self._condition:
+                    self.stats.retries += 1
+                delay = min(MAX_BACKOFF, self._backoff * 2**attempt)
+                _LOGGER.warning(
+                    "Delivery to %s failed (%s); retrying in %.1f s", self.stats.name, exc, delay
+                )
+                self._stopping.wait(delay)
+            else:
+                with self._condition:
+                    self.stats.sent += len(batch)
+                return
+
+
+def _topic_level(name: str) -> str:
+    # "/", "+" and "#" would split or wildcard the topic.
+    return "".join("_" if char in "/+#" else char for char in name.strip())
+
+
+def _connect_mqtt(host: str, port: int) -> Any:
+    try:
+        import paho.mqtt.client as mqtt
+    except ImportError as exc:
+        raise PublishError(
+            "MQTT publishing requires paho-mqtt: pip install lakelevel[publish]"
+        ) from exc
+
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+    else:  # paho-mqtt < 2
+        client = mqtt.Client()
+    client.connect(host, port)
+    client.loop_start()
+    return client
@@ -0,0 +1,347 @@
+"""Whole-network snapshots with overlapping fetches and parallel parsing."""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+import os
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .siljan import (
+    PHASE_PARSE,
+    Deadline,
+    LakeMeasurement,
+    _SOURCE_ENCODING,
+    _fetch_river_content,
+    _name_index,
+    _prime_session,
+    _resolve_deadline,
+    _river_choices,
+    lookup_name,
+    parse_lake_levels,
+)
+from .names import fold_name
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor
+
+    import requests
+
+    from .conditional import ConditionalClient
+    from .limiter import AdaptiveLimiter
+
+DEFAULT_FETCH_WORKERS = 4
+# Below this many river tables, process start-up and pickling cost more than
+# the parsing they would offload.
+DEFAULT_MIN_PROCESS_PARSE = 4
+
+Snapshot = Dict[str, List[LakeMeasurement]]
+RiverFetch = Callable[
+    [str, str, Deadline, Optional[Collection[str]]], List[LakeMeasurement]
+]
+
+
+def fetch_snapshot(
+    rivers: Optional[Iterable[str]] = None,
+    session: Optional[requests.Session] = None,
+    timeout: float | None = None,
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    parse_workers: Optional[int] = None,
+    min_process_parse: int = DEFAULT_MIN_PROCESS_PARSE,
+    deadline: Optional[Deadline] = None,
+    limiter: Optional[AdaptiveLimiter] = None,
+    conditional: Optional[ConditionalClient] = None,
+) -> Snapshot:
+    """Fetch and parse every lake of the given rivers (default: all rivers).
+
+    River tables are downloaded concurrently on ``fetch_workers`` threads and
+    the raw bytes are parsed on a pool of ``parse_workers`` processes
+    (default: one per CPU) as soon as each download finishes. Only the parsed
+    measurements travel back from the workers. Parsing stays in-process when
+    ``parse_workers`` is 0 or 1, or when fewer than ``min_process_parse``
+    rivers are requested. A ``deadline`` bounds the whole snapshot.
+
+    Without a ``session``, requests go through an :class:`AdaptiveLimiter`
+    (default: one capped at ``fetch_workers``) that backs off when the
+    source slows down or throttles.
+
+    With a ``conditional`` client, the landing page and river tables are
+    revalidated through it instead (its session is used), and unchanged
+    tables reuse the client's previous parse rather than going to the
+    process pool.
+
+    Returns measurements per river label, in landing page order.
+    """
+    deadline = _resolve_deadline(timeout, deadline)
+    if conditional is not None:
+        return _conditional_snapshot(conditional, rivers, fetch_workers, deadline)
+    session = session or _pooled_session(fetch_workers, limiter)
+    choices = _select_rivers(_river_choices(_prime_session(session, deadline)), rivers)
+    workers = max(1, min(fetch_workers, len(choices)))
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    use_processes = parse_workers > 1 and len(choices) >= min_process_parse
+
+    results: Snapshot = {}
+    with ThreadPoolExecutor(max_workers=workers) as fetch_pool:
+        downloads = {
+            fetch_pool.submit(_fetch_river_content, session, value, deadline): label
+            for label, value in choices
+        }
+        if use_processes:
+            # multiprocessing is only loaded when a snapshot needs the pool.
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+
+            # Spawned workers: forking while download threads hold locks can
+            # deadlock the children.
+            with ProcessPoolExecutor(
+                max_workers=min(parse_workers, len(choices)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as parse_pool:
+                results = _parse_as_completed(downloads, parse_pool, deadline)
+        else:
+            for future, label in downloads.items():
+                content = future.result()
+                deadline.check(PHASE_PARSE)
+                results[label] = parse_river_content(label, content)
+
+    return {label: results[label] for label, _ in choices}
+
+
+def iter_measurements(
+    rivers: Optional[Iterable[str]] = None,
+    lakes: Optional[Iterable[str]] = None,
+    session: Optional[requests.Session] = None,
+    timeout: float | None = None,
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    max_pending: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    limiter: Optional[AdaptiveLimiter] = None,
+    conditional: Optional[ConditionalClient] = None,
+) -> Iterator[LakeMeasurement]:
+    """Yield measurements river by river as each table is fetched and parsed.
+
+    Rivers (default: all) are downloaded and parsed on ``fetch_workers``
+    threads and yielded in completion order, so the first lakes arrive after
+    one round trip. At most ``max_pending`` rivers (default: twice the
+    workers) are in flight or waiting to be consumed, which keeps memory flat
+    however many rivers are requested. ``lakes`` keeps only lakes with these
+    names, compared like :class:`NameIndex` does, across all rivers.
+    A ``conditional`` client revalidates the tables as in
+    :func:`fetch_snapshot`.
+
+    Closing the iterator early cancels the rivers that have not started.
+    """
+    deadline = _resolve_deadline(timeout, deadline)
+    landing, fetch = _river_fetch(session, fetch_workers, limiter, conditional)
+    wanted = _wanted_lakes(lakes)
+    choices = iter(_select_rivers(landing(deadline), rivers))
+    window = max(1, max_pending or 2 * fetch_workers)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, fetch_workers))
+    pending: Set[Future] = set()
+
+    def submit(count: int) -> None:
+        for label, value in _take(choices, count):
+            pending.add(pool.submit(fetch, label, value, deadline, wanted))
+
+    try:
+        submit(window)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                yield from future.result()
+                submit(1)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_measurements(
+    rivers: Optional[Iterable[str]] = None,
+    lakes: Optional[Iterable[str]] = None,
+    session: Optional[requests.Session] = None,
+    timeout: float | None = None,
+    fetch_workers: int = DEFAULT_FETCH_WORKERS,
+    max_pending: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    limiter: Optional[AdaptiveLimiter] = None,
+    conditional: Optional[ConditionalClient] = None,
+) -> AsyncIterator[LakeMeasurement]:
+    """Asynchronous twin of :func:`iter_measurements`.
+
+    The blocking downloads and parsing run on a thread pool, so the event
+    loop stays free while rivers are in flight.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    deadline = _resolve_deadline(timeout, deadline)
+    landing, fetch = _river_fetch(session, fetch_workers, limiter, conditional)
+    wanted = _wanted_lakes(lakes)
+    window = max(1, max_pending or 2 * fetch_workers)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, fetch_workers))
+    pending: Set[asyncio.Future] = set()
+    try:
+        river_choices = await loop.run_in_executor(pool, landing, deadline)
+        choices = iter(_select_rivers(river_choices, rivers))
+
+        def submit(count: int) -> None:
+            for label, value in _take(choices, count):
+                pending.add(
+                    loop.run_in_executor(pool, fetch, label, value, deadline, wanted)
+                )
+
+        submit(window)
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                for measurement in future.result():
+                    yield measurement
+                submit(1)
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_river_content(river: str, content: bytes) -> List[LakeMeasurement]:
+    """Parse raw river-table bytes as served by the source."""
+    return parse_lake_levels(content.decode(_SOURCE_ENCODING), river)
+
+
+def _parse_as_completed(
+    downloads: Dict[Future, str], parse_pool: ProcessPoolExecutor, deadline: Deadline
+) -> Snapshot:
+    parses: Dict[Future, str] = {}
+    pending: Set[Future] = set(downloads)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future in downloads:
+                label = downloads[future]
+                content = future.result()
+                deadline.check(PHASE_PARSE)
+                parse = parse_pool.submit(parse_river_content, label, content)
+                parses[parse] = label
+                pending.add(parse)
+    return {label: future.result() for future, label in parses.items()}
+
+
+def _conditional_snapshot(
+    client: ConditionalClient,
+    rivers: Optional[Iterable[str]],
+    fetch_workers: int,
+    deadline: Deadline,
+) -> Snapshot:
+    choices = _select_rivers(client.river_choices(deadline), rivers)
+    workers = max(1, min(fetch_workers, len(choices)))
+    with ThreadPoolExecutor(max_workers=workers) as fetch_pool:
+        tables = list(
+            fetch_pool.map(
+                lambda choice: client.fetch_table(choice[0], choice[1], deadline), choices
+            )
+        )
+    return {table.river: list(table.measurements) for table in tables}
+
+
+def _river_fetch(
+    session: Optional[requests.Session],
+    fetch_workers: int,
+    limiter: Optional[AdaptiveLimiter],
+    conditional: Optional[ConditionalClient],
+) -> Tuple[Callable[[Deadline], List[Tuple[str, str]]], RiverFetch]:
+    """How a stream reads the river list and the lakes of one river."""
+    if conditional is not None:
+        return conditional.river_choices, partial(_conditional_measurements, conditional)
+    session = session or _pooled_session(fetch_workers, limiter)
+    return (
+        lambda deadline: _river_choices(_prime_session(session, deadline)),
+        partial(_river_measurements, session),
+    )
+
+
+def _river_measurements(
+    session: requests.Session,
+    label: str,
+    value: str,
+    deadline: Deadline,
+    wanted: Optional[Collection[str]],
+) -> List[LakeMeasurement]:
+    content = _fetch_river_content(session, value, deadline)
+    deadline.check(PHASE_PARSE)
+    return _keep_wanted(parse_river_content(label, content), wanted)
+
+
+def _conditional_measurements(
+    client: ConditionalClient,
+    label: str,
+    value: str,
+    deadline: Deadline,
+    wanted: Optional[Collection[str]],
+) -> List[LakeMeasurement]:
+    return _keep_wanted(list(client.fetch_table(label, value, deadline).measurements), wanted)
+
+
+def _keep_wanted(
+    measurements: List[LakeMeasurement], wanted: Optional[Collection[str]]
+) -> List[LakeMeasurement]:
+    if wanted is None:
+        return measurements
+    return [m for m in measurements if m.lake in wanted or fold_name(m.lake) in wanted]
+
+
+def _wanted_lakes(lakes: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    if lakes is None:
+        return None
+    # Exact names plus folded forms, so "Orsasjon" still matches "Orsasjön".
+    names = list(lakes)
+    return set(names) | {fold_name(name) for name in names}
+
+
+def _take(choices: Iterator[Tuple[str, str]], count: int) -> List[Tuple[str, str]]:
+    taken: List[Tuple[str, str]] = []
+    for choice in choices:
+        taken.append(choice)
+        if len(taken) == count:
+            break
+    return taken
+
+
+def _pooled_session(
+    fetch_workers: int, limiter: Optional[AdaptiveLimiter]
+) -> requests.Session:
+    from .limiter import AdaptiveLimiter, limited_session
+
+    return limited_session(limiter or AdaptiveLimiter(max_limit=max(1, fetch_workers)))
+
+
+def _select_rivers(
+    choices: List[Tuple[str, str]], rivers: Optional[Iterable[str]]
+) -> List[Tuple[str, str]]:
+    if rivers is None:
+        return choices
+
+    values = dict(choices)
+    index = _name_index(tuple(values))
+    selected: Dict[str, str] = {}
+    for river in rivers:
+        label = lookup_name(index, river, f"River '{river}' not found on source page")
+        selected[label] = values[label]
+    return list(selected.items())
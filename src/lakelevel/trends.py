@@ -0,0 +1,75 @@
+"""Trend metrics derived from the history columns of a river table."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from .siljan import LakeMeasurement
+
+_METRE_QUANTUM = Decimal("0.0001")
+_PERCENT_QUANTUM = Decimal("0.1")
+
+
+@dataclass(frozen=True)
+class LakeTrend:
+    """Changes and reference-band position for one lake reading."""
+
+    lake: str
+    change_24h_m: Optional[Decimal]
+    change_5d_m: Optional[Decimal]
+    rate_m_per_day: Optional[Decimal]
+    deviation_from_mean_m: Optional[Decimal]
+    band_position_pct: Optional[Decimal]
+
+
+def compute_trends(measurements: Iterable[LakeMeasurement]) -> Dict[str, LakeTrend]:
+    """Compute trend metrics for every measurement in one pass, keyed by lake.
+
+    The 24 h change compares the current reading with the previous daily
+    column and the 5-day change with the oldest one. The rate is the
+    least-squares slope over the daily columns. Band position is 0 % at the
+    reference minimum and 100 % at the reference maximum.
+    """
+    return {measurement.lake: _trend_for(measurement) for measurement in measurements}
+
+
+def _trend_for(measurement: LakeMeasurement) -> LakeTrend:
+    levels = [day.level_m for day in measurement.daily]
+    level = measurement.level_m
+
+    yesterday = levels[-2] if len(levels) >= 2 else None
+    oldest = next((value for value in levels if value is not None), None)
+
+    deviation: Optional[Decimal] = None
+    band_position: Optional[Decimal] = None
+    reference = measurement.reference
+    if reference is not None:
+        deviation = level - reference.mean_m
+        span = reference.max_m - reference.min_m
+        if span > 0:
+            band_position = ((level - reference.min_m) / span * 100).quantize(
+                _PERCENT_QUANTUM
+            )
+
+    return LakeTrend(
+        lake=measurement.lake,
+        change_24h_m=level - yesterday if yesterday is not None else None,
+        change_5d_m=level - oldest if oldest is not None else None,
+        rate_m_per_day=_slope(levels),
+        deviation_from_mean_m=deviation,
+        band_position_pct=band_position,
+    )
+
+
+def _slope(levels: List[Optional[Decimal]]) -> Optional[Decimal]:
+    points = [(Decimal(day), value) for day, value in enumerate(levels) if value is not None]
+    if len(points) < 2:
+        return None
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+    return (covariance / variance).quantize(_METRE_QUANTUM)
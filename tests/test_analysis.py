@@ -0,0 +1,81 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from lakelevel.analysis import align_daily, forecast_levels, rolling_slope
+
+
+def _linear(start: date, days: int, level: float, slope: float):
+    return [(start + timedelta(days=day), level + slope * day) for day in range(days)]
+
+
+def test_align_daily_keeps_last_value_per_day() -> None:
+    grid = align_daily(
+        {
+            "a": [(datetime(2025, 10, 1, 0, 0), 1.0), (datetime(2025, 10, 1, 12, 0), 2.0)],
+            "b": [(date(2025, 10, 3), 5.0)],
+        }
+    )
+
+    assert grid.start == date(2025, 10, 1)
+    assert grid.values.shape == (2, 3)
+    assert grid.values[0, 0] == 2.0
+    assert np.isnan(grid.values[1, 0])
+
+
+def test_rolling_slope_ignores_gaps() -> None:
+    values = np.array([[1.0, 2.0, np.nan, 4.0, 5.0], [3.0, 3.0, 3.0, 3.0, 3.0]])
+
+    slopes = rolling_slope(values, 3)
+
+    assert np.isnan(slopes[0, 1])
+    assert slopes[0, 4] == pytest.approx(1.0)
+    assert slopes[1, 4] == pytest.approx(0.0)
+
+
+def test_forecast_levels_extends_trend_for_every_lake() -> None:
+    start = date(2025, 9, 1)
+    forecasts = forecast_levels(
+        {
+            ("Dalälven", "Siljan"): _linear(start, 30, 161.0, -0.01),
+            ("Dalälven", "Orsasjön"): _linear(start, 30, 160.0, 0.02),
+            ("Dalälven", "Sparse"): [(start, 1.0)],
+        },
+        horizon_days=3,
+    )
+
+    siljan = forecasts[("Dalälven", "Siljan")]
+    assert siljan.dates[0] == date(2025, 10, 1)
+    assert siljan.level_m[0] == pytest.approx(160.70)
+    assert siljan.slope_m_per_day == pytest.approx(-0.01)
+    assert forecasts[("Dalälven", "Orsasjön")].level_m[-1] == pytest.approx(160.64)
+    assert ("Dalälven", "Sparse") not in forecasts
+
+
+def test_forecast_levels_band_widens_with_noise() -> None:
+    rng = np.random.default_rng(1)
+    start = date(2025, 9, 1)
+    noisy = [(day, level + rng.normal(0, 0.05)) for day, level in _linear(start, 30, 10.0, 0.0)]
+
+    forecast = forecast_levels({"noisy": noisy}, horizon_days=2)["noisy"]
+
+    assert forecast.lower_m[0] < forecast.level_m[0] < forecast.upper_m[0]
+    assert forecast.upper_m[1] - forecast.lower_m[1] > forecast.upper_m[0] - forecast.lower_m[0]
+
+
+def test_forecast_levels_applies_seasonal_baseline() -> None:
+    start = date(2022, 1, 1)
+    # Stop shortly before the seasonal peak so a straight line overshoots it.
+    days = 2 * 365 + 70
+    seasonal = [
+        (start + timedelta(days=day), 100.0 + np.sin(2 * np.pi * day / 365.25))
+        for day in range(days)
+    ]
+
+    with_season = forecast_levels({"lake": seasonal}, horizon_days=60)["lake"]
+    flat = forecast_levels({"lake": seasonal}, horizon_days=60, seasonal=False)["lake"]
+
+    expected = 100.0 + np.sin(2 * np.pi * (days + 59) / 365.25)
+    assert abs(with_season.level_m[-1] - expected) < abs(flat.level_m[-1] - expected)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from lakelevel.anomaly import (
+    ABOVE_BAND,
+    BACK_IN_BAND,
+    RAPID_CHANGE,
+    STALLED,
+    AnomalyDetector,
+)
+from lakelevel.siljan import DailyLevel, LakeMeasurement, ReferenceStats
+
+REFERENCE = ReferenceStats(
+    min_m=Decimal("161.00"), mean_m=Decimal("161.28"), max_m=Decimal("161.77"), period="2005-2024"
+)
+NOW = datetime(2025, 10, 4, 13, 0)
+
+
+def _measurement(level: str, timestamp: str, daily=()) -> LakeMeasurement:
+    return LakeMeasurement(
+        river="Dalälven",
+        lake="Siljan",
+        level_m=Decimal(level),
+        timestamp=timestamp,
+        daily=daily,
+        reference=REFERENCE,
+    )
+
+
+def test_band_exit_and_return() -> None:
+    detector = AnomalyDetector()
+
+    assert detector.update(_measurement("161.65", "12:55 okt 04"), NOW) == []
+    events = detector.update(_measurement("161.80", "18:55 okt 04"), NOW + timedelta(hours=6))
+    assert [event.kind for event in events] == [ABOVE_BAND, RAPID_CHANGE]
+
+    events = detector.update(_measurement("161.76", "12:55 okt 06"), NOW + timedelta(days=2))
+    assert [event.kind for event in events] == [BACK_IN_BAND]
+
+
+def test_first_reading_uses_daily_column_for_rate() -> None:
+    daily = (
+        DailyLevel(label="okt 03", level_m=Decimal("161.40")),
+        DailyLevel(label="okt 04", level_m=Decimal("161.60")),
+    )
+    events = AnomalyDetector().update(_measurement("161.65", "12:55 okt 04", daily), NOW)
+
+    assert [event.kind for event in events] == [RAPID_CHANGE]
+    assert events[0].detail == "+0.250 m/day"
+
+
+def test_stalled_source_reported_once() -> None:
+    detector = AnomalyDetector(stall_after=timedelta(days=1))
+    reading = _measurement("161.65", "12:55 okt 04")
+
+    detector.update(reading, NOW)
+    assert detector.update(reading, NOW + timedelta(hours=12)) == []
+    assert [e.kind for e in detector.update(reading, NOW + timedelta(days=1))] == [STALLED]
+    assert detector.update(reading, NOW + timedelta(days=2)) == []
+
+    assert detector.update(_measurement("161.65", "12:55 okt 06"), NOW + timedelta(days=2)) == []
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import requests
+import responses
+
+from lakelevel.archive import ResponseArchive, archive_session, replay_session
+from lakelevel.siljan import LAKE_LEVEL_URL, get_lake_level, list_lakes
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+LANDING_HTML = (FIXTURE_DIR / "landing.html").read_text(encoding="utf-8").encode(
+    "iso-8859-1"
+)
+LAKE_HTML = (FIXTURE_DIR / "dalalven_sample.html").read_text(encoding="utf-8").encode(
+    "iso-8859-1"
+)
+
+
+@responses.activate
+def test_archive_stores_identical_payloads_once(tmp_path) -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, status=200)
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, status=200)
+
+    with ResponseArchive(tmp_path) as archive:
+        session = archive_session(archive)
+        get_lake_level("Dalälven", "Siljan", session=session, timeout=5)
+        get_lake_level("Dalälven", "Siljan", session=session, timeout=5)
+
+        fetches = list(archive.fetches())
+        assert [fetch.method for fetch in fetches] == ["GET", "POST", "GET", "POST"]
+        assert fetches[1].body == "Ralv=Dal%E4lven"
+        assert archive.read(fetches[1].digest) == LAKE_HTML
+
+    assert len(list((tmp_path / "objects").rglob("*.gz"))) == 2
+
+
+@responses.activate
+def test_replay_serves_requests_offline(tmp_path) -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, status=200)
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, status=200)
+    with ResponseArchive(tmp_path) as archive:
+        get_lake_level("Dalälven", "Siljan", session=archive_session(archive), timeout=5)
+    responses.reset()
+
+    with ResponseArchive(tmp_path) as archive:
+        session = replay_session(archive)
+        measurement = get_lake_level("Dalälven", "Siljan", session=session)
+        assert measurement.level_m == Decimal("161.65")
+        assert list_lakes("Dalälven", session=session) == ["Siljan"]
+
+        with pytest.raises(requests.ConnectionError):
+            get_lake_level("Umeälven", "Storuman", session=session)
+
+    assert len(responses.calls) == 0
+
+
+def test_replay_as_of_picks_capture_time(tmp_path) -> None:
+    first = datetime(2025, 10, 3, 6, 0, tzinfo=timezone.utc)
+    with ResponseArchive(tmp_path) as archive:
+        for offset, body in enumerate([b"old", b"new"]):
+            archive.store(
+                "GET", LAKE_LEVEL_URL, "", 200, {}, body, fetched_at=first + timedelta(days=offset)
+            )
+
+        assert _replayed_text(replay_session(archive)) == "new"
+        assert _replayed_text(replay_session(archive, as_of=first)) == "old"
+
+
+def _replayed_text(session: requests.Session) -> str:
+    return session.get(LAKE_LEVEL_URL).text
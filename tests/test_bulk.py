@@ -0,0 +1,112 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from custom_components.lakelevel import bulk  # noqa: E402
+from custom_components.lakelevel.bulk import _entry_times, _parse_row  # noqa: E402
+
+
+class _Lists:
+    async def async_rivers(self):
+        return ["Dalälven", "Umeälven"]
+
+    async def async_lakes(self, river):
+        return {"Dalälven": ["Siljan", "Orsasjön"], "Umeälven": ["Storuman"]}[river]
+
+
+class _ConfigEntries:
+    def __init__(self, *entries) -> None:
+        self.entries = list(entries)
+        self.created = []
+        self.updated = {}
+        self.flow = SimpleNamespace(async_init=self._async_init)
+
+    def async_entries(self, domain):
+        return list(self.entries)
+
+    def async_update_entry(self, entry, options):
+        self.updated[entry.entry_id] = options
+
+    async def _async_init(self, domain, context, data):
+        self.created.append(data)
+        return {"result": SimpleNamespace(entry_id=f"new{len(self.created)}")}
+
+
+def _import(monkeypatch, rows, *entries):
+    monkeypatch.setattr(bulk, "source_lists", lambda hass: _Lists())
+    config_entries = _ConfigEntries(*entries)
+    hass = SimpleNamespace(config_entries=config_entries)
+    result = asyncio.run(bulk.async_import_entries(hass, rows))
+    return result, config_entries
+
+
+def test_parse_row_pads_schedule_times() -> None:
+    row = _parse_row(1, {"river": "Dalälven", "lake": "Siljan", "schedule": "6:00; 18:00"})
+
+    assert row.fetch_times == ("06:00", "18:00")
+
+
+def test_entry_times_normalises_unpadded_stored_times() -> None:
+    assert _entry_times({"fetch_times": ["6:00", "18:00:00"], "updates_per_day": 2}) == [
+        "06:00",
+        "18:00",
+    ]
+    assert _entry_times({"fetch_time": "7:30"}) == ["07:30"]
+
+
+def test_rows_of_one_river_share_one_entry(monkeypatch) -> None:
+    rows = [
+        {"river": "Dalälven", "lake": "Siljan", "schedule": "06:00"},
+        {"river": "dalalven", "lake": "Siljan", "schedule": "18:00"},
+        {"river": "Dalälven", "lake": "Orsasjon"},
+        {"river": "Umeälven", "lake": "Storuman", "schedule": "06:00"},
+        {"river": "Umeälven", "lake": "Storuman", "schedule": "01:00 02:00 03:00 04:00"},
+    ]
+
+    result, config_entries = _import(monkeypatch, rows)
+
+    assert config_entries.created == [
+        {
+            "river": "Dalälven",
+            "lakes": ["Siljan", "Orsasjön"],
+            "all_lakes": False,
+            "fetch_times": ["06:00", "18:00"],
+            "updates_per_day": 2,
+            "retries": 3,
+        },
+        {
+            "river": "Umeälven",
+            "lakes": ["Storuman"],
+            "all_lakes": False,
+            "fetch_times": ["06:00"],
+            "updates_per_day": 1,
+            "retries": 3,
+        },
+    ]
+    assert [error["row"] for error in result["errors"]] == [5]
+
+
+def test_rows_merge_into_the_existing_entry_of_a_river(monkeypatch) -> None:
+    entry = SimpleNamespace(
+        entry_id="existing",
+        data={"river": "Dalälven", "lakes": ["Siljan"], "fetch_times": ["6:00"]},
+        options={},
+    )
+    rows = [
+        {"river": "Dalälven", "lake": "Siljan", "schedule": "06:00"},
+        {"river": "Dalälven", "lake": "Orsasjön", "schedule": "18:00"},
+    ]
+
+    result, config_entries = _import(monkeypatch, rows, entry)
+
+    assert config_entries.created == []
+    assert result["updated"] == ["existing"]
+    assert config_entries.updated["existing"] == {
+        "lakes": ["Siljan", "Orsasjön"],
+        "all_lakes": False,
+        "fetch_times": ["06:00", "18:00"],
+        "updates_per_day": 2,
+    }
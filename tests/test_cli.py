@@ -1,9 +1,14 @@
 from decimal import Decimal
+import subprocess
+import sys
 
+import pytest
 import requests
 
 from lakelevel.cli import main
-from lakelevel.siljan import LakeMeasurement
+from lakelevel.conditional import ConditionalClient
+from lakelevel.history import HistoryStore
+from lakelevel.siljan import DailyLevel, LakeMeasurement
 
 
 def test_main_success(monkeypatch, capsys) -> None:
@@ -11,7 +16,7 @@ def test_main_success(monkeypatch, capsys) -> None:
         river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
     )
 
-    def fake_get(river, lake, timeout=None):
+    def fake_get(river, lake, session=None, timeout=None, deadline=None):
         assert river == "Dalälven"
         assert lake == "Siljan"
         assert timeout == 123.0
@@ -28,7 +33,7 @@ def test_main_success(monkeypatch, capsys) -> None:
 
 
 def test_main_handles_request_exception(monkeypatch, capsys) -> None:
-    def fake_get(river, lake, timeout=None):
+    def fake_get(river, lake, session=None, timeout=None, deadline=None):
         raise requests.exceptions.Timeout("boom")
 
     monkeypatch.setattr("lakelevel.cli.get_lake_level", fake_get)
@@ -42,7 +47,7 @@ def test_main_handles_request_exception(monkeypatch, capsys) -> None:
 
 
 def test_main_lists_lakes(monkeypatch, capsys) -> None:
-    def fake_list(river, timeout=None):
+    def fake_list(river, session=None, timeout=None, deadline=None):
         assert river == "Dalälven"
         assert timeout is None
         return ["Siljan", "Orsasjön"]
@@ -58,7 +63,7 @@ def test_main_lists_lakes(monkeypatch, capsys) -> None:
 
 
 def test_main_lists_rivers(monkeypatch, capsys) -> None:
-    def fake_list(timeout=None):
+    def fake_list(session=None, timeout=None, deadline=None):
         assert timeout is None
         return ["Umeälven", "Dalälven"]
 
@@ -77,3 +82,291 @@ def test_main_without_args_shows_help(capsys) -> None:
 
     assert exit_code == 0
     assert "Fetch lake level measurements" in captured.out
+
+
+def test_forecast_records_history_and_prints(monkeypatch, capsys, tmp_path) -> None:
+    pytest.importorskip("numpy")
+    measurement = LakeMeasurement(
+        river="Dalälven",
+        lake="Siljan",
+        level_m=Decimal("161.65"),
+        timestamp="12:55 okt 04",
+        daily=tuple(
+            DailyLevel(label=label, level_m=Decimal(value))
+            for label, value in [
+                ("sep 30", "161.69"),
+                ("okt 01", "161.68"),
+                ("okt 02", "161.67"),
+                ("okt 03", "161.67"),
+                ("okt 04", "161.66"),
+            ]
+        ),
+    )
+
+    def fake_get_levels(river, lakes, timeout=None, deadline=None):
+        assert river == "Dalälven"
+        assert lakes == ["Siljan"]
+        return [measurement]
+
+    monkeypatch.setattr("lakelevel.cli.get_lake_levels", fake_get_levels)
+    database = tmp_path / "history.sqlite"
+
+    exit_code = main(
+        ["forecast", "--lake", "Siljan", "--horizon", "2", "--history-db", str(database)]
+    )
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
+    assert captured.out.startswith("Siljan (Dalälven)")
+    assert "m/day" in captured.out
+    assert database.exists()
+
+
+def test_forecast_reads_history_under_source_river_label(monkeypatch, capsys) -> None:
+    pytest.importorskip("numpy")
+    measurement = LakeMeasurement(
+        river="Dalälven",
+        lake="Siljan",
+        level_m=Decimal("161.65"),
+        timestamp="12:55 okt 04",
+        daily=(
+            DailyLevel(label="okt 02", level_m=Decimal("161.67")),
+            DailyLevel(label="okt 03", level_m=Decimal("161.67")),
+        ),
+    )
+    monkeypatch.setattr(
+        "lakelevel.cli.get_lake_levels",
+        lambda river, lakes, timeout=None, deadline=None: [measurement],
+    )
+
+    exit_code = main(["forecast", "--alv", "dalalven", "--lake", "siljan"])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
+    assert captured.out.startswith("Siljan (Dalälven)")
+
+
+def test_forecast_without_dated_history_fails_cleanly(monkeypatch, capsys) -> None:
+    pytest.importorskip("numpy")
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="okänd"
+    )
+    monkeypatch.setattr(
+        "lakelevel.cli.get_lake_levels",
+        lambda river, lakes, timeout=None, deadline=None: [measurement],
+    )
+
+    exit_code = main(["forecast", "--lake", "Siljan"])
+    captured = capsys.readouterr()
+
+    assert exit_code == 1
+    assert "no dated history" in captured.err
+    assert captured.out == ""
+
+
+def test_history_prints_rollups_within_point_budget(capsys, tmp_path) -> None:
+    from datetime import date
+
+    from lakelevel.history import HistoryStore
+
+    measurement = LakeMeasurement(
+        river="Dalälven",
+        lake="Siljan",
+        level_m=Decimal("161.65"),
+        timestamp="12:55 okt 04",
+        daily=(
+            DailyLevel(label="sep 30", level_m=Decimal("161.69")),
+            DailyLevel(label="okt 04", level_m=Decimal("161.66")),
+        ),
+    )
+    database = tmp_path / "history.sqlite"
+    with HistoryStore(database) as store:
+        store.record([measurement], today=date(2025, 10, 4))
+
+    exit_code = main(["history", "--history-db", str(database), "--points", "2"])
+    lines = capsys.readouterr().out.splitlines()
+
+    assert exit_code == 0
+    assert lines == [
+        "river,lake,resolution,start,min_m,max_m,mean_m,last_m,count",
+        "Dalälven,Siljan,day,2025-09-30 00:00:00,161.69,161.69,161.6900,161.69,1",
+        "Dalälven,Siljan,day,2025-10-04 00:00:00,161.65,161.66,161.6550,161.65,2",
+    ]
+
+
+def test_snapshot_prints_every_lake(monkeypatch, capsys) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+
+    def fake_snapshot(
+        rivers, session=None, timeout=None, deadline=None, fetch_workers=None, parse_workers=None
+    ):
+        assert rivers == ["Dalälven"]
+        assert parse_workers == 0
+        return {"Dalälven": [measurement]}
+
+    monkeypatch.setattr("lakelevel.snapshot.fetch_snapshot", fake_snapshot)
+
+    exit_code = main(["snapshot", "--alv", "Dalälven", "--parse-workers", "0"])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
+    assert "Siljan (Dalälven) water level: 161.65 m" in captured.out
+
+
+def test_snapshot_streams_ndjson(monkeypatch, capsys) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+
+    def fake_iter(rivers, session=None, timeout=None, deadline=None, fetch_workers=None):
+        yield measurement
+
+    monkeypatch.setattr("lakelevel.snapshot.iter_measurements", fake_iter)
+
+    assert main(["snapshot", "--ndjson"]) == 0
+    assert capsys.readouterr().out == (
+        '{"river": "Dalälven", "lake": "Siljan", "level_m": "161.65", '
+        '"timestamp": "12:55 okt 04"}\n'
+    )
+
+
+def test_snapshot_records_into_history(monkeypatch, tmp_path) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+    monkeypatch.setattr(
+        "lakelevel.snapshot.fetch_snapshot", lambda rivers, **kwargs: {"Dalälven": [measurement]}
+    )
+    monkeypatch.setattr("lakelevel.snapshot.iter_measurements", lambda rivers, **kwargs: [measurement])
+    db = tmp_path / "lakes.sqlite"
+
+    assert main(["snapshot", "--history-db", str(db)]) == 0
+    assert main(["snapshot", "--ndjson", "--history-db", str(db)]) == 0
+
+    with HistoryStore(db) as store:
+        history = store.series()
+    assert [level for _, level in history[("Dalälven", "Siljan")]] == [Decimal("161.65")]
+
+
+def test_export_writes_snapshot(monkeypatch, capsys, tmp_path) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+
+    def fake_iter(rivers, timeout=None, deadline=None):
+        assert rivers == ["Dalälven"]
+        yield measurement
+
+    monkeypatch.setattr("lakelevel.snapshot.iter_measurements", fake_iter)
+    output = tmp_path / "levels.csv"
+
+    exit_code = main(["export", str(output), "--alv", "Dalälven"])
+    captured = capsys.readouterr()
+
+    assert exit_code == 0
+    assert f"Wrote 1 rows to {output} (csv)" in captured.out
+    assert "Siljan" in output.read_text(encoding="utf-8")
+
+
+def test_export_history_resolves_river_spelling(capsys, tmp_path) -> None:
+    database = tmp_path / "history.sqlite"
+    with HistoryStore(database) as store:
+        store.record(
+            [
+                LakeMeasurement(
+                    river="Dalälven",
+                    lake="Siljan",
+                    level_m=Decimal("161.65"),
+                    timestamp="12:55 okt 04",
+                )
+            ]
+        )
+    output = tmp_path / "history.csv"
+
+    exit_code = main(
+        ["export", str(output), "--history-db", str(database), "--alv", "dalalven"]
+    )
+    assert exit_code == 0
+    assert f"Wrote 1 rows to {output} (csv)" in capsys.readouterr().out
+
+    exit_code = main(["export", str(output), "--history-db", str(database), "--alv", "Dalalv"])
+    captured = capsys.readouterr()
+    assert exit_code == 1
+    assert "Did you mean: Dalälven?" in captured.err
+
+
+def test_delta_prints_ndjson_and_saves_state(monkeypatch, capsys, tmp_path) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+    monkeypatch.setattr(
+        "lakelevel.snapshot.fetch_snapshot",
+        lambda rivers, timeout=None, deadline=None: {"Dalälven": [measurement]},
+    )
+    state = tmp_path / "feed.json"
+
+    assert main(["delta", "--state", str(state)]) == 0
+    first = capsys.readouterr().out.splitlines()
+    assert main(["delta", "--state", str(state)]) == 0
+    second = capsys.readouterr().out
+
+    assert len(first) == 1
+    assert '"kind": "added"' in first[0]
+    assert second == ""
+
+    assert main(["delta", "--state", str(state), "--since", "0"]) == 0
+    assert capsys.readouterr().out.splitlines() == first
+
+
+def test_help_does_not_import_fetch_dependencies() -> None:
+    code = (
+        "import contextlib, io, sys\n"
+        "import lakelevel\n"
+        "from lakelevel.cli import main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    main([])\n"
+        "lakelevel.LakeMeasurement\n"
+        "print(sorted(m for m in ('requests', 'bs4', 'sqlite3') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_cli_import_does_not_load_multiprocessing() -> None:
+    code = (
+        "import sys\n"
+        "import lakelevel.cli\n"
+        "heavy = ('multiprocessing', 'concurrent.futures.process')\n"
+        "print(sorted(m for m in heavy if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+def test_publish_once_posts_changes_to_webhook(monkeypatch, tmp_path) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+    clients = []
+
+    def fake_snapshot(rivers, timeout=None, deadline=None, conditional=None):
+        clients.append(conditional)
+        return {"Dalälven": [measurement]}
+
+    monkeypatch.setattr("lakelevel.snapshot.fetch_snapshot", fake_snapshot)
+    sent = []
+    monkeypatch.setattr("lakelevel.publish.WebhookSink.send", lambda self, events: sent.extend(events))
+    state = tmp_path / "feed.json"
+
+    assert main(["publish", "--state", str(state), "--webhook", "http://hub/lakes", "--once"]) == 0
+    assert [event.lake for event in sent] == ["Siljan"]
+    assert state.exists()
+    assert isinstance(clients[0], ConditionalClient)
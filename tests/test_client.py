@@ -7,12 +7,22 @@ import responses
 from lakelevel import (
     DEFAULT_LAKE,
     DEFAULT_RIVER,
+    Deadline,
+    DeadlineExceeded,
     get_lake_level,
+    get_lake_levels,
     get_siljan_level,
     list_lakes,
     list_rivers,
 )
-from lakelevel.siljan import LAKE_LEVEL_URL, LakeLevelError
+from lakelevel.names import NameIndex
+from lakelevel.siljan import (
+    LAKE_LEVEL_URL,
+    LakeLevelError,
+    SourceCatalog,
+    UnknownNameError,
+    _name_index,
+)
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
 LANDING_HTML = (FIXTURE_DIR / "landing.html").read_text(encoding="utf-8").encode(
@@ -46,6 +56,25 @@ def test_get_lake_level_posts_iso_form_and_parses() -> None:
     assert post_request.headers["Content-Type"] == "application/x-www-form-urlencoded"
 
 
+@responses.activate
+def test_get_lake_levels_fetches_river_once() -> None:
+    _mock_responses_for_dalalven(responses)
+
+    measurements = get_lake_levels(DEFAULT_RIVER, timeout=5)
+
+    assert [m.lake for m in measurements] == [DEFAULT_LAKE]
+    responses.assert_call_count(LAKE_LEVEL_URL, 2)
+
+
+@responses.activate
+def test_get_lake_levels_filters_requested_lakes() -> None:
+    _mock_responses_for_dalalven(responses)
+
+    measurements = get_lake_levels("DALALVEN", ["siljan", "Unknown"], timeout=5)
+
+    assert [(m.river, m.lake) for m in measurements] == [("Dalälven", DEFAULT_LAKE)]
+
+
 @responses.activate
 def test_get_lake_level_unknown_river() -> None:
     _mock_responses_for_dalalven(responses)
@@ -94,3 +123,87 @@ def test_list_rivers_returns_all_names() -> None:
 
     assert rivers[0] == "Umeälven"
     assert DEFAULT_RIVER in rivers
+
+
+@responses.activate
+def test_get_lake_level_ignores_diacritics() -> None:
+    _mock_responses_for_dalalven(responses)
+
+    measurement = get_lake_level("dalalven", "SILJAN", timeout=5)
+
+    assert measurement.river == "Dalälven"
+    assert measurement.lake == DEFAULT_LAKE
+    assert responses.calls[1].request.body == "Ralv=Dal%E4lven"
+
+
+@responses.activate
+def test_get_lake_level_unknown_river_suggests_names() -> None:
+    _mock_responses_for_dalalven(responses)
+
+    with pytest.raises(UnknownNameError) as excinfo:
+        get_lake_level("Dalalvn", DEFAULT_LAKE, timeout=5)
+
+    assert excinfo.value.suggestions[0] == DEFAULT_RIVER
+    assert "Did you mean: Dalälven" in str(excinfo.value)
+
+
+def test_deadline_caps_request_timeouts() -> None:
+    now = [0.0]
+    deadline = Deadline(budget_s=30, connect_timeout=10, read_timeout=60, clock=lambda: now[0])
+
+    assert deadline.request_timeout("landing page") == (10, 30)
+    now[0] = 25.0
+    assert deadline.request_timeout("river table") == (5, 5)
+    now[0] = 31.0
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        deadline.request_timeout("river table")
+    assert excinfo.value.phase == "river table"
+
+
+@responses.activate
+def test_get_lake_level_reports_phase_that_ran_out() -> None:
+    now = [0.0]
+
+    def slow_landing(request):
+        now[0] += 20.0
+        return 200, {}, LANDING_HTML
+
+    responses.add_callback(responses.GET, LAKE_LEVEL_URL, callback=slow_landing)
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, status=200)
+    deadline = Deadline(budget_s=15, clock=lambda: now[0])
+
+    with pytest.raises(DeadlineExceeded, match="river table"):
+        get_lake_level(DEFAULT_RIVER, DEFAULT_LAKE, deadline=deadline)
+
+    responses.assert_call_count(LAKE_LEVEL_URL, 1)
+
+
+@responses.activate
+def test_source_catalog_reuses_landing_page_and_tables() -> None:
+    _mock_responses_for_dalalven(responses)
+    catalog = SourceCatalog(timeout=5)
+
+    assert DEFAULT_RIVER in catalog.rivers()
+    assert catalog.lakes(DEFAULT_RIVER) == [DEFAULT_LAKE]
+    assert catalog.lakes("dalalven") == [DEFAULT_LAKE]
+
+    assert [call.request.method for call in responses.calls] == ["GET", "POST"]
+
+
+@responses.activate
+def test_name_indexes_are_built_once_per_page(monkeypatch) -> None:
+    for _ in range(2):
+        _mock_responses_for_dalalven(responses)
+    built = []
+
+    def counting_index(names):
+        built.append(tuple(names))
+        return NameIndex(names)
+
+    monkeypatch.setattr("lakelevel.siljan.NameIndex", counting_index)
+    _name_index.cache_clear()
+
+    get_lake_level("dalalven", "siljan", timeout=5)
+    get_lake_level("Dalälven", "SILJAN", timeout=5)
+
+    assert built == [("Umeälven", "Dalälven", "Göta älv"), ("Siljan",)]
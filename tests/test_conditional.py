@@ -0,0 +1,116 @@
+from pathlib import Path
+
+import responses
+
+from lakelevel.conditional import (
+    FRESH,
+    MODIFIED,
+    UNCHANGED,
+    ConditionalClient,
+)
+from lakelevel.siljan import LAKE_LEVEL_URL
+from lakelevel.snapshot import fetch_snapshot, iter_measurements
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+LANDING_HTML = (FIXTURE_DIR / "landing.html").read_text(encoding="utf-8").encode(
+    "iso-8859-1"
+)
+LAKE_HTML = (FIXTURE_DIR / "dalalven_sample.html").read_text(encoding="utf-8").encode(
+    "iso-8859-1"
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@responses.activate
+def test_etag_revalidation_returns_previous_parse() -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, headers={"ETag": '"l1"'})
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, headers={"ETag": '"t1"'})
+    client = ConditionalClient()
+
+    first = client.fetch_river("Dalälven", timeout=5)
+
+    responses.replace(responses.GET, LAKE_LEVEL_URL, status=304)
+    second = client.fetch_river("Dalälven", timeout=5)
+
+    assert first.freshness == MODIFIED and first.changed
+    assert second.freshness == UNCHANGED and not second.changed
+    assert second.measurements is first.measurements
+    assert responses.calls[2].request.headers["If-None-Match"] == '"l1"'
+    # River tables are POSTs, which are compared by body hash instead.
+    assert "If-None-Match" not in responses.calls[3].request.headers
+
+
+@responses.activate
+def test_precondition_failed_drops_validators_and_refetches() -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, headers={"ETag": '"l1"'})
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, headers={"ETag": '"t1"'})
+    client = ConditionalClient()
+    client.fetch_river("Dalälven", timeout=5)
+
+    responses.replace(responses.GET, LAKE_LEVEL_URL, status=412)
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML)
+    table = client.fetch_river("Dalälven", timeout=5)
+    third = client.fetch_river("Dalälven", timeout=5)
+
+    assert table.freshness == UNCHANGED
+    assert third.freshness == UNCHANGED
+    assert responses.calls[2].request.headers["If-None-Match"] == '"l1"'
+    assert "If-None-Match" not in responses.calls[3].request.headers
+    # The retried landing page had no ETag, so nothing is sent afterwards.
+    assert "If-None-Match" not in responses.calls[5].request.headers
+
+
+@responses.activate
+def test_body_hash_detects_unchanged_table_without_validators() -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML)
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML)
+    client = ConditionalClient()
+
+    first = client.fetch_river("Dalälven", timeout=5)
+    second = client.fetch_river("dalalven", ["Siljan"], timeout=5)
+
+    assert second.freshness == UNCHANGED
+    assert second.digest == first.digest
+    assert "If-None-Match" not in responses.calls[3].request.headers
+
+
+@responses.activate
+def test_cache_control_max_age_skips_requests_until_stale() -> None:
+    headers = {"Cache-Control": "max-age=60"}
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, headers=headers)
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, headers=headers)
+    clock = _Clock()
+    client = ConditionalClient(clock=clock)
+
+    client.fetch_river("Dalälven", timeout=5)
+    clock.now += 30
+    cached = client.fetch_river("Dalälven", timeout=5)
+    clock.now += 60
+    stale = client.fetch_river("Dalälven", timeout=5)
+
+    assert cached.freshness == FRESH
+    assert stale.freshness == UNCHANGED
+    responses.assert_call_count(LAKE_LEVEL_URL, 4)
+
+
+@responses.activate
+def test_snapshots_revalidate_through_conditional_client() -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, headers={"ETag": '"l1"'})
+    responses.add(responses.POST, LAKE_LEVEL_URL, body=LAKE_HTML, headers={"ETag": '"t1"'})
+    client = ConditionalClient()
+
+    first = fetch_snapshot(["Dalälven"], timeout=5, conditional=client)
+
+    responses.replace(responses.GET, LAKE_LEVEL_URL, status=304)
+    streamed = list(iter_measurements(["dalalven"], timeout=5, conditional=client))
+
+    assert streamed == first["Dalälven"]
+    assert responses.calls[2].request.headers["If-None-Match"] == '"l1"'
+    assert "If-None-Match" not in responses.calls[3].request.headers
@@ -0,0 +1,84 @@
+import asyncio
+from datetime import time, timedelta
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.lakelevel import coordinator as coordinator_module  # noqa: E402
+from custom_components.lakelevel.coordinator import LakeLevelCoordinator, _shift  # noqa: E402
+from lakelevel.siljan import LakeMeasurement  # noqa: E402
+
+SILJAN = LakeMeasurement(
+    river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+)
+
+
+class _Fetches:
+    def __init__(self, measurements) -> None:
+        self.measurements = measurements
+
+    async def async_fetch(self, river, deadline, max_age=0):
+        return list(self.measurements)
+
+
+def _with_hass(tmp_path, test) -> None:
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            await test(hass)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+
+
+def test_failed_forecast_keeps_fresh_measurements(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(coordinator_module, "river_fetches", lambda hass: _Fetches([SILJAN]))
+
+    def broken_forecast(data):
+        raise ValueError("no fit")
+
+    monkeypatch.setattr(coordinator_module, "_forecast", broken_forecast)
+
+    async def test(hass) -> None:
+        coordinator = LakeLevelCoordinator(
+            hass, {"river": "Dalälven", "lakes": ["Siljan"]}, "entry"
+        )
+        previous = {"Siljan": object()}
+        coordinator.forecasts = previous
+
+        await coordinator.async_refresh()
+
+        assert coordinator.last_update_success
+        assert coordinator.data == {"Siljan": SILJAN}
+        assert coordinator.forecasts is previous
+
+    _with_hass(tmp_path, test)
+
+
+def test_shift_wraps_past_midnight() -> None:
+    assert _shift(time(6, 0), timedelta(minutes=7, seconds=30)) == time(6, 7, 30)
+    assert _shift(time(23, 50), timedelta(minutes=15)) == time(0, 5)
+    assert _shift(time(0, 0), timedelta(0)) == time(0, 0)
+
+
+def test_jitter_offset_is_stable_per_river_and_within_the_window(tmp_path) -> None:
+    async def test(hass) -> None:
+        def offset(river, window):
+            coordinator = LakeLevelCoordinator(
+                hass, {"river": river, "lakes": ["Siljan"], "jitter_window": window}, river
+            )
+            return coordinator._async_jitter_offset()
+
+        assert await offset("Dalälven", 0) == timedelta(0)
+        first = await offset("Dalälven", 15)
+        assert await offset("Dalälven", 15) == first
+        for river in ("Dalälven", "Umeälven", "Ljusnan", "Indalsälven"):
+            assert timedelta(0) <= await offset(river, 15) < timedelta(minutes=15)
+            assert await offset(river, 1) < timedelta(minutes=1)
+
+    _with_hass(tmp_path, test)
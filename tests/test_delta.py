@@ -0,0 +1,137 @@
+from dataclasses import replace
+from decimal import Decimal
+import json
+
+import pytest
+
+from lakelevel.delta import ADDED, CHANGED, REMOVED, CursorExpiredError, DeltaFeed
+from lakelevel.siljan import LakeMeasurement
+
+SILJAN = LakeMeasurement(
+    river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+)
+ORSASJON = LakeMeasurement(
+    river="Dalälven", lake="Orsasjön", level_m=Decimal("161.60"), timestamp="12:55 okt 04"
+)
+STORUMAN = LakeMeasurement(
+    river="Umeälven", lake="Storuman", level_m=Decimal("349.10"), timestamp="07:00 okt 04"
+)
+
+
+def test_first_update_adds_every_lake() -> None:
+    feed = DeltaFeed()
+
+    events = feed.update({"Dalälven": [SILJAN, ORSASJON]})
+
+    assert [(e.cursor, e.kind, e.lake) for e in events] == [
+        (1, ADDED, "Siljan"),
+        (2, ADDED, "Orsasjön"),
+    ]
+
+
+def test_only_changes_are_emitted() -> None:
+    feed = DeltaFeed()
+    feed.update({"Dalälven": [SILJAN, ORSASJON], "Umeälven": [STORUMAN]})
+
+    newer = replace(SILJAN, level_m=Decimal("161.66"), timestamp="13:55 okt 04")
+    events = feed.update({"Dalälven": [newer]})
+
+    assert [(e.kind, e.lake) for e in events] == [(CHANGED, "Siljan"), (REMOVED, "Orsasjön")]
+    assert events[0].previous_level_m == Decimal("161.65")
+    assert events[0].cursor == 4
+    # Rivers missing from a partial snapshot are left alone.
+    assert feed.update({"Umeälven": [STORUMAN]}) == []
+
+
+def test_state_file_resumes_cursor(tmp_path) -> None:
+    path = tmp_path / "feed.json"
+    feed = DeltaFeed(path)
+    feed.update({"Dalälven": [SILJAN]})
+    feed.save()
+
+    resumed = DeltaFeed(path)
+    assert resumed.update({"Dalälven": [SILJAN]}) == []
+
+    (event,) = resumed.update({"Dalälven": [replace(SILJAN, timestamp="13:55 okt 04")]})
+    assert event.cursor == 2
+    assert json.loads(event.to_json()) == {
+        "cursor": 2,
+        "kind": CHANGED,
+        "river": "Dalälven",
+        "lake": "Siljan",
+        "level_m": "161.65",
+        "timestamp": "13:55 okt 04",
+        "previous_level_m": "161.65",
+        "previous_timestamp": "12:55 okt 04",
+    }
+
+
+def test_revert_forgets_unsaved_updates(tmp_path) -> None:
+    feed = DeltaFeed(tmp_path / "feed.json")
+    feed.update({"Dalälven": [SILJAN]})
+    feed.save()
+
+    newer = replace(SILJAN, timestamp="13:55 okt 04")
+    (first,) = feed.update({"Dalälven": [newer]})
+    feed.revert()
+    (again,) = feed.update({"Dalälven": [newer]})
+
+    assert again == first
+
+
+def test_since_replays_logged_events_within_the_bound(tmp_path) -> None:
+    path = tmp_path / "feed.json"
+    feed = DeltaFeed(path, max_log_events=2)
+    feed.update({"Dalälven": [SILJAN, ORSASJON]})
+    feed.save()
+    feed.update({"Dalälven": [replace(SILJAN, timestamp="13:55 okt 04"), ORSASJON]})
+    # Unsaved events are not offered to consumers yet.
+    assert DeltaFeed(path).since(2) == []
+    feed.save()
+
+    reader = DeltaFeed(path)
+    assert [(e.cursor, e.kind, e.lake) for e in reader.since(1)] == [
+        (2, ADDED, "Orsasjön"),
+        (3, CHANGED, "Siljan"),
+    ]
+    assert reader.since(1)[1].previous_level_m == Decimal("161.65")
+    assert reader.since(3) == []
+
+
+def test_log_is_appended_and_trimmed_past_twice_the_bound(tmp_path) -> None:
+    path = tmp_path / "feed.json"
+    feed = DeltaFeed(path, max_log_events=2)
+    for minute in range(10, 15):
+        feed.update({"Dalälven": [replace(SILJAN, timestamp=f"12:{minute} okt 04")]})
+        feed.save()
+        if minute == 13:
+            assert len(feed.log_path.read_text(encoding="utf-8").splitlines()) == 4
+
+    assert len(feed.log_path.read_text(encoding="utf-8").splitlines()) == 2
+    reader = DeltaFeed(path)
+    assert [e.cursor for e in reader.since(3)] == [4, 5]
+    with pytest.raises(CursorExpiredError):
+        reader.since(2)
+
+
+def test_cursors_reused_after_a_crash_replace_unconfirmed_events(tmp_path) -> None:
+    path = tmp_path / "feed.json"
+    feed = DeltaFeed(path)
+    feed.update({"Dalälven": [SILJAN]})
+    feed.save()
+    confirmed_state = path.read_text(encoding="utf-8")
+    feed.update({"Dalälven": [replace(SILJAN, timestamp="13:55 okt 04")]})
+    feed.save()
+    # Crash after the log was written but before the state file was.
+    path.write_text(confirmed_state, encoding="utf-8")
+    with feed.log_path.open("a", encoding="utf-8") as log:
+        log.write('{"cursor": 3, "kind"')
+
+    resumed = DeltaFeed(path)
+    resumed.update({"Dalälven": [replace(SILJAN, timestamp="14:55 okt 04")]})
+    resumed.save()
+
+    assert [(e.cursor, e.timestamp) for e in DeltaFeed(path).since(0)] == [
+        (1, "12:55 okt 04"),
+        (2, "14:55 okt 04"),
+    ]
@@ -0,0 +1,91 @@
+import builtins
+import csv
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+from lakelevel.export import export_rows, history_rows, snapshot_rows
+from lakelevel.history import HistoryStore
+from lakelevel.siljan import parse_lake_levels
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+TODAY = date(2025, 10, 4)
+FETCHED_AT = datetime(2025, 10, 4, 11, 0, tzinfo=timezone.utc)
+
+
+def _measurements():
+    html = (FIXTURE_DIR / "dalalven_sample.html").read_text(encoding="utf-8")
+    return parse_lake_levels(html, "Dalälven")
+
+
+def test_snapshot_rows_carry_typed_values() -> None:
+    (row,) = snapshot_rows({"Dalälven": _measurements()}, fetched_at=FETCHED_AT, today=TODAY)
+
+    assert row[:5] == (
+        "Dalälven",
+        "Siljan",
+        Decimal("161.65"),
+        datetime(2025, 10, 4, 12, 55),
+        FETCHED_AT,
+    )
+    assert row[8] == "2005-2024"
+
+
+def test_export_csv_streams_chunks(tmp_path) -> None:
+    rows = list(snapshot_rows(_measurements(), fetched_at=FETCHED_AT, today=TODAY)) * 5
+
+    result = export_rows(iter(rows), tmp_path / "levels.csv", row_group_size=2)
+
+    assert result.rows == 5
+    assert result.format == "csv"
+    with result.path.open(encoding="utf-8") as handle:
+        records = list(csv.DictReader(handle))
+    assert len(records) == 5
+    assert records[0]["level_m"] == "161.65"
+    assert records[0]["measured_at"] == "2025-10-04T12:55:00"
+
+
+def test_export_falls_back_to_csv_without_pyarrow(tmp_path, monkeypatch) -> None:
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name.startswith("pyarrow"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", fake_import)
+
+    result = export_rows(
+        snapshot_rows(_measurements(), fetched_at=FETCHED_AT, today=TODAY),
+        tmp_path / "levels.parquet",
+    )
+
+    assert result.format == "csv"
+    assert result.path == tmp_path / "levels.csv"
+    assert result.path.exists()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_export_history_columnar(tmp_path, suffix) -> None:
+    pa = pytest.importorskip("pyarrow")
+    with HistoryStore() as store:
+        store.record(_measurements(), today=TODAY, fetched_at=FETCHED_AT)
+        result = export_rows(
+            history_rows(store.observations()), tmp_path / f"history{suffix}", row_group_size=4
+        )
+
+    assert result.rows == 6
+    if suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        assert pq.ParquetFile(result.path).num_row_groups == 2
+        table = pq.read_table(result.path)
+    else:
+        table = pa.ipc.open_file(result.path).read_all()
+
+    assert table.schema.field("level_m").type == pa.float64()
+    assert table.column("level_m").to_pylist()[-1] == 161.65
+    assert table.column("measured_at").to_pylist()[-1] == datetime(2025, 10, 4, 12, 55)
+    assert table.column("reference_min_m").null_count == 6
@@ -0,0 +1,96 @@
+from dataclasses import replace
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from lakelevel.history import HistoryStore
+from lakelevel.siljan import parse_lake_levels
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+TODAY = date(2025, 10, 4)
+
+
+def _measurements():
+    html = (FIXTURE_DIR / "dalalven_sample.html").read_text(encoding="utf-8")
+    return parse_lake_levels(html, "Dalälven")
+
+
+def test_record_and_read_series() -> None:
+    with HistoryStore() as store:
+        assert store.record(_measurements(), today=TODAY) == 6
+
+        series = store.series(river="Dalälven")
+
+    points = series[("Dalälven", "Siljan")]
+    assert points[0] == (datetime(2025, 9, 30), Decimal("161.69"))
+    assert points[-1] == (datetime(2025, 10, 4, 12, 55), Decimal("161.65"))
+
+
+def test_record_is_idempotent(tmp_path) -> None:
+    path = tmp_path / "history.sqlite"
+    with HistoryStore(path) as store:
+        store.record(_measurements(), today=TODAY)
+    with HistoryStore(path) as store:
+        store.record(_measurements(), today=TODAY)
+        series = store.series(lakes=["Siljan"], start=datetime(2025, 10, 3))
+
+    assert len(series[("Dalälven", "Siljan")]) == 3
+
+
+def test_rollups_follow_recorded_observations() -> None:
+    with HistoryStore() as store:
+        store.record(_measurements(), today=TODAY)
+        weeks = store.rollups("week", river="Dalälven")
+        later = [
+            replace(m, level_m=Decimal("161.60"), timestamp="07:00 okt 06", daily=())
+            for m in _measurements()
+        ]
+        store.record(later, today=date(2025, 10, 6))
+        days = store.rollups("day", lakes=["Siljan"], start=datetime(2025, 10, 4, 12))
+        months = store.rollups("month")
+
+    (week,) = weeks[("Dalälven", "Siljan")]
+    assert week.start == datetime(2025, 9, 29)
+    assert (week.min_m, week.max_m, week.last_m, week.count) == (
+        Decimal("161.65"),
+        Decimal("161.69"),
+        Decimal("161.65"),
+        6,
+    )
+    assert [day.start.day for day in days[("Dalälven", "Siljan")]] == [4, 6]
+    october = months[("Dalälven", "Siljan")][-1]
+    assert (october.min_m, october.last_m) == (Decimal("161.60"), Decimal("161.60"))
+    assert october.last_at == datetime(2025, 10, 6, 7)
+    assert october.count == 6
+
+
+def test_query_picks_finest_resolution_within_budget() -> None:
+    with HistoryStore() as store:
+        store.record(_measurements(), today=TODAY)
+
+        assert store.query(max_points=6).resolution == "raw"
+        assert store.query(max_points=5).resolution == "day"
+        weekly = store.query(max_points=3)
+        shaped = store.query(max_points=3, shape=True)
+
+    assert weekly.resolution == "week"
+    assert len(weekly.series[("Dalälven", "Siljan")]) == 1
+    assert shaped.resolution == "raw"
+    points = shaped.series[("Dalälven", "Siljan")]
+    assert [point.start for point in points] == [
+        datetime(2025, 9, 30),
+        datetime(2025, 10, 3),
+        datetime(2025, 10, 4, 12, 55),
+    ]
+
+
+def test_rollups_are_built_for_existing_files(tmp_path) -> None:
+    path = tmp_path / "history.sqlite"
+    with HistoryStore(path) as store:
+        store.record(_measurements(), today=TODAY)
+        store._connection.execute("DELETE FROM rollups")
+        store._connection.execute("PRAGMA user_version = 0")
+        store._connection.commit()
+
+    with HistoryStore(path) as store:
+        assert len(store.rollups("day")[("Dalälven", "Siljan")]) == 5
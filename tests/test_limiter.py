@@ -0,0 +1,133 @@
+import time
+
+import pytest
+import responses
+
+from lakelevel.limiter import AdaptiveLimiter, limited_session
+from lakelevel.siljan import (
+    LAKE_LEVEL_URL,
+    PHASE_LANDING,
+    Deadline,
+    DeadlineExceeded,
+    _request,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _round_trip(limiter: AdaptiveLimiter, clock: _Clock, latency: float, **outcome) -> None:
+    assert limiter.acquire(timeout=0)
+    clock.now += latency
+    limiter.release(latency, **outcome)
+
+
+def test_limit_grows_additively_and_halves_on_throttling() -> None:
+    clock = _Clock()
+    limiter = AdaptiveLimiter(initial=2, max_limit=8, clock=clock)
+
+    for _ in range(6):
+        _round_trip(limiter, clock, 0.1)
+    grown = limiter.limit
+    _round_trip(limiter, clock, 0.1, throttled=True)
+
+    assert grown == 4
+    assert limiter.limit == 2
+    assert limiter.stats().throttled == 1
+
+
+def test_slow_responses_shrink_the_limit_once_per_round_trip() -> None:
+    clock = _Clock()
+    limiter = AdaptiveLimiter(initial=8, max_limit=8, clock=clock)
+    _round_trip(limiter, clock, 0.1)
+
+    assert limiter.acquire(timeout=0) and limiter.acquire(timeout=0)
+    clock.now += 1.0
+    limiter.release(1.0)
+    limiter.release(1.0)
+
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_slot_is_returned_when_interrupted_or_abandoned() -> None:
+    limiter = AdaptiveLimiter(initial=2, max_limit=2, clock=_Clock())
+
+    with pytest.raises(KeyboardInterrupt):
+        with limiter.slot():
+            raise KeyboardInterrupt
+
+    def hold():
+        with limiter.slot():
+            yield
+
+    held = hold()
+    next(held)
+    held.close()
+
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("boom")
+
+    stats = limiter.stats()
+    assert stats.in_flight == 0
+    assert (stats.successes, stats.errors) == (0, 1)
+
+
+def test_retry_after_pauses_new_requests() -> None:
+    clock = _Clock()
+    limiter = AdaptiveLimiter(initial=4, clock=clock)
+    _round_trip(limiter, clock, 0.1, throttled=True, retry_after_s=30)
+
+    assert not limiter.acquire(timeout=0)
+    assert limiter.stats().paused_for_s == 30
+    clock.now += 30
+    assert limiter.acquire(timeout=0)
+    assert limiter.in_flight == 1
+
+
+@responses.activate
+def test_adapter_retries_throttled_requests() -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, status=429, headers={"Retry-After": "0"})
+    responses.add(responses.GET, LAKE_LEVEL_URL, body="ok")
+    limiter = AdaptiveLimiter(max_limit=4)
+
+    response = limited_session(limiter).get(LAKE_LEVEL_URL, timeout=5)
+
+    assert response.text == "ok"
+    stats = limiter.stats()
+    assert (stats.throttled, stats.successes, stats.limit) == (1, 1, 2)
+    assert stats.in_flight == 0 and stats.queue_depth == 0
+
+
+def test_waiting_for_a_slot_is_bounded_by_the_deadline() -> None:
+    limiter = AdaptiveLimiter(max_limit=1)
+    assert limiter.acquire(timeout=0)
+    session = limited_session(limiter)
+    started = time.monotonic()
+
+    with pytest.raises(DeadlineExceeded) as excinfo:
+        _request(session, "GET", PHASE_LANDING, Deadline(budget_s=0.2))
+
+    assert excinfo.value.phase == PHASE_LANDING
+    assert time.monotonic() - started < 1
+    assert limiter.stats().queue_depth == 0
+
+
+@responses.activate
+def test_retry_after_beyond_the_deadline_is_not_waited_for() -> None:
+    responses.add(responses.GET, LAKE_LEVEL_URL, status=429, headers={"Retry-After": "60"})
+    limiter = AdaptiveLimiter(max_limit=4)
+    started = time.monotonic()
+
+    with pytest.raises(DeadlineExceeded):
+        _request(limited_session(limiter), "GET", PHASE_LANDING, Deadline(budget_s=5))
+
+    assert time.monotonic() - started < 1
+    responses.assert_call_count(LAKE_LEVEL_URL, 1)
+    assert limiter.stats().paused_for_s > 50
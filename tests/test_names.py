@@ -0,0 +1,43 @@
+from lakelevel import NameIndex, fold_name
+
+
+def test_fold_name_strips_case_whitespace_and_diacritics() -> None:
+    assert fold_name("  Dalälven ") == "dalalven"
+    assert fold_name("Göta   älv") == "gota alv"
+    assert fold_name("Ångermanälven") == "angermanalven"
+
+
+def test_resolve_prefers_exact_spelling() -> None:
+    index = NameIndex(["Öre", "Ore", "Siljan"])
+
+    assert index.resolve("öre") == "Öre"
+    assert index.resolve("ORE") == "Ore"
+    assert index.resolve("siljan") == "Siljan"
+
+
+def test_resolve_folded_only_when_unambiguous() -> None:
+    index = NameIndex(["Öre", "Ōre", "Dalälven"])
+
+    assert index.resolve("Dalalven") == "Dalälven"
+    assert index.resolve("ore") is None
+    assert "dalalven" in index
+    assert "Missing" not in index
+
+
+def test_resolve_all_maps_configured_names_to_source_spelling() -> None:
+    index = NameIndex(["Siljan", "Orsasjön"])
+
+    assert index.resolve_all(["Orsasjon", "siljan", "Gone"]) == {
+        "Orsasjon": "Orsasjön",
+        "siljan": "Siljan",
+        "Gone": "Gone",
+    }
+
+
+def test_prefix_and_suggestions_are_ranked() -> None:
+    index = NameIndex(["Orsasjön", "Siljan", "Skattungen", "Oreälven"])
+
+    assert index.prefix("or") == ["Oreälven", "Orsasjön"]
+    assert index.suggest("Siljn") == ["Siljan"]
+    assert index.suggest("ors", limit=1) == ["Orsasjön"]
+    assert index.suggest("xyz") == []
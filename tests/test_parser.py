@@ -1,9 +1,18 @@
+from datetime import date, datetime
 from decimal import Decimal
 from pathlib import Path
 
 import pytest
 
-from lakelevel.siljan import LakeLevelError, LakeMeasurement, parse_lake_level
+from lakelevel.siljan import (
+    LakeLevelError,
+    LakeMeasurement,
+    measurement_history,
+    parse_day_label,
+    parse_lake_level,
+    parse_lake_levels,
+    parse_measurement_time,
+)
 
 FIXTURE_DIR = Path(__file__).parent / "fixtures"
 
@@ -27,3 +36,110 @@ def test_parse_lake_level_missing_row() -> None:
     html = "<table id=\"iseqchart\"></table>"
     with pytest.raises(LakeLevelError):
         parse_lake_level(html, "Dalälven", "Siljan")
+
+
+def test_parse_lake_levels_returns_every_row() -> None:
+    html = load_fixture("dalalven_sample.html")
+    measurements = parse_lake_levels(html, "Dalälven")
+
+    assert [m.lake for m in measurements] == ["Siljan"]
+    assert measurements[0].level_m == Decimal("161.65")
+
+
+def test_parse_lake_levels_skips_rows_without_reading() -> None:
+    html = (
+        "<table id=\"iseqchart\">"
+        "<tr><td>Orsasjön</td><td></td></tr>"
+        "</table>"
+    )
+    assert parse_lake_levels(html, "Dalälven") == []
+
+
+def test_parse_lake_level_reads_history_and_reference_columns() -> None:
+    html = load_fixture("dalalven_sample.html")
+    measurement = parse_lake_level(html, "Dalälven", "Siljan")
+
+    assert [day.label for day in measurement.daily] == [
+        "sep 30",
+        "okt 01",
+        "okt 02",
+        "okt 03",
+        "okt 04",
+    ]
+    assert measurement.daily[0].level_m == Decimal("161.69")
+    assert measurement.daily[-1].level_m == Decimal("161.66")
+    assert measurement.reference is not None
+    assert measurement.reference.min_m == Decimal("161.00")
+    assert measurement.reference.mean_m == Decimal("161.28")
+    assert measurement.reference.max_m == Decimal("161.77")
+    assert measurement.reference.period == "2005-2024"
+
+
+def test_parse_day_label_infers_year() -> None:
+    assert parse_day_label("okt 03", date(2025, 10, 4)) == date(2025, 10, 3)
+    assert parse_day_label("dec 31", date(2026, 1, 2)) == date(2025, 12, 31)
+    assert parse_day_label("Värde", date(2025, 10, 4)) is None
+
+
+def test_parse_measurement_time() -> None:
+    assert parse_measurement_time("12:55 okt 04", date(2025, 10, 4)) == datetime(
+        2025, 10, 4, 12, 55
+    )
+    assert parse_measurement_time("okt 04", date(2025, 10, 4)) is None
+
+
+def test_measurement_history_expands_daily_columns() -> None:
+    html = load_fixture("dalalven_sample.html")
+    measurement = parse_lake_level(html, "Dalälven", "Siljan")
+
+    history = measurement_history(measurement, date(2025, 10, 4))
+
+    assert history[0] == (datetime(2025, 9, 30), Decimal("161.69"))
+    assert history[-1] == (datetime(2025, 10, 4, 12, 55), Decimal("161.65"))
+    assert len(history) == 6
+
+
+def _table(headers, *rows) -> str:
+    header = "".join(f"<th>{label}</th>" for label in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows
+    )
+    return f'<table id="iseqchart"><tr>{header}</tr>{body}</table>'
+
+
+def test_parse_lake_levels_follows_header_layout() -> None:
+    html = _table(
+        ["Sjö", "okt 03", "okt 04", "Tid", "Värde"],
+        ["Siljan", "", "161,67", "161,66", "", "12:55 okt 04", "161,65", "161,00", "161,28",
+         "161,77", "2005-2024"],
+    )
+
+    (measurement,) = parse_lake_levels(html, "Dalälven")
+
+    assert measurement.level_m == Decimal("161.65")
+    assert measurement.timestamp == "12:55 okt 04"
+    assert [day.label for day in measurement.daily] == ["okt 03", "okt 04"]
+    assert measurement.daily[-1].level_m == Decimal("161.66")
+    assert measurement.reference is not None
+    assert measurement.reference.period == "2005-2024"
+
+
+def test_parse_lake_levels_without_spacer_columns() -> None:
+    html = _table(
+        ["Sjö", "okt 04", "Värde", "Tid", "Min", "Medel", "Max", "Period"],
+        ["Siljan", "161,66", "161,65", "12:55 okt 04", "161,00", "161,28", "161,77", "2005-2024"],
+    )
+
+    measurement = parse_lake_level(html, "Dalälven", "Siljan")
+
+    assert measurement.level_m == Decimal("161.65")
+    assert measurement.daily[0].level_m == Decimal("161.66")
+    assert measurement.reference is not None
+    assert measurement.reference.max_m == Decimal("161.77")
+
+
+def test_parse_lake_levels_rejects_header_without_value_column() -> None:
+    html = _table(["Sjö", "okt 04", "Nivå"], ["Siljan", "", "161,66", "", "161,65"])
+
+    with pytest.raises(LakeLevelError, match="no value and time columns"):
+        parse_lake_levels(html, "Dalälven")
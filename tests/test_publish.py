@@ -0,0 +1,181 @@
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import threading
+
+import pytest
+
+from lakelevel.delta import ADDED, REMOVED, DeltaEvent, DeltaFeed
+from lakelevel.publish import MqttSink, Publisher, PublishError, WebhookSink, publish_changes
+from lakelevel.siljan import LakeMeasurement
+
+
+def _event(cursor: int, lake: str = "Siljan", kind: str = ADDED) -> DeltaEvent:
+    return DeltaEvent(
+        cursor=cursor,
+        kind=kind,
+        river="Dalälven",
+        lake=lake,
+        level_m=None if kind == REMOVED else Decimal("161.65"),
+        timestamp=None if kind == REMOVED else "12:55 okt 04",
+    )
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    batches: list = []
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        length = int(self.headers["Content-Length"])
+        self.batches.append(json.loads(self.rfile.read(length)))
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def receiver():
+    _Receiver.batches = []
+    server = HTTPServer(("127.0.0.1", 0), _Receiver)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/hook", _Receiver.batches
+    server.shutdown()
+    server.server_close()
+
+
+def test_webhook_receives_batches(receiver) -> None:
+    url, batches = receiver
+
+    with Publisher([WebhookSink(url)], max_batch=2) as publisher:
+        publisher.publish([_event(1), _event(2, "Orsasjön"), _event(3, "Runn")])
+        assert publisher.flush(timeout=5)
+        stats = publisher.stats[0]
+
+    assert [len(batch["events"]) for batch in batches] == [2, 1]
+    assert batches[0]["events"][0]["level_m"] == "161.65"
+    assert stats.sent == 3 and stats.dropped == 0
+
+
+class _StubMqtt:
+    def __init__(self) -> None:
+        self.messages = []
+
+    def publish(self, topic, payload, qos, retain):
+        self.messages.append((topic, payload, retain))
+        return type("Info", (), {"rc": 0})()
+
+
+def test_mqtt_publishes_retained_topic_per_lake() -> None:
+    client = _StubMqtt()
+    sink = MqttSink(prefix="lakes/", client=client)
+
+    with Publisher([sink]) as publisher:
+        publisher.publish([_event(1, "Lake #1"), _event(2, "Siljan", REMOVED)])
+
+    assert client.messages[0][0] == "lakes/Dalälven/Lake _1"
+    assert json.loads(client.messages[0][1])["cursor"] == 1
+    assert client.messages[1] == ("lakes/Dalälven/Siljan", "", True)
+
+
+class _FlakySink:
+    name = "flaky"
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.delivered = []
+
+    def send(self, events) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise PublishError("unavailable")
+        self.delivered.extend(event.cursor for event in events)
+
+
+def test_mqtt_publish_that_times_out_is_not_counted_as_sent() -> None:
+    class _Unacknowledged:
+        rc = 0
+
+        def wait_for_publish(self, timeout) -> None:
+            pass
+
+        def is_published(self) -> bool:
+            return False
+
+    class _Silent(_StubMqtt):
+        def publish(self, topic, payload, qos, retain):
+            return _Unacknowledged()
+
+    sink = MqttSink(client=_Silent())
+
+    with pytest.raises(PublishError, match="timed out"):
+        sink.send([_event(1)])
+
+
+def test_failed_batches_are_retried_then_dropped() -> None:
+    recovering, broken = _FlakySink(failures=2), _FlakySink(failures=100)
+
+    with Publisher([recovering, broken], max_retries=2, backoff=0.001) as publisher:
+        publisher.publish([_event(1), _event(2)])
+        assert publisher.flush(timeout=5)
+        recovered_stats, broken_stats = publisher.stats
+
+    assert recovering.delivered == [1, 2]
+    assert recovered_stats.retries == 2
+    assert broken_stats.dropped == 2
+
+
+def test_full_queue_applies_backpressure() -> None:
+    release = threading.Event()
+
+    class _Blocked:
+        name = "blocked"
+
+        def send(self, events) -> None:
+            release.wait(5)
+
+    publisher = Publisher([_Blocked()], max_batch=1, max_queue=1)
+    publisher.publish([_event(1), _event(2)])
+
+    with pytest.raises(PublishError):
+        publisher.publish([_event(3)], timeout=0.05)
+    release.set()
+    publisher.close(timeout=5)
+
+
+def test_undelivered_events_are_not_saved(monkeypatch, tmp_path) -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+    monkeypatch.setattr(
+        "lakelevel.snapshot.fetch_snapshot", lambda rivers, **kwargs: {"Dalälven": [measurement]}
+    )
+    state = tmp_path / "feed.json"
+    feed = DeltaFeed(state)
+    sink = _FlakySink(failures=1)
+
+    with Publisher([sink], max_retries=0) as publisher:
+        with pytest.raises(PublishError):
+            publish_changes(feed, publisher)
+        assert not state.exists()
+
+        events = publish_changes(feed, publisher)
+
+    assert [event.cursor for event in events] == [1]
+    assert sink.delivered == [1]
+    assert DeltaFeed(state).cursor == 1
+
+
+def test_stats_are_a_consistent_copy() -> None:
+    sink = _FlakySink(failures=0)
+
+    with Publisher([sink]) as publisher:
+        publisher.publish([_event(1)])
+        assert publisher.flush(timeout=5)
+        before = publisher.stats[0]
+        publisher.publish([_event(2)])
+        assert publisher.flush(timeout=5)
+        after = publisher.stats[0]
+
+    assert before.sent == 1 and after.sent == 2
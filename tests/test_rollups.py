@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from lakelevel.rollups import bucket_start, downsample, next_bucket, rollup
+
+
+def test_bucket_boundaries() -> None:
+    when = datetime(2025, 12, 31, 18, 40)
+
+    assert bucket_start(when, "hour") == datetime(2025, 12, 31, 18)
+    assert bucket_start(when, "day") == datetime(2025, 12, 31)
+    assert bucket_start(when, "week") == datetime(2025, 12, 29)
+    assert bucket_start(when, "month") == datetime(2025, 12, 1)
+    assert next_bucket(datetime(2025, 12, 1), "month") == datetime(2026, 1, 1)
+    with pytest.raises(ValueError):
+        bucket_start(when, "year")
+
+
+def test_rollup_summarises_each_bucket() -> None:
+    points = [
+        (datetime(2025, 10, 4, 12), Decimal("161.60")),
+        (datetime(2025, 10, 4, 6), Decimal("161.70")),
+        (datetime(2025, 10, 5, 6), Decimal("161.50")),
+    ]
+
+    first, second = rollup(points, "day")
+
+    assert (first.min_m, first.max_m, first.mean_m, first.last_m) == (
+        Decimal("161.60"),
+        Decimal("161.70"),
+        Decimal("161.6500"),
+        Decimal("161.60"),
+    )
+    assert first.count == 2
+    assert second.last_at == datetime(2025, 10, 5, 6)
+
+
+def test_downsample_keeps_extremes() -> None:
+    start = datetime(2025, 1, 1)
+    levels = [Decimal("100.00")] * 100
+    levels[37] = Decimal("103.00")
+    levels[71] = Decimal("97.00")
+    points = rollup(
+        [(start + timedelta(days=day), level) for day, level in enumerate(levels)], "day"
+    )
+
+    reduced = downsample(points, 10)
+
+    assert len(reduced) == 10
+    assert reduced[0] is points[0] and reduced[-1] is points[-1]
+    assert points[37] in reduced and points[71] in reduced
+    assert downsample(points[:5], 10) == points[:5]
@@ -0,0 +1,96 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.lakelevel.const import DOMAIN  # noqa: E402
+from custom_components.lakelevel.coordinator import LakeLevelCoordinator  # noqa: E402
+from custom_components.lakelevel.fetch import RiverFetches  # noqa: E402
+from custom_components.lakelevel.services import async_setup_services  # noqa: E402
+from lakelevel.siljan import LakeMeasurement  # noqa: E402
+
+MEASUREMENTS = {
+    "Dalälven": [
+        LakeMeasurement(
+            river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+        ),
+        LakeMeasurement(
+            river="Dalälven", lake="Orsasjön", level_m=Decimal("161.70"), timestamp="12:55 okt 04"
+        ),
+    ],
+    "Umeälven": [
+        LakeMeasurement(
+            river="Umeälven", lake="Storuman", level_m=Decimal("350.10"), timestamp="12:55 okt 04"
+        ),
+    ],
+}
+
+
+def _refresh(monkeypatch, tmp_path, test) -> list[str]:
+    fetched: list[str] = []
+
+    def fake_fetch(self, river, deadline):
+        fetched.append(river)
+        return list(MEASUREMENTS[river])
+
+    monkeypatch.setattr(RiverFetches, "_fetch", fake_fetch)
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        try:
+            loaded = hass.data.setdefault(DOMAIN, {})
+            for entry_id, river, lake in (
+                ("siljan", "Dalälven", "Siljan"),
+                ("orsasjon", "Dalälven", "Orsasjön"),
+                ("storuman", "Umeälven", "Storuman"),
+            ):
+                loaded[entry_id] = {
+                    "coordinator": LakeLevelCoordinator(
+                        hass, {"river": river, "lakes": [lake]}, entry_id
+                    )
+                }
+            async_setup_services(hass)
+
+            async def call(**data):
+                return await hass.services.async_call(
+                    DOMAIN, "refresh", data, blocking=True, return_response=True
+                )
+
+            await test(call)
+        finally:
+            await hass.async_stop(force=True)
+
+    asyncio.run(run())
+    return fetched
+
+
+def test_refresh_fetches_each_river_once(monkeypatch, tmp_path) -> None:
+    async def test(call) -> None:
+        assert await call() == {
+            "rivers": {
+                "Dalälven": {"cached": False, "entries": {"siljan": True, "orsasjon": True}},
+                "Umeälven": {"cached": False, "entries": {"storuman": True}},
+            }
+        }
+
+    assert sorted(_refresh(monkeypatch, tmp_path, test)) == ["Dalälven", "Umeälven"]
+
+
+def test_refresh_within_min_interval_reuses_the_last_result(monkeypatch, tmp_path) -> None:
+    async def test(call) -> None:
+        await call(river="Dalälven")
+
+        assert await call(river="dalalven") == {
+            "rivers": {
+                "Dalälven": {"cached": True, "entries": {"siljan": True, "orsasjon": True}}
+            }
+        }
+        assert await call(entry_id="storuman") == {
+            "rivers": {"Umeälven": {"cached": False, "entries": {"storuman": True}}}
+        }
+
+    assert _refresh(monkeypatch, tmp_path, test) == ["Dalälven", "Umeälven"]
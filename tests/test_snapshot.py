@@ -0,0 +1,84 @@
+import asyncio
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+import responses
+
+from lakelevel.siljan import LAKE_LEVEL_URL, LakeLevelError
+from lakelevel.snapshot import aiter_measurements, fetch_snapshot, iter_measurements
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+LANDING_HTML = (FIXTURE_DIR / "landing.html").read_text(encoding="utf-8").encode(
+    "iso-8859-1"
+)
+LAKE_HTML = (FIXTURE_DIR / "dalalven_sample.html").read_text(encoding="utf-8")
+
+
+def _river_table(request):
+    river = parse_qs(request.body, encoding="iso-8859-1")["Ralv"][0]
+    html = LAKE_HTML.replace("Siljan", f"{river} sjö")
+    return 200, {}, html.encode("iso-8859-1")
+
+
+def _mock_network(resp: responses.RequestsMock) -> None:
+    resp.add(responses.GET, LAKE_LEVEL_URL, body=LANDING_HTML, status=200)
+    resp.add_callback(responses.POST, LAKE_LEVEL_URL, callback=_river_table)
+
+
+@responses.activate
+def test_fetch_snapshot_in_process_covers_all_rivers() -> None:
+    _mock_network(responses)
+
+    snapshot = fetch_snapshot(timeout=5, parse_workers=0)
+
+    assert list(snapshot) == ["Umeälven", "Dalälven", "Göta älv"]
+    assert [m.lake for m in snapshot["Göta älv"]] == ["Göta älv sjö"]
+    responses.assert_call_count(LAKE_LEVEL_URL, 4)
+
+
+@responses.activate
+def test_fetch_snapshot_parses_on_process_pool() -> None:
+    _mock_network(responses)
+
+    snapshot = fetch_snapshot(
+        ["dalälven", "Umeälven"], timeout=5, parse_workers=2, min_process_parse=1
+    )
+
+    assert list(snapshot) == ["Dalälven", "Umeälven"]
+    assert snapshot["Dalälven"][0].river == "Dalälven"
+    assert str(snapshot["Umeälven"][0].level_m) == "161.65"
+
+
+@responses.activate
+def test_fetch_snapshot_unknown_river() -> None:
+    _mock_network(responses)
+
+    with pytest.raises(LakeLevelError):
+        fetch_snapshot(["Nonexistent"], timeout=5)
+
+
+@responses.activate
+def test_iter_measurements_filters_lakes_and_bounds_requests() -> None:
+    _mock_network(responses)
+
+    stream = iter_measurements(
+        lakes=["Umealven sjo", "Göta älv sjö"], timeout=5, fetch_workers=1, max_pending=1
+    )
+    first = next(stream)
+    # One river in flight at a time: only the landing page and one table so far.
+    assert len(responses.calls) == 2
+    rest = list(stream)
+
+    assert sorted(m.lake for m in [first, *rest]) == ["Göta älv sjö", "Umeälven sjö"]
+    responses.assert_call_count(LAKE_LEVEL_URL, 4)
+
+
+@responses.activate
+def test_aiter_measurements_yields_every_river() -> None:
+    _mock_network(responses)
+
+    async def collect():
+        return [m.river async for m in aiter_measurements(["Dalälven", "Umeälven"], timeout=5)]
+
+    assert sorted(asyncio.run(collect())) == ["Dalälven", "Umeälven"]
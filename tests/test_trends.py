@@ -0,0 +1,30 @@
+from decimal import Decimal
+from pathlib import Path
+
+from lakelevel.siljan import LakeMeasurement, parse_lake_levels
+from lakelevel.trends import compute_trends
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+
+def test_compute_trends_from_fixture_row() -> None:
+    html = (FIXTURE_DIR / "dalalven_sample.html").read_text(encoding="utf-8")
+    trends = compute_trends(parse_lake_levels(html, "Dalälven"))
+
+    trend = trends["Siljan"]
+    assert trend.change_24h_m == Decimal("-0.02")
+    assert trend.change_5d_m == Decimal("-0.04")
+    assert trend.rate_m_per_day == Decimal("-0.0070")
+    assert trend.deviation_from_mean_m == Decimal("0.37")
+    assert trend.band_position_pct == Decimal("84.4")
+
+
+def test_compute_trends_without_history_columns() -> None:
+    measurement = LakeMeasurement(
+        river="Dalälven", lake="Siljan", level_m=Decimal("161.65"), timestamp="12:55 okt 04"
+    )
+    trend = compute_trends([measurement])["Siljan"]
+
+    assert trend.change_24h_m is None
+    assert trend.rate_m_per_day is None
+    assert trend.band_position_pct is None